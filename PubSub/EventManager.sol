@@ -3,7 +3,9 @@ pragma solidity ^0.8.17;
 
 
 interface Interface_Subscriber {
-    function onNotify(bytes memory data) external;
+    function onNotify(bytes calldata data) external;
+    // only needed by subscribers of hash-only publishes
+    function onNotifyHash(bytes32 dataHash, uint256 seqNum) external;
 }
 
 
@@ -11,140 +13,610 @@ contract EventManager {
 
     //===== structs =====
 
+    // Packed into a single storage slot (160 + 72 + 24 bits), so that
+    // visiting a subscriber in the publish loop costs one SLOAD and one
+    // SSTORE
+    struct SubscriberRecord {
+        address addr;
+        uint72  balanceWei;
+        uint24  gasBudget;  // gas limit on its onNotify call
+    }
+
+    // A subscriber is either active (its record is in the list of its
+    // topic and it is visited when that topic is published) or parked (its
+    // balance is too low to pay for a notification; it is only listed in
+    // m_parkedAddrs and never visited)
     struct MappedSubscriber {
         bool    init;
-        uint256 balanceWei;
+        bool    active;
+        uint64  index;            // position in the topic list or m_parkedAddrs
+        uint64  topic;            // the topic subscribed to
+        uint72  parkedBalanceWei; // balance while the subscriber is parked
+        uint24  parkedGasBudget;  // gas budget while the subscriber is parked
+    }
+
+    // A message whose on-chain delivery is spread across transactions
+    struct PendingDelivery {
+        bytes32 dataHash;
+        uint64  cursor;      // next subscriber to notify
+        uint64  end;         // end of the range of subscribers to notify
+        uint64  expiryBlock; // after which anyone can cancel the delivery
+        uint256 incentPerSubWei; // fixed when the message was posted
+    }
+
+    // A message kept in the inbox for subscribers to pull
+    struct InboxMessage {
+        uint64  seqNum;
+        bytes   data;
     }
 
     //===== Member variables =====
 
-    address[]                               m_subscriberAddrs;
+    // active subscribers of each topic; topic 0 is the default topic
+    mapping(uint64 => SubscriberRecord[])   m_topicSubscribers;
+    // sum of the gas budgets of the active subscribers of each topic
+    mapping(uint64 => uint256)              m_topicBudgetGas;
+    address[]                               m_parkedAddrs;
     mapping(address => MappedSubscriber)    m_subscriberMap;
     mapping(address => bool)                m_publisherMap;
 
     // contract states
     address  m_owner;
+    address  m_serviceAddr;
     bool     m_entranceLock  = false;
+    uint64   m_seqNum;       // sequence number of the latest message
+    PendingDelivery m_pending;
+
+    // ring buffer of the latest posted messages, indexed by seqNum % size
+    InboxMessage[INBOX_CAPACITY] m_inbox;
 
     // reimbursement, gas cost, and gas limits
-    uint256 m_incentiveWei   = 1000000;
-    uint256 m_minDepositWei  = 100000000;
-    uint256 m_perSubLimitGas = 202000;
-    uint256 constant FINISHING_COST_GAS = 90000;
+    // (their defaults are set by initState, since a minimal-proxy clone
+    // does not run the constructor or storage initializers);
+    // m_perSubLimitGas is the gas budget of subscribers that don't declare
+    // their own, and the most any subscriber can declare
+    uint256 m_incentiveWei;
+    uint256 m_minDepositWei;
+    uint256 m_perSubLimitGas;
+    uint256 constant DEFAULT_INCENTIVE_WEI     = 1000000;
+    uint256 constant DEFAULT_MIN_DEPOSIT_WEI   = 100000000;
+    uint256 constant DEFAULT_PER_SUB_LIMIT_GAS = 202000;
+    uint256 constant FINISHING_COST_GAS        = 90000;
+    uint256 constant INBOX_CAPACITY            = 64;
+    uint256 constant PENDING_EXPIRY_BLOCKS     = 7200; // about a day
+    uint64  constant DEFAULT_TOPIC             = 0;
 
     //===== Events =====
 
-    event NotifySubscribers(bytes data);
+    // every message, whatever way it is delivered, carries the next
+    // sequence number of this event manager, so off-chain readers can
+    // filter by publisher, topic and sequence number on the node, and
+    // detect the messages they missed
+    event NotifySubscribers(
+        address indexed publisherAddr,
+        uint64  indexed topic,
+        uint64  indexed seqNum,
+        bytes           data
+    );
 
     //===== Constructor =====
 
     constructor(address owner) {
-        // 1. set the owner of this event manager
-        m_owner = owner;
-
-        // 2. add the owner as a publisher
-        m_publisherMap[owner] = true;
+        initState(owner, msg.sender);
     }
 
     //===== external Functions =====
 
     /**
-     * Add a subscriber to the list of subscribers
+     * Initialize a minimal-proxy (EIP-1167) clone of this contract, in
+     * place of the constructor
+     * @param owner The owner of the event manager
+     * @dev The PubSubService that created the clone must call this function
+     *      in the same transaction. It can only be called once, and never
+     *      on a contract deployed with the constructor (e.g. the
+     *      implementation behind the clones)
+     */
+    function initialize(address owner) external {
+        // 1. make sure the event manager has not been initialized
+        require(m_serviceAddr == address(0), "Already initialized");
+
+        // 2. initialize the states, with the caller as the PubSubService
+        initState(owner, msg.sender);
+    }
+
+    /**
+     * Add a subscriber to the list of subscribers of the default topic
      * @param subscriberAddr The address of the subscriber
      */
     function addSubscriber(address subscriberAddr) external payable {
-        // 1. check that ther subscriber has not been added
+        addTopicSubscriber(subscriberAddr, DEFAULT_TOPIC, 0);
+    }
+
+    /**
+     * Add a subscriber to the list of subscribers of a topic
+     * @param subscriberAddr The address of the subscriber
+     * @param topic The topic to subscribe to; the subscriber is only
+     *              notified of messages published to this topic
+     */
+    function addSubscriber(address subscriberAddr, uint64 topic)
+        external
+        payable
+    {
+        addTopicSubscriber(subscriberAddr, topic, 0);
+    }
+
+    /**
+     * Add a subscriber, with its own gas budget, to the list of subscribers
+     * of a topic
+     * @param subscriberAddr The address of the subscriber
+     * @param topic The topic to subscribe to (0 is the default topic)
+     * @param gasBudget The gas limit on each onNotify call to the
+     *                  subscriber; 0 picks the default of this event
+     *                  manager, which is also the most it accepts
+     * @dev Publishers have to supply the sum of the budgets of a topic's
+     *      subscribers, so a low budget lets more subscribers fit in a
+     *      publish transaction; a notification that runs out of its budget
+     *      fails, but is still paid for
+     */
+    function addSubscriber(
+        address subscriberAddr,
+        uint64 topic,
+        uint256 gasBudget
+    )
+        external
+        payable
+    {
+        addTopicSubscriber(subscriberAddr, topic, gasBudget);
+    }
+
+    /**
+     * Add a subscriber to the list of subscribers of a topic
+     */
+    function addTopicSubscriber(
+        address subscriberAddr,
+        uint64 topic,
+        uint256 gasBudget
+    )
+        private
+    {
+        // 1. the list must not change while subscribers are being notified,
+        //    or a late joiner could be swapped into the pending range
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+        require(
+            m_pending.dataHash == bytes32(0),
+            "Delivery in progress"
+        );
+
+        // 2. check that ther subscriber has not been added
         require(
             !m_subscriberMap[subscriberAddr].init,
             "Subscriber already added"
         );
 
-        // 2. check that the subscriber has sent enough funds
+        // 3. check that the subscriber has sent enough funds
         require(
             msg.value >= m_minDepositWei,
             "You need to send at least the minimum deposit"
         );
 
-        // 3. add the subscriber to the list of subscribers
-        m_subscriberAddrs.push(subscriberAddr);
+        // 4. check that the deposit fits in the packed balance field
+        require(
+            msg.value <= type(uint72).max,
+            "Balance overflow"
+        );
 
-        // 4. add the subscriber to the map of subscribers
+        // 5. check that the gas budget is within the owner's limit, so a
+        //    single subscriber cannot make the topic too costly to publish
+        //    to (the limit also fits in the packed budget field)
+        gasBudget = gasBudget == 0 ? m_perSubLimitGas : gasBudget;
+        require(
+            gasBudget <= m_perSubLimitGas,
+            "Gas budget is too large"
+        );
+
+        // 6. add the subscriber to the active set of the topic
+        activateSubscriber(
+            subscriberAddr,
+            topic,
+            uint72(msg.value),
+            uint24(gasBudget)
+        );
+    }
+
+    /**
+     * Remove a subscriber from the list of subscribers and refund its
+     * remaining balance
+     * @param subscriberAddr The address of the subscriber
+     * @return uint256 The amount of Wei refunded to the subscriber
+     * @dev The caller must be the subscriber itself, or the PubSubService
+     *      acting on behalf of the subscriber
+     */
+    function removeSubscriber(address subscriberAddr)
+        external
+        returns (uint256)
+    {
+        // 1. the list must not change while subscribers are being notified
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+        require(
+            m_pending.dataHash == bytes32(0),
+            "Delivery in progress"
+        );
+
+        // 2. check that the caller is allowed to remove the subscriber
+        require(
+            (msg.sender == subscriberAddr) || (msg.sender == m_serviceAddr),
+            "Only the subscriber can unsubscribe"
+        );
+
+        // 3. check that the subscriber has been added
+        require(
+            m_subscriberMap[subscriberAddr].init,
+            "Subscriber is not found"
+        );
+
+        // 4. remove the subscriber from the active set or the parked list;
+        //    both are O(1) regardless of the number of subscribers
+        MappedSubscriber memory mapped = m_subscriberMap[subscriberAddr];
+        uint256 refundWei = 0;
+        if (mapped.active) {
+            SubscriberRecord[] storage subscribers =
+                m_topicSubscribers[mapped.topic];
+            SubscriberRecord memory record = subscribers[mapped.index];
+            refundWei = record.balanceWei;
+            m_topicBudgetGas[mapped.topic] -= record.gasBudget;
+            removeActiveRecord(subscribers, mapped.index);
+        } else {
+            refundWei = mapped.parkedBalanceWei;
+            removeParkedAddr(mapped.index);
+        }
+
+        // 5. clear the map entry (the freed slot is refunded)
+        delete m_subscriberMap[subscriberAddr];
+
+        // 6. refund the remaining balance to the subscriber
+        (bool success, ) = payable(subscriberAddr).call{
+            value: refundWei
+        }("");
+        require(success, "Refund failed");
+
+        return refundWei;
+    }
+
+    /**
+     * Set the initial states, shared by the constructor and initialize
+     */
+    function initState(address owner, address serviceAddr) private {
+        // 1. set the owner of this event manager
+        m_owner = owner;
+
+        // 2. remember the PubSubService that spawned this event manager
+        m_serviceAddr = serviceAddr;
+
+        // 3. add the owner as a publisher
+        m_publisherMap[owner] = true;
+
+        // 4. set the default reimbursement and gas limits
+        m_incentiveWei   = DEFAULT_INCENTIVE_WEI;
+        m_minDepositWei  = DEFAULT_MIN_DEPOSIT_WEI;
+        m_perSubLimitGas = DEFAULT_PER_SUB_LIMIT_GAS;
+    }
+
+    /**
+     * Swap the last active record into the given position and pop
+     */
+    function removeActiveRecord(
+        SubscriberRecord[] storage subscribers,
+        uint256 index
+    )
+        private
+    {
+        uint256 lastIndex = subscribers.length - 1;
+        if (index != lastIndex) {
+            SubscriberRecord memory lastRecord = subscribers[lastIndex];
+            subscribers[index] = lastRecord;
+            m_subscriberMap[lastRecord.addr].index = uint64(index);
+        }
+        subscribers.pop();
+    }
+
+    /**
+     * Swap the last parked address into the given position and pop
+     */
+    function removeParkedAddr(uint256 index) private {
+        uint256 lastIndex = m_parkedAddrs.length - 1;
+        if (index != lastIndex) {
+            address lastAddr = m_parkedAddrs[lastIndex];
+            m_parkedAddrs[index] = lastAddr;
+            m_subscriberMap[lastAddr].index = uint64(index);
+        }
+        m_parkedAddrs.pop();
+    }
+
+    /**
+     * Number of entries in the page of a list starting at offset
+     */
+    function pageCount(uint256 length, uint256 offset, uint256 limit)
+        private
+        pure
+        returns (uint256)
+    {
+        if (offset >= length) {
+            return 0;
+        }
+        uint256 remaining = length - offset;
+        return remaining < limit ? remaining : limit;
+    }
+
+    /**
+     * Append a subscriber to the active set of a topic
+     */
+    function activateSubscriber(
+        address subscriberAddr,
+        uint64 topic,
+        uint72 balanceWei,
+        uint24 gasBudget
+    )
+        private
+    {
+        SubscriberRecord[] storage subscribers = m_topicSubscribers[topic];
         m_subscriberMap[subscriberAddr] = MappedSubscriber({
-            init:       true,
-            balanceWei: msg.value
+            init:             true,
+            active:           true,
+            index:            uint64(subscribers.length),
+            topic:            topic,
+            parkedBalanceWei: 0,
+            parkedGasBudget:  0
         });
+        subscribers.push(SubscriberRecord({
+            addr:       subscriberAddr,
+            balanceWei: balanceWei,
+            gasBudget:  gasBudget
+        }));
+        m_topicBudgetGas[topic] += gasBudget;
     }
 
-    function notifyOnChainSubscribers(bytes memory data) private {
-        // 1. Get gas price (Wei per gas unit) that we want to reimburse
-        uint256 gasPriceWei = tx.gasprice;
+    /**
+     * Move the active subscriber at the given position to the parked list
+     * @dev The last active record takes the freed position
+     */
+    function parkSubscriber(
+        SubscriberRecord[] storage subscribers,
+        uint256 index,
+        SubscriberRecord memory record
+    )
+        private
+    {
+        removeActiveRecord(subscribers, index);
 
-        // 2. maintain running track of how much to compensate tx.origin
-        uint256 compensateWei = 0;
+        // the topic and budget are kept, so the subscriber returns to the
+        // topic once topped up
+        MappedSubscriber storage mapped = m_subscriberMap[record.addr];
+        mapped.active           = false;
+        mapped.index            = uint64(m_parkedAddrs.length);
+        mapped.parkedBalanceWei = record.balanceWei;
+        mapped.parkedGasBudget  = record.gasBudget;
+        m_topicBudgetGas[mapped.topic] -= record.gasBudget;
+        m_parkedAddrs.push(record.addr);
+    }
+
+    /**
+     * Call a subscriber with the pre-encoded onNotify call
+     * @return success Whether the call succeeded
+     * @dev The return data is never copied into memory, and a subscriber
+     *      without code (the call trivially succeeds) counts as failed
+     */
+    function callSubscriber(
+        address subscriberAddr,
+        uint256 limitGas,
+        bytes memory callData
+    )
+        private
+        returns (bool success)
+    {
+        assembly ("memory-safe") {
+            success := call(
+                limitGas,
+                subscriberAddr,
+                0,
+                add(callData, 0x20),
+                mload(callData),
+                0,
+                0
+            )
+            // the address is warm after the call, so this is cheap
+            success := and(success, gt(extcodesize(subscriberAddr), 0))
+        }
+    }
+
+    /**
+     * Make sure there is enough gas left to give every active subscriber of
+     * a topic its full gas budget
+     */
+    function requireTopicBudgetGas(uint64 topic) private view {
+        require(
+            gasleft() >= (m_topicBudgetGas[topic] + FINISHING_COST_GAS),
+            "Not enough gas left"
+        );
+    }
 
-        uint256 numSubscribers   = m_subscriberAddrs.length;
-        uint256 incentPerSubWei  = m_incentiveWei / numSubscribers;
+    /**
+     * Notify the active subscribers in [cursor, endIdx) of a topic list
+     * and reimburse tx.origin; subscribers that cannot pay for a
+     * notification are parked
+     * @param subscribers The active subscribers of the topic
+     * @param callData The onNotify call, encoded once for all subscribers
+     * @param incentPerSubWei The incentive paid by each notified subscriber
+     * @return uint256 The end of the range after parking subscribers
+     */
+    function notifyOnChainSubscribers(
+        SubscriberRecord[] storage subscribers,
+        bytes memory callData,
+        uint256 cursor,
+        uint256 endIdx,
+        uint256 incentPerSubWei
+    )
+        private
+        returns (uint256)
+    {
+        // 1. maintain running track of how much to compensate tx.origin
+        uint256 compensateWei = 0;
 
         uint256 usedGas   = 0;
         uint256 costWei   = 0;
         uint256 limitGas  = 0;
 
-        // 3. Make sure the specified gas limit is enough for all subscribers's
-        //    max gas limit
-        require(
-            gasleft() >= ((m_perSubLimitGas * numSubscribers) +
-                FINISHING_COST_GAS),
-            "Not enough gas left"
-        );
-        uint fairLimitGas = (gasleft() - FINISHING_COST_GAS) / numSubscribers;
-
-        // 4. Notify all subscribers and reimburse the sender for the gas used
-        for (uint256 i = 0; i < numSubscribers; i++) {
-            address subscriberAddr = m_subscriberAddrs[i];
-            // get a reference to the mapped subscriber
-            MappedSubscriber storage mappedSubscriber =
-                m_subscriberMap[subscriberAddr];
-
-            if (mappedSubscriber.balanceWei > incentPerSubWei) {
-                // calculate how much gas unit that this subscriber can pay
-                // with its balance
-                limitGas =
-                    (mappedSubscriber.balanceWei - incentPerSubWei) /
-                        gasPriceWei;
-                limitGas = limitGas > fairLimitGas ? fairLimitGas : limitGas;
-
-                costWei = 0; // reset the cost
-                usedGas = gasleft();
-                try Interface_Subscriber(subscriberAddr).onNotify{
-                    gas: limitGas
-                }(data) {
-                    // if the notification was successful, incentive will be
-                    // awarded to the sender
-                    costWei += incentPerSubWei;
-                } catch {
-                    // if the subscriber fails, we still want to reimburse
-                    // the sender for the gas used, and notify the next
-                    // subscriber
-                }
-                usedGas -= gasleft(); // (start - end)
-
-                costWei += (usedGas * gasPriceWei);
-
-                compensateWei               += costWei;
-                mappedSubscriber.balanceWei -= costWei;
+        // 2. Each subscriber is given its own gas budget; the callers check
+        //    up front that the budgets of the whole topic fit, and the check
+        //    in the loop covers the slices of a multi-transaction delivery
+
+        // 3. Notify all subscribers and reimburse the sender for the gas used
+        while (cursor < endIdx) {
+            // a single SLOAD brings in both the address and the balance
+            SubscriberRecord memory subscriber = subscribers[cursor];
+
+            if (subscriber.balanceWei <= incentPerSubWei) {
+                // depleted; park it so later publishes skip it entirely.
+                // The last record takes this position, so the cursor is
+                // not advanced
+                parkSubscriber(subscribers, cursor, subscriber);
+                endIdx = endIdx > subscribers.length ?
+                    subscribers.length : endIdx;
+                continue;
+            }
+
+            // calculate how much gas unit that this subscriber can pay
+            // with its balance
+            limitGas =
+                (subscriber.balanceWei - incentPerSubWei) /
+                    tx.gasprice;
+            limitGas = limitGas > subscriber.gasBudget ?
+                uint256(subscriber.gasBudget) : limitGas;
+            require(
+                gasleft() >= (limitGas + FINISHING_COST_GAS),
+                "Not enough gas left"
+            );
+
+            costWei = 0; // reset the cost
+            usedGas = gasleft();
+            if (callSubscriber(subscriber.addr, limitGas, callData)) {
+                // if the notification was successful, incentive will be
+                // awarded to the sender
+                costWei += incentPerSubWei;
+            }
+            // if the subscriber fails, we still want to reimburse
+            // the sender for the gas used, and notify the next subscriber
+            usedGas -= gasleft(); // (start - end)
+
+            costWei += (usedGas * tx.gasprice);
+            // the call overhead may exceed what the balance can pay for;
+            // never charge more than the remaining balance
+            costWei = costWei > subscriber.balanceWei ?
+                uint256(subscriber.balanceWei) : costWei;
+
+            compensateWei += costWei;
+            subscriber.balanceWei = uint72(subscriber.balanceWei - costWei);
+
+            if (subscriber.balanceWei <= incentPerSubWei) {
+                parkSubscriber(subscribers, cursor, subscriber);
+                endIdx = endIdx > subscribers.length ?
+                    subscribers.length : endIdx;
+            } else {
+                // write the whole record back, a single SSTORE
+                subscribers[cursor] = subscriber;
+                ++cursor;
             }
         }
 
         // reimburse the user who invoked this entire transaction
         payable(tx.origin).transfer(compensateWei);
+
+        return endIdx;
+    }
+
+    /**
+     * Notify all subscribers of the default topic
+     * @param data The data to send to the subscribers
+     * @dev The immediate caller must be a publisher
+     */
+    function notifySubscribers(bytes calldata data) external {
+        notifyTopicSubscribers(DEFAULT_TOPIC, data);
     }
 
     /**
-     * Notify all subscribers
+     * Notify the subscribers of a topic
+     * @param topic The topic of the message; only its subscribers are called
      * @param data The data to send to the subscribers
      * @dev The immediate caller must be a publisher
      */
-    function notifySubscribers(bytes memory data) external {
+    function notifySubscribers(uint64 topic, bytes calldata data) external {
+        notifyTopicSubscribers(topic, data);
+    }
+
+    /**
+     * Notify the subscribers of a topic
+     */
+    function notifyTopicSubscribers(uint64 topic, bytes calldata data)
+        private
+    {
+        // 1. Make sure the entrance lock is free
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+        m_entranceLock = true;
+
+        // 2. Make sure the caller is a publisher
+        require(
+            m_publisherMap[msg.sender],
+            "Only registered publisher can notify"
+        );
+
+        // 3. Messages must be delivered in order
+        require(
+            m_pending.dataHash == bytes32(0),
+            "Delivery in progress"
+        );
+
+        // 4. notify all on-chain subscribers if there is any; the payload
+        //    stays in calldata and is copied into memory only once, already
+        //    encoded as the onNotify call
+        uint64 seqNum = ++m_seqNum;
+        SubscriberRecord[] storage subscribers = m_topicSubscribers[topic];
+        uint256 numSubscribers = subscribers.length;
+        if (numSubscribers > 0) {
+            requireTopicBudgetGas(topic);
+            notifyOnChainSubscribers(
+                subscribers,
+                abi.encodeCall(Interface_Subscriber.onNotify, (data)),
+                0,
+                numSubscribers,
+                m_incentiveWei / numSubscribers
+            );
+        }
+
+        // 5. Release the entrance lock
+        m_entranceLock = false;
+
+        // 6. emit the event for off-chain subscribers
+        emit NotifySubscribers(msg.sender, topic, seqNum, data);
+    }
+
+    /**
+     * Notify all subscribers of the default topic with only the hash of the
+     * data; the full data is emitted for off-chain readers
+     * @param data The data to publish
+     * @dev The immediate caller must be a publisher. On-chain subscribers
+     *      receive onNotifyHash(keccak256(data), seqNum), so the cost per
+     *      subscriber does not depend on the size of the data; those that
+     *      need the data can check a later submission against the hash
+     */
+    function notifySubscribersHash(bytes calldata data) external {
         // 1. Make sure the entrance lock is free
         require(
             !m_entranceLock,
@@ -158,16 +630,251 @@ contract EventManager {
             "Only registered publisher can notify"
         );
 
-        // 3. notify all on-chain subscribers if there is any
-        if (m_subscriberAddrs.length > 0) {
-            notifyOnChainSubscribers(data);
+        // 3. Messages must be delivered in order
+        require(
+            m_pending.dataHash == bytes32(0),
+            "Delivery in progress"
+        );
+
+        // 4. notify all on-chain subscribers if there is any
+        uint64 seqNum = ++m_seqNum;
+        SubscriberRecord[] storage subscribers =
+            m_topicSubscribers[DEFAULT_TOPIC];
+        uint256 numSubscribers = subscribers.length;
+        if (numSubscribers > 0) {
+            requireTopicBudgetGas(DEFAULT_TOPIC);
+            notifyOnChainSubscribers(
+                subscribers,
+                abi.encodeCall(
+                    Interface_Subscriber.onNotifyHash,
+                    (keccak256(data), seqNum)
+                ),
+                0,
+                numSubscribers,
+                m_incentiveWei / numSubscribers
+            );
         }
 
-        // 4. Release the entrance lock
+        // 5. Release the entrance lock
         m_entranceLock = false;
 
+        // 6. emit the event for off-chain subscribers
+        emit NotifySubscribers(msg.sender, DEFAULT_TOPIC, seqNum, data);
+    }
+
+    /**
+     * Post a message to the inbox, for subscribers to pull with getMessage
+     * @param data The data to publish
+     * @dev The immediate caller must be a publisher. Nobody is called, so
+     *      the cost does not depend on the number of subscribers; readers
+     *      pay for their own reads. Only the latest INBOX_CAPACITY messages
+     *      are kept
+     */
+    function postMessage(bytes calldata data) external {
+        // 1. Make sure the entrance lock is free
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+
+        // 2. Make sure the caller is a publisher
+        require(
+            m_publisherMap[msg.sender],
+            "Only registered publisher can notify"
+        );
+
+        // 3. Messages must be delivered in order
+        require(
+            m_pending.dataHash == bytes32(0),
+            "Delivery in progress"
+        );
+
+        // 4. overwrite the oldest message in the ring buffer
+        uint64 seqNum = ++m_seqNum;
+        InboxMessage storage message = m_inbox[seqNum % INBOX_CAPACITY];
+        message.seqNum = seqNum;
+        message.data   = data;
+
         // 5. emit the event for off-chain subscribers
-        emit NotifySubscribers(data);
+        emit NotifySubscribers(msg.sender, DEFAULT_TOPIC, seqNum, data);
+    }
+
+    /**
+     * Get a message from the inbox
+     * @param seqNum The sequence number of the message
+     * @return bytes The data of the message
+     * @dev Fails if the message was not posted to the inbox (e.g. it was
+     *      pushed to subscribers instead) or has been overwritten
+     */
+    function getMessage(uint256 seqNum) external view returns (bytes memory) {
+        InboxMessage storage message = m_inbox[seqNum % INBOX_CAPACITY];
+        require(
+            (seqNum != 0) && (message.seqNum == seqNum),
+            "Message is not available"
+        );
+        return message.data;
+    }
+
+    /**
+     * Post a message to the default topic whose on-chain delivery is
+     * spread across multiple transactions, driven by continueNotify
+     * @param data The data to send to the subscribers
+     * @dev The immediate caller must be a publisher. Only the hash of the
+     *      data is stored; relayers resubmit the data to continueNotify.
+     *      No subscriber can be added until the delivery is finished or
+     *      cancelled
+     */
+    function beginNotify(bytes calldata data) external {
+        // 1. Make sure the entrance lock is free
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+
+        // 2. Make sure the caller is a publisher
+        require(
+            m_publisherMap[msg.sender],
+            "Only registered publisher can notify"
+        );
+
+        // 3. Messages must be delivered in order
+        require(
+            m_pending.dataHash == bytes32(0),
+            "Delivery in progress"
+        );
+
+        // 4. record the pending delivery for the current subscribers, and
+        //    fix the incentive over all of them; no subscriber can be added
+        //    until the delivery finishes or is cancelled
+        uint64 seqNum = ++m_seqNum;
+        uint256 numSubscribers = m_topicSubscribers[DEFAULT_TOPIC].length;
+        if (numSubscribers > 0) {
+            m_pending = PendingDelivery({
+                dataHash:        keccak256(data),
+                cursor:          0,
+                end:             uint64(numSubscribers),
+                expiryBlock:     uint64(block.number + PENDING_EXPIRY_BLOCKS),
+                incentPerSubWei: m_incentiveWei / numSubscribers
+            });
+        }
+
+        // 5. emit the event for off-chain subscribers
+        emit NotifySubscribers(msg.sender, DEFAULT_TOPIC, seqNum, data);
+    }
+
+    /**
+     * Deliver the pending message to the next slice of subscribers, and
+     * reimburse the sender for this slice
+     * @param data The data of the pending message
+     * @param maxCount The maximum number of subscribers to notify
+     * @dev Anyone can call this function
+     */
+    function continueNotify(bytes calldata data, uint256 maxCount)
+        external
+    {
+        // 1. Make sure the entrance lock is free
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+        m_entranceLock = true;
+
+        // 2. Make sure there is a pending delivery for this data
+        PendingDelivery memory pending = m_pending;
+        require(
+            pending.dataHash != bytes32(0),
+            "No pending delivery"
+        );
+        require(
+            keccak256(data) == pending.dataHash,
+            "Data does not match pending delivery"
+        );
+        require(maxCount > 0, "Count must be positive");
+
+        // 3. notify the next slice of subscribers; the incentive is split
+        //    over all recipients of the message, as in notifySubscribers,
+        //    as it was when the message was posted
+        SubscriberRecord[] storage subscribers =
+            m_topicSubscribers[DEFAULT_TOPIC];
+        uint256 remaining = pending.end - pending.cursor;
+        uint256 endIdx = notifyOnChainSubscribers(
+            subscribers,
+            abi.encodeCall(Interface_Subscriber.onNotify, (data)),
+            pending.cursor,
+            pending.cursor + (maxCount > remaining ? remaining : maxCount),
+            pending.incentPerSubWei
+        );
+
+        // 4. advance the cursor, or finish the delivery; parked subscribers
+        //    may have shrunk the active set below the recorded end (the
+        //    last records take their places, and nobody can join meanwhile,
+        //    so the range only ever holds the original recipients)
+        uint256 pendingEnd = pending.end > subscribers.length ?
+            subscribers.length : uint256(pending.end);
+        if (endIdx >= pendingEnd) {
+            delete m_pending;
+        } else {
+            m_pending.cursor = uint64(endIdx);
+            m_pending.end    = uint64(pendingEnd);
+        }
+
+        // 5. Release the entrance lock
+        m_entranceLock = false;
+    }
+
+    /**
+     * Drop the pending multi-transaction delivery, so publishing and
+     * unsubscribing can resume; subscribers not notified yet miss the
+     * message on chain
+     * @dev A publisher can cancel at any time; anyone else only once the
+     *      delivery has expired, so a delivery nobody finishes cannot lock
+     *      the event manager forever
+     */
+    function cancelNotify() external {
+        // 1. Make sure the entrance lock is free
+        require(
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+
+        // 2. Make sure there is a pending delivery
+        require(
+            m_pending.dataHash != bytes32(0),
+            "No pending delivery"
+        );
+
+        // 3. check that the caller is allowed to cancel it
+        require(
+            m_publisherMap[msg.sender] ||
+                (block.number > m_pending.expiryBlock),
+            "Only a publisher can cancel before expiry"
+        );
+
+        // 4. drop the delivery
+        delete m_pending;
+    }
+
+    /**
+     * Get the state of the pending multi-transaction delivery
+     * @return dataHash The hash of the pending message (zero if none)
+     * @return cursor The index of the next subscriber to notify
+     * @return end The number of subscribers to notify in total
+     */
+    function getPendingDelivery()
+        external
+        view
+        returns (bytes32 dataHash, uint256 cursor, uint256 end)
+    {
+        return (m_pending.dataHash, m_pending.cursor, m_pending.end);
+    }
+
+    /**
+     * Get the sequence number of the latest message
+     * @return uint256 The sequence number; the first message is number 1,
+     *                 and 0 means nothing has been published
+     */
+    function getSeqNum() external view returns (uint256) {
+        return m_seqNum;
     }
 
     /**
@@ -175,14 +882,51 @@ contract EventManager {
      * @param subscriber The address of the subscriber
      */
     function subscriberAddBalance(address subscriber) external payable {
-        // 1. check that the subscriber has been added
+        // 1. the list must not change while subscribers are being notified
         require(
-            m_subscriberMap[subscriber].init,
+            !m_entranceLock,
+            "Entrance lock is engaged"
+        );
+
+        // 2. check that the subscriber has been added
+        MappedSubscriber memory mapped = m_subscriberMap[subscriber];
+        require(
+            mapped.init,
             "Subscriber is not found"
         );
 
-        // 2. add the balance to the subscriber
-        m_subscriberMap[subscriber].balanceWei += msg.value;
+        // 3. add the balance to the subscriber
+        if (mapped.active) {
+            SubscriberRecord storage record =
+                m_topicSubscribers[mapped.topic][mapped.index];
+            uint256 balanceWei = record.balanceWei + msg.value;
+            require(
+                balanceWei <= type(uint72).max,
+                "Balance overflow"
+            );
+            record.balanceWei = uint72(balanceWei);
+        } else {
+            // a parked subscriber goes back to the active set, with its
+            // budget cut down if the owner has lowered the limit since;
+            // like a new subscriber, it must wait for a pending delivery
+            require(
+                m_pending.dataHash == bytes32(0),
+                "Delivery in progress"
+            );
+            uint256 balanceWei = mapped.parkedBalanceWei + msg.value;
+            require(
+                balanceWei <= type(uint72).max,
+                "Balance overflow"
+            );
+            removeParkedAddr(mapped.index);
+            activateSubscriber(
+                subscriber,
+                mapped.topic,
+                uint72(balanceWei),
+                mapped.parkedGasBudget > m_perSubLimitGas ?
+                    uint24(m_perSubLimitGas) : mapped.parkedGasBudget
+            );
+        }
     }
 
     /**
@@ -202,7 +946,178 @@ contract EventManager {
         );
 
         // 2. return the balance of the subscriber
-        return m_subscriberMap[subscriber].balanceWei;
+        MappedSubscriber memory mapped = m_subscriberMap[subscriber];
+        return mapped.active ?
+            m_topicSubscribers[mapped.topic][mapped.index].balanceWei :
+            mapped.parkedBalanceWei;
+    }
+
+    /**
+     * Check the gas budget of a subscriber
+     * @param subscriber The address of the subscriber
+     * @return uint256 The gas limit on each onNotify call to the subscriber
+     */
+    function subscriberCheckGasBudget(address subscriber)
+        external
+        view
+        returns(uint256)
+    {
+        // 1. check that the subscriber has been added
+        require(
+            m_subscriberMap[subscriber].init,
+            "Subscriber is not found"
+        );
+
+        // 2. return the gas budget of the subscriber
+        MappedSubscriber memory mapped = m_subscriberMap[subscriber];
+        return mapped.active ?
+            m_topicSubscribers[mapped.topic][mapped.index].gasBudget :
+            mapped.parkedGasBudget;
+    }
+
+    /**
+     * Get the gas a publish to a topic needs for its subscribers
+     * @param topic The topic (0 is the default topic)
+     * @return uint256 The sum of the gas budgets of the active subscribers
+     *                 of the topic, plus the cost of finishing the publish
+     * @dev The transaction also needs gas for its own execution (calldata,
+     *      encoding, and the per-subscriber bookkeeping)
+     */
+    function getTopicGasBudget(uint64 topic) external view returns (uint256) {
+        return m_topicBudgetGas[topic] + FINISHING_COST_GAS;
+    }
+
+    /**
+     * Get the number of active subscribers of a topic
+     * @param topic The topic (0 is the default topic)
+     * @return uint256 The number of active subscribers of the topic
+     */
+    function getSubscriberCount(uint64 topic)
+        external
+        view
+        returns (uint256)
+    {
+        return m_topicSubscribers[topic].length;
+    }
+
+    /**
+     * Get the number of parked subscribers (of all topics)
+     * @return uint256 The number of subscribers whose balance ran too low
+     *                 to be notified
+     */
+    function getParkedCount() external view returns (uint256) {
+        return m_parkedAddrs.length;
+    }
+
+    /**
+     * Get a page of the active subscribers of a topic
+     * @param topic The topic (0 is the default topic)
+     * @param offset The position of the first subscriber of the page
+     * @param limit The maximum number of subscribers in the page
+     * @return subscriberAddrs The addresses of the subscribers; fewer than
+     *                         limit at the end of the list
+     * @dev Removing or parking a subscriber moves the last one of the list
+     *      into its position, so a scan across pages should read every
+     *      page at the same block
+     */
+    function getSubscribers(uint64 topic, uint256 offset, uint256 limit)
+        external
+        view
+        returns (address[] memory subscriberAddrs)
+    {
+        SubscriberRecord[] storage subscribers = m_topicSubscribers[topic];
+        uint256 count = pageCount(subscribers.length, offset, limit);
+
+        subscriberAddrs = new address[](count);
+        for (uint256 i = 0; i < count; ++i) {
+            subscriberAddrs[i] = subscribers[offset + i].addr;
+        }
+    }
+
+    /**
+     * Get a page of the active subscribers of a topic, with their balances
+     * @param topic The topic (0 is the default topic)
+     * @param offset The position of the first subscriber of the page
+     * @param limit The maximum number of subscribers in the page
+     * @return subscriberAddrs The addresses of the subscribers
+     * @return balancesWei The balance of each subscriber
+     * @dev Each subscriber is a single SLOAD, since its address and balance
+     *      share a storage slot
+     */
+    function getSubscriberRecords(
+        uint64 topic,
+        uint256 offset,
+        uint256 limit
+    )
+        external
+        view
+        returns (
+            address[] memory subscriberAddrs,
+            uint256[] memory balancesWei
+        )
+    {
+        SubscriberRecord[] storage subscribers = m_topicSubscribers[topic];
+        uint256 count = pageCount(subscribers.length, offset, limit);
+
+        subscriberAddrs = new address[](count);
+        balancesWei = new uint256[](count);
+        for (uint256 i = 0; i < count; ++i) {
+            SubscriberRecord memory record = subscribers[offset + i];
+            subscriberAddrs[i] = record.addr;
+            balancesWei[i] = record.balanceWei;
+        }
+    }
+
+    /**
+     * Get a page of the parked subscribers, with their balances
+     * @param offset The position of the first subscriber of the page
+     * @param limit The maximum number of subscribers in the page
+     * @return subscriberAddrs The addresses of the subscribers
+     * @return balancesWei The balance of each subscriber
+     */
+    function getParkedRecords(uint256 offset, uint256 limit)
+        external
+        view
+        returns (
+            address[] memory subscriberAddrs,
+            uint256[] memory balancesWei
+        )
+    {
+        uint256 count = pageCount(m_parkedAddrs.length, offset, limit);
+
+        subscriberAddrs = new address[](count);
+        balancesWei = new uint256[](count);
+        for (uint256 i = 0; i < count; ++i) {
+            address subscriberAddr = m_parkedAddrs[offset + i];
+            subscriberAddrs[i] = subscriberAddr;
+            balancesWei[i] = m_subscriberMap[subscriberAddr].parkedBalanceWei;
+        }
+    }
+
+    /**
+     * Check the balances of many subscribers at once
+     * @param subscriberAddrs The addresses of the subscribers
+     * @return balancesWei The balance of each subscriber, active or parked
+     * @dev Unlike subscriberCheckBalance, an address that is not a
+     *      subscriber does not fail the call; its balance is 0
+     */
+    function balancesOf(address[] calldata subscriberAddrs)
+        external
+        view
+        returns (uint256[] memory balancesWei)
+    {
+        balancesWei = new uint256[](subscriberAddrs.length);
+        for (uint256 i = 0; i < subscriberAddrs.length; ++i) {
+            MappedSubscriber memory mapped =
+                m_subscriberMap[subscriberAddrs[i]];
+            if (mapped.active) {
+                balancesWei[i] =
+                    m_topicSubscribers[mapped.topic][mapped.index].balanceWei;
+            } else {
+                // also 0 for an address that has not been added
+                balancesWei[i] = mapped.parkedBalanceWei;
+            }
+        }
     }
 
     /**
@@ -242,7 +1157,10 @@ contract EventManager {
     }
 
     /**
-     * Set the per subscriber minimum gas limit on the notifying call
+     * Set the default gas budget of subscribers that don't declare one,
+     * which is also the most a subscriber can declare
+     * @dev Active subscribers keep their budgets; parked ones are cut down
+     *      to the new limit when they return
      */
     function setPerSubscriberLimitGas(uint256 limitGas) external {
         // 1. check that the caller is the owner
@@ -251,7 +1169,13 @@ contract EventManager {
             "Only the owner can set the limit"
         );
 
-        // 2. set the limit
+        // 2. check that the limit fits in the packed budget field
+        require(
+            limitGas <= type(uint24).max,
+            "Limit is too large"
+        );
+
+        // 3. set the limit
         m_perSubLimitGas = limitGas;
     }
 
@@ -5,17 +5,155 @@ pragma solidity ^0.8.17;
 interface Interface_EventManager {
 
     /**
-     * Add a subscriber to the list of subscribers
+     * Initialize a minimal-proxy (EIP-1167) clone of the EventManager, in
+     * place of the constructor
+     * @param owner The owner of the event manager
+     * @dev The PubSubService that created the clone must call this function
+     *      in the same transaction. It can only be called once
+     */
+    function initialize(address owner) external;
+
+    /**
+     * Add a subscriber to the list of subscribers of the default topic
      * @param subscriberAddr The address of the subscriber
      */
     function addSubscriber(address subscriberAddr) external payable;
 
     /**
-     * Notify all subscribers
+     * Add a subscriber to the list of subscribers of a topic
+     * @param subscriberAddr The address of the subscriber
+     * @param topic The topic to subscribe to; the subscriber is only
+     *              notified of messages published to this topic
+     */
+    function addSubscriber(address subscriberAddr, uint64 topic)
+        external
+        payable;
+
+    /**
+     * Add a subscriber, with its own gas budget, to the list of subscribers
+     * of a topic
+     * @param subscriberAddr The address of the subscriber
+     * @param topic The topic to subscribe to (0 is the default topic)
+     * @param gasBudget The gas limit on each onNotify call to the
+     *                  subscriber; 0 picks the default of this event
+     *                  manager, which is also the most it accepts
+     * @dev Publishers have to supply the sum of the budgets of a topic's
+     *      subscribers, so a low budget lets more subscribers fit in a
+     *      publish transaction; a notification that runs out of its budget
+     *      fails, but is still paid for
+     */
+    function addSubscriber(
+        address subscriberAddr,
+        uint64 topic,
+        uint256 gasBudget
+    )
+        external
+        payable;
+
+    /**
+     * Remove a subscriber from the list of subscribers and refund its
+     * remaining balance
+     * @param subscriberAddr The address of the subscriber
+     * @return uint256 The amount of Wei refunded to the subscriber
+     * @dev The caller must be the subscriber itself, or the PubSubService
+     *      acting on behalf of the subscriber
+     */
+    function removeSubscriber(address subscriberAddr)
+        external
+        returns (uint256);
+
+    /**
+     * Notify all subscribers of the default topic
      * @param data The data to send to the subscribers
      * @dev The immediate caller must be a publisher
      */
-    function notifySubscribers(bytes memory data) external;
+    function notifySubscribers(bytes calldata data) external;
+
+    /**
+     * Notify the subscribers of a topic
+     * @param topic The topic of the message; only its subscribers are called
+     * @param data The data to send to the subscribers
+     * @dev The immediate caller must be a publisher
+     */
+    function notifySubscribers(uint64 topic, bytes calldata data) external;
+
+    /**
+     * Notify all subscribers of the default topic with only the hash of the
+     * data; the full data is emitted for off-chain readers
+     * @param data The data to publish
+     * @dev The immediate caller must be a publisher. On-chain subscribers
+     *      receive onNotifyHash(keccak256(data), seqNum), so the cost per
+     *      subscriber does not depend on the size of the data; those that
+     *      need the data can check a later submission against the hash
+     */
+    function notifySubscribersHash(bytes calldata data) external;
+
+    /**
+     * Post a message to the inbox, for subscribers to pull with getMessage
+     * @param data The data to publish
+     * @dev The immediate caller must be a publisher. Nobody is called, so
+     *      the cost does not depend on the number of subscribers; readers
+     *      pay for their own reads. Only the latest 64 messages are kept
+     */
+    function postMessage(bytes calldata data) external;
+
+    /**
+     * Get a message from the inbox
+     * @param seqNum The sequence number of the message
+     * @return bytes The data of the message
+     * @dev Fails if the message was not posted to the inbox (e.g. it was
+     *      pushed to subscribers instead) or has been overwritten
+     */
+    function getMessage(uint256 seqNum) external view returns (bytes memory);
+
+    /**
+     * Post a message to the default topic whose on-chain delivery is
+     * spread across multiple transactions, driven by continueNotify
+     * @param data The data to send to the subscribers
+     * @dev The immediate caller must be a publisher. Only the hash of the
+     *      data is stored; relayers resubmit the data to continueNotify.
+     *      No subscriber can be added until the delivery is finished or
+     *      cancelled
+     */
+    function beginNotify(bytes calldata data) external;
+
+    /**
+     * Deliver the pending message to the next slice of subscribers, and
+     * reimburse the sender for this slice
+     * @param data The data of the pending message
+     * @param maxCount The maximum number of subscribers to notify
+     * @dev Anyone can call this function
+     */
+    function continueNotify(bytes calldata data, uint256 maxCount)
+        external;
+
+    /**
+     * Drop the pending multi-transaction delivery, so publishing and
+     * unsubscribing can resume; subscribers not notified yet miss the
+     * message on chain
+     * @dev A publisher can cancel at any time; anyone else only once the
+     *      delivery has expired, so a delivery nobody finishes cannot lock
+     *      the event manager forever
+     */
+    function cancelNotify() external;
+
+    /**
+     * Get the state of the pending multi-transaction delivery
+     * @return dataHash The hash of the pending message (zero if none)
+     * @return cursor The index of the next subscriber to notify
+     * @return end The number of subscribers to notify in total
+     */
+    function getPendingDelivery()
+        external
+        view
+        returns (bytes32 dataHash, uint256 cursor, uint256 end);
+
+    /**
+     * Get the sequence number of the latest message
+     * @return uint256 The sequence number; the first message is number 1,
+     *                 and 0 means nothing has been published
+     */
+    function getSeqNum() external view returns (uint256);
 
     /**
      * Make deposit to a subscriber's balance
@@ -33,6 +171,103 @@ interface Interface_EventManager {
         view
         returns(uint256);
 
+    /**
+     * Check the gas budget of a subscriber
+     * @param subscriber The address of the subscriber
+     * @return uint256 The gas limit on each onNotify call to the subscriber
+     */
+    function subscriberCheckGasBudget(address subscriber)
+        external
+        view
+        returns(uint256);
+
+    /**
+     * Get the gas a publish to a topic needs for its subscribers
+     * @param topic The topic (0 is the default topic)
+     * @return uint256 The sum of the gas budgets of the active subscribers
+     *                 of the topic, plus the cost of finishing the publish
+     * @dev The transaction also needs gas for its own execution (calldata,
+     *      encoding, and the per-subscriber bookkeeping)
+     */
+    function getTopicGasBudget(uint64 topic) external view returns (uint256);
+
+    /**
+     * Get the number of active subscribers of a topic
+     * @param topic The topic (0 is the default topic)
+     * @return uint256 The number of active subscribers of the topic
+     */
+    function getSubscriberCount(uint64 topic) external view returns (uint256);
+
+    /**
+     * Get the number of parked subscribers (of all topics)
+     * @return uint256 The number of subscribers whose balance ran too low
+     *                 to be notified
+     */
+    function getParkedCount() external view returns (uint256);
+
+    /**
+     * Get a page of the active subscribers of a topic
+     * @param topic The topic (0 is the default topic)
+     * @param offset The position of the first subscriber of the page
+     * @param limit The maximum number of subscribers in the page
+     * @return subscriberAddrs The addresses of the subscribers; fewer than
+     *                         limit at the end of the list
+     * @dev Removing or parking a subscriber moves the last one of the list
+     *      into its position, so a scan across pages should read every
+     *      page at the same block
+     */
+    function getSubscribers(uint64 topic, uint256 offset, uint256 limit)
+        external
+        view
+        returns (address[] memory subscriberAddrs);
+
+    /**
+     * Get a page of the active subscribers of a topic, with their balances
+     * @param topic The topic (0 is the default topic)
+     * @param offset The position of the first subscriber of the page
+     * @param limit The maximum number of subscribers in the page
+     * @return subscriberAddrs The addresses of the subscribers
+     * @return balancesWei The balance of each subscriber
+     */
+    function getSubscriberRecords(
+        uint64 topic,
+        uint256 offset,
+        uint256 limit
+    )
+        external
+        view
+        returns (
+            address[] memory subscriberAddrs,
+            uint256[] memory balancesWei
+        );
+
+    /**
+     * Get a page of the parked subscribers, with their balances
+     * @param offset The position of the first subscriber of the page
+     * @param limit The maximum number of subscribers in the page
+     * @return subscriberAddrs The addresses of the subscribers
+     * @return balancesWei The balance of each subscriber
+     */
+    function getParkedRecords(uint256 offset, uint256 limit)
+        external
+        view
+        returns (
+            address[] memory subscriberAddrs,
+            uint256[] memory balancesWei
+        );
+
+    /**
+     * Check the balances of many subscribers at once
+     * @param subscriberAddrs The addresses of the subscribers
+     * @return balancesWei The balance of each subscriber, active or parked
+     * @dev Unlike subscriberCheckBalance, an address that is not a
+     *      subscriber does not fail the call; its balance is 0
+     */
+    function balancesOf(address[] calldata subscriberAddrs)
+        external
+        view
+        returns (uint256[] memory balancesWei);
+
     /**
      * This function allows the owner to update the incentive value after
      * the contract has been deployed
@@ -49,7 +284,10 @@ interface Interface_EventManager {
     function addPublisher(address publisherAddr) external;
 
     /**
-     * Set the per subscriber minimum gas limit on the notifying call
+     * Set the default gas budget of subscribers that don't declare one,
+     * which is also the most a subscriber can declare
+     * @dev Active subscribers keep their budgets; parked ones are cut down
+     *      to the new limit when they return
      */
     function setPerSubscriberLimitGas(uint256 limitGas) external;
 }
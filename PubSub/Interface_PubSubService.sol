@@ -2,6 +2,12 @@
 pragma solidity ^0.8.17;
 
 
+interface Interface_Publisher {
+    // the account allowed to register this publisher via registerMany
+    function pubSubRegistrar() external view returns (address);
+}
+
+
 interface Interface_PubSubService {
 
     /**
@@ -12,6 +18,32 @@ interface Interface_PubSubService {
      */
     function register() external returns (address);
 
+    /**
+     * Register a publisher with the PubSubService and spawn a minimal-proxy
+     * (EIP-1167) clone of the EventManager implementation for it
+     * @return address The address of the newly created EventManager clone
+     * @dev The publisher contract must call this function to register.
+     *      Registering this way is much cheaper than register, but every
+     *      call to the clone pays for an extra delegatecall
+     */
+    function registerClone() external returns (address);
+
+    /**
+     * Register multiple publishers in one transaction, spawning an
+     * EventManager clone (see registerClone) owned by each of them
+     * @param publisherAddrs The addresses of the publishers
+     * @return eventMgrAddrs The addresses of the new EventManager clones
+     * @dev Every publisher must name the caller as its registrar (see
+     *      Interface_Publisher), e.g. the deployer setting up many
+     *      publisher contracts. Since the caller is not the publisher, a
+     *      publisher registered this way has to look up its EventManager
+     *      via getEventManagerAddr; the EventManager is still owned by the
+     *      publisher alone
+     */
+    function registerMany(address[] calldata publisherAddrs)
+        external
+        returns (address[] memory eventMgrAddrs);
+
     /**
      * Subscribe a subscriber to a publisher's event manager
      * @param publisherAddr The address of the publisher
@@ -23,6 +55,66 @@ interface Interface_PubSubService {
         payable
         returns (address);
 
+    /**
+     * Subscribe a subscriber to a topic of a publisher's event manager
+     * @param publisherAddr The address of the publisher
+     * @param topic The topic to subscribe to (0 is the default topic)
+     * @return address The address of the EventManager contract
+     * @dev The subscriber contract must call this function to subscribe
+     */
+    function subscribe(address publisherAddr, uint64 topic)
+        external
+        payable
+        returns (address);
+
+    /**
+     * Subscribe a subscriber, with its own gas budget, to a topic of a
+     * publisher's event manager
+     * @param publisherAddr The address of the publisher
+     * @param topic The topic to subscribe to (0 is the default topic)
+     * @param gasBudget The gas limit on each onNotify call to the
+     *                  subscriber, at most the event manager's default;
+     *                  0 picks the default
+     * @return address The address of the EventManager contract
+     * @dev The subscriber contract must call this function to subscribe
+     */
+    function subscribe(
+        address publisherAddr,
+        uint64 topic,
+        uint256 gasBudget
+    )
+        external
+        payable
+        returns (address);
+
+    /**
+     * Subscribe a subscriber to multiple publishers' event managers in one
+     * transaction
+     * @param publisherAddrs The addresses of the publishers
+     * @param deposits The deposit (in Wei) for each publisher's event
+     *                 manager; they must add up to msg.value
+     * @return eventMgrAddrs The addresses of the EventManager contracts
+     * @dev The subscriber contract must call this function to subscribe
+     */
+    function subscribeMany(
+        address[] calldata publisherAddrs,
+        uint256[] calldata deposits
+    )
+        external
+        payable
+        returns (address[] memory eventMgrAddrs);
+
+    /**
+     * Unsubscribe a subscriber from a publisher's event manager
+     * @param publisherAddr The address of the publisher
+     * @return uint256 The amount of Wei refunded to the subscriber
+     * @dev The subscriber contract must call this function to unsubscribe,
+     *      and it must be able to receive the refund
+     */
+    function unsubscribe(address publisherAddr)
+        external
+        returns (uint256);
+
     /**
      * Get the EventManager contract address for a publisher
      * @param publisherAddr The address of the publisher
@@ -32,4 +124,11 @@ interface Interface_PubSubService {
         external
         view
         returns (address);
+
+    /**
+     * Get the EventManager implementation behind the clones spawned by
+     * registerClone
+     * @return address The address of the EventManager implementation
+     */
+    function getEventManagerImpl() external view returns (address);
 }
@@ -3,6 +3,7 @@ pragma solidity ^0.8.17;
 
 // Import EventManager Code
 import {EventManager} from "./EventManager.sol";
+import {Interface_Publisher} from "./Interface_PubSubService.sol";
 
 
 contract PubSubService {
@@ -18,6 +19,11 @@ contract PubSubService {
 
     mapping(address => MappedEventManager) m_eventManagerMap;
 
+    // the EventManager implementation behind the minimal-proxy clones
+    // spawned by registerClone; it is initialized by its own constructor,
+    // so it can never be initialized (taken over) through initialize
+    address m_eventMgrImpl;
+
     //===== Events =====
 
     event ServiceDeployed(address indexed serviceAddr);
@@ -26,6 +32,8 @@ contract PubSubService {
     //===== Constructor =====
 
     constructor() {
+        m_eventMgrImpl = address(new EventManager(address(this)));
+
         emit ServiceDeployed(address(this));
     }
 
@@ -51,19 +59,54 @@ contract PubSubService {
         EventManager eventMgrInst = new EventManager(publisherAddr);
         address eventMgrAddr = address(eventMgrInst);
 
-        // 4. update the mapping
-        m_eventManagerMap[publisherAddr] = MappedEventManager({
-            init: true,
-            addr: eventMgrAddr
-        });
-
-        // 5. emit event
-        emit PublisherRegistered(publisherAddr, eventMgrAddr);
+        // 4. update the mapping and emit event
+        recordEventManager(publisherAddr, eventMgrAddr);
 
-        // 6. return the EventManager contract address
+        // 5. return the EventManager contract address
         return eventMgrAddr;
     }
 
+    /**
+     * Register a publisher with the PubSubService and spawn a minimal-proxy
+     * (EIP-1167) clone of the EventManager implementation for it
+     * @return address The address of the newly created EventManager clone
+     * @dev The publisher contract must call this function to register.
+     *      Registering this way is much cheaper than register, but every
+     *      call to the clone pays for an extra delegatecall
+     */
+    function registerClone() external returns (address) {
+        return registerCloneFor(msg.sender);
+    }
+
+    /**
+     * Register multiple publishers in one transaction, spawning an
+     * EventManager clone (see registerClone) owned by each of them
+     * @param publisherAddrs The addresses of the publishers
+     * @return eventMgrAddrs The addresses of the new EventManager clones
+     * @dev Every publisher must name the caller as its registrar (see
+     *      Interface_Publisher), e.g. the deployer setting up many
+     *      publisher contracts. Since the caller is not the publisher, a
+     *      publisher registered this way has to look up its EventManager
+     *      via getEventManagerAddr; the EventManager is still owned by the
+     *      publisher alone
+     */
+    function registerMany(address[] calldata publisherAddrs)
+        external
+        returns (address[] memory eventMgrAddrs)
+    {
+        eventMgrAddrs = new address[](publisherAddrs.length);
+        for (uint256 i = 0; i < publisherAddrs.length; ++i) {
+            // the publisher must have agreed to be registered by the caller
+            require(
+                Interface_Publisher(
+                    publisherAddrs[i]
+                ).pubSubRegistrar() == msg.sender,
+                "Caller is not the publisher's registrar"
+            );
+            eventMgrAddrs[i] = registerCloneFor(publisherAddrs[i]);
+        }
+    }
+
     /**
      * Subscribe a subscriber to a publisher's event manager
      * @param publisherAddr The address of the publisher
@@ -74,6 +117,108 @@ contract PubSubService {
         external
         payable
         returns (address)
+    {
+        return subscribeTo(publisherAddr, 0, 0, msg.sender, msg.value);
+    }
+
+    /**
+     * Subscribe a subscriber to a topic of a publisher's event manager
+     * @param publisherAddr The address of the publisher
+     * @param topic The topic to subscribe to (0 is the default topic)
+     * @return address The address of the EventManager contract
+     * @dev The subscriber contract must call this function to subscribe
+     */
+    function subscribe(address publisherAddr, uint64 topic)
+        external
+        payable
+        returns (address)
+    {
+        return subscribeTo(publisherAddr, topic, 0, msg.sender, msg.value);
+    }
+
+    /**
+     * Subscribe a subscriber, with its own gas budget, to a topic of a
+     * publisher's event manager
+     * @param publisherAddr The address of the publisher
+     * @param topic The topic to subscribe to (0 is the default topic)
+     * @param gasBudget The gas limit on each onNotify call to the
+     *                  subscriber, at most the event manager's default;
+     *                  0 picks the default
+     * @return address The address of the EventManager contract
+     * @dev The subscriber contract must call this function to subscribe
+     */
+    function subscribe(
+        address publisherAddr,
+        uint64 topic,
+        uint256 gasBudget
+    )
+        external
+        payable
+        returns (address)
+    {
+        return subscribeTo(
+            publisherAddr,
+            topic,
+            gasBudget,
+            msg.sender,
+            msg.value
+        );
+    }
+
+    /**
+     * Subscribe a subscriber to multiple publishers' event managers in one
+     * transaction
+     * @param publisherAddrs The addresses of the publishers
+     * @param deposits The deposit (in Wei) for each publisher's event
+     *                 manager; they must add up to msg.value
+     * @return eventMgrAddrs The addresses of the EventManager contracts
+     * @dev The subscriber contract must call this function to subscribe
+     */
+    function subscribeMany(
+        address[] calldata publisherAddrs,
+        uint256[] calldata deposits
+    )
+        external
+        payable
+        returns (address[] memory eventMgrAddrs)
+    {
+        // 1. every publisher must come with a deposit
+        require(
+            publisherAddrs.length == deposits.length,
+            "Publishers and deposits length mismatch"
+        );
+
+        // 2. the deposits must add up to the value sent, so no value is
+        //    left behind in this contract
+        uint256 totalWei = 0;
+        for (uint256 i = 0; i < deposits.length; ++i) {
+            totalWei += deposits[i];
+        }
+        require(totalWei == msg.value, "Deposits do not add up to the value");
+
+        // 3. subscribe to each publisher
+        eventMgrAddrs = new address[](publisherAddrs.length);
+        for (uint256 i = 0; i < publisherAddrs.length; ++i) {
+            eventMgrAddrs[i] = subscribeTo(
+                publisherAddrs[i],
+                0,
+                0,
+                msg.sender,
+                deposits[i]
+            );
+        }
+    }
+
+    /**
+     * Unsubscribe a subscriber from a publisher's event manager
+     * @param publisherAddr The address of the publisher
+     * @return uint256 The amount of Wei refunded to the subscriber
+     * @dev The subscriber contract must call this function to unsubscribe,
+     *      and it must be able to receive the refund
+     */
+    function unsubscribe(address publisherAddr)
+        external
+        returns (uint256)
     {
         // 1. make sure the publisher has already registered
         require(
@@ -81,17 +226,11 @@ contract PubSubService {
             "Publisher not registered"
         );
 
-        // 2. get the EventManager contract address
-        address eventMgrAddr = m_eventManagerMap[publisherAddr].addr;
-        address subscriberAddr = msg.sender;
-
-        // 3. add the subscriber to the event manager
-        EventManager(eventMgrAddr).addSubscriber{
-            value: msg.value
-        }(subscriberAddr);
-
-        // 4. return the EventManager contract address
-        return eventMgrAddr;
+        // 2. remove the subscriber from the event manager, which refunds
+        //    the remaining balance directly to the subscriber
+        return EventManager(
+            m_eventManagerMap[publisherAddr].addr
+        ).removeSubscriber(msg.sender);
     }
 
     /**
@@ -114,4 +253,110 @@ contract PubSubService {
         return m_eventManagerMap[publisherAddr].addr;
     }
 
+    /**
+     * Get the EventManager implementation behind the clones spawned by
+     * registerClone
+     * @return address The address of the EventManager implementation
+     */
+    function getEventManagerImpl() external view returns (address) {
+        return m_eventMgrImpl;
+    }
+
+    //===== private Functions =====
+
+    /**
+     * Register a publisher with a new EventManager clone
+     */
+    function registerCloneFor(address publisherAddr)
+        private
+        returns (address)
+    {
+        // 1. make sure the publisher has not already registered
+        require(
+            m_eventManagerMap[publisherAddr].init == false,
+            "Publisher already registered"
+        );
+
+        // 2. Create and initialize a new EventManager clone
+        address eventMgrAddr = cloneEventManager();
+        EventManager(eventMgrAddr).initialize(publisherAddr);
+
+        // 3. update the mapping and emit event
+        recordEventManager(publisherAddr, eventMgrAddr);
+
+        // 4. return the EventManager contract address
+        return eventMgrAddr;
+    }
+
+    /**
+     * Add a subscriber, with the given deposit and gas budget, to a topic
+     * of a publisher's event manager
+     */
+    function subscribeTo(
+        address publisherAddr,
+        uint64 topic,
+        uint256 gasBudget,
+        address subscriberAddr,
+        uint256 depositWei
+    )
+        private
+        returns (address)
+    {
+        // 1. make sure the publisher has already registered
+        require(
+            m_eventManagerMap[publisherAddr].init == true,
+            "Publisher not registered"
+        );
+
+        // 2. get the EventManager contract address
+        address eventMgrAddr = m_eventManagerMap[publisherAddr].addr;
+
+        // 3. add the subscriber to the event manager
+        EventManager(eventMgrAddr).addSubscriber{
+            value: depositWei
+        }(subscriberAddr, topic, gasBudget);
+
+        // 4. return the EventManager contract address
+        return eventMgrAddr;
+    }
+
+    /**
+     * Map a publisher to its EventManager, and announce the registration
+     */
+    function recordEventManager(address publisherAddr, address eventMgrAddr)
+        private
+    {
+        m_eventManagerMap[publisherAddr] = MappedEventManager({
+            init: true,
+            addr: eventMgrAddr
+        });
+
+        emit PublisherRegistered(publisherAddr, eventMgrAddr);
+    }
+
+    /**
+     * Deploy an EIP-1167 minimal proxy that delegates to m_eventMgrImpl
+     * @return instance The address of the new proxy
+     */
+    function cloneEventManager() private returns (address instance) {
+        address impl = m_eventMgrImpl;
+        assembly ("memory-safe") {
+            // 0x37 bytes of creation code, with the implementation address
+            // spliced in after the PUSH20 (0x73) opcode; written to scratch
+            // memory above the free memory pointer, which is left untouched
+            let ptr := mload(0x40)
+            mstore(
+                ptr,
+                0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000
+            )
+            mstore(add(ptr, 0x14), shl(0x60, impl))
+            mstore(
+                add(ptr, 0x28),
+                0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000
+            )
+            instance := create(0, ptr, 0x37)
+        }
+        require(instance != address(0), "Clone failed");
+    }
+
 }
@@ -0,0 +1,53 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.17;
+
+
+contract ReadAggregator {
+
+    //===== structs =====
+
+    struct Call {
+        address target;
+        bytes   callData;
+    }
+
+    struct Result {
+        bool    success;
+        bytes   returnData;
+    }
+
+    //===== external Functions =====
+
+    /**
+     * Make a batch of read-only calls, so the state of many contracts can
+     * be read with a single eth_call
+     * @param calls The target and the encoded call of each read
+     * @return results The outcome and the raw return data of each read, in
+     *                 the same order as the calls
+     * @dev Every call is a staticcall. A failed call does not revert the
+     *      batch; its result has success set to false and carries the
+     *      revert data instead
+     */
+    function aggregate(Call[] calldata calls)
+        external
+        view
+        returns (Result[] memory results)
+    {
+        results = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; ++i) {
+            (results[i].success, results[i].returnData) =
+                calls[i].target.staticcall(calls[i].callData);
+        }
+    }
+
+    /**
+     * Get the Ether balance of an account, so it can be read in the same
+     * batch as contract state (by calling this contract from aggregate)
+     * @param addr The address of the account
+     * @return uint256 The balance in Wei
+     */
+    function getEthBalance(address addr) external view returns (uint256) {
+        return addr.balance;
+    }
+
+}
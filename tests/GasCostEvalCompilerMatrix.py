@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+
+from typing import List, NamedTuple, Optional
+
+
+BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
+TESTS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'tests')
+UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
+PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
+SOLC_BIN_PATH       = os.path.join(BUILD_DIR_PATH, 'solc-static-linux')
+MATRIX_DIR_PATH     = os.path.join(BUILD_DIR_PATH, 'compiler_matrix')
+
+
+sys.path.append(UTILS_DIR_PATH)
+import SolcBuild
+
+
+# the evaluations run for every build, and the arguments they take
+EVAL_SCRIPTS = [
+	('GasCostEvalDeploy.py',    [ ]),
+	('GasCostEvalMultiPubs.py', [ ]),
+	('GasCostEvalMultiSubs.py', [ ]),
+]
+
+
+class CompilerConfig(NamedTuple):
+	optimizeRuns: int
+	viaIR: bool
+
+	@property
+	def name(self) -> str:
+		return 'runs{}_{}'.format(
+			self.optimizeRuns,
+			'ir' if self.viaIR else 'legacy',
+		)
+
+	@property
+	def buildDir(self) -> str:
+		return os.path.join(MATRIX_DIR_PATH, self.name)
+
+
+def BuildContracts(
+	solcBin: str,
+	config: CompilerConfig,
+) -> None:
+	'''
+	Build every contract listed in the project config into the build
+	directory of the given compiler config, with the same
+	<module>/<Contract>.abi/.bin layout as the regular build, and write a
+	project config pointing at it
+	'''
+	SolcBuild.Build(
+		solcBin=solcBin,
+		buildDir=config.buildDir,
+		optimizeRuns=config.optimizeRuns,
+		viaIR=config.viaIR,
+	)
+
+	with open(PROJECT_CONFIG_PATH, 'r') as f:
+		projConf = json.load(f)
+	projConf['buildDir'] = config.buildDir
+	with open(os.path.join(config.buildDir, 'project_conf.json'), 'w') as f:
+		json.dump(projConf, f, indent='\t')
+
+
+def RunConfig(
+	solcBin: str,
+	config: CompilerConfig,
+	port: int,
+) -> Optional[dict]:
+	'''
+	Build and evaluate one compiler config; the output of the build and
+	of the evaluations goes to eval.log in its build directory
+	'''
+	os.makedirs(config.buildDir, exist_ok=True)
+	logPath = os.path.join(config.buildDir, 'eval.log')
+	with open(logPath, 'w') as log:
+		try:
+			BuildContracts(solcBin, config)
+			for script, scriptArgs in EVAL_SCRIPTS:
+				log.flush()
+				subprocess.run(
+					[
+						sys.executable,
+						os.path.join(TESTS_DIR_PATH, script),
+						'--build-dir', config.buildDir,
+						'--port', str(port),
+					] + scriptArgs,
+					stdout=log,
+					stderr=subprocess.STDOUT,
+					check=True,
+				)
+		except RuntimeError as e:
+			# e.g. stack too deep without the IR pipeline
+			log.write(str(e))
+			print('{}: build failed; see {}'.format(config.name, logPath))
+			return None
+		except subprocess.CalledProcessError as e:
+			print('{}: failed with exit code {}; see {}'.format(
+				config.name,
+				e.returncode,
+				logPath,
+			))
+			return None
+
+	print('{}: done'.format(config.name))
+	return CollectResults(config)
+
+
+def AvgGasCost(gasResults: List[List[List[float]]]) -> float:
+	costs = [ cost for result in gasResults for _, cost in result ]
+	return sum(costs) / len(costs)
+
+
+def PerSubscriberGasCost(publishCost: List[List[int]]) -> float:
+	# the marginal publish cost of one more subscriber
+	(firstNum, firstGas), (lastNum, lastGas) = publishCost[0], publishCost[-1]
+	if lastNum == firstNum:
+		return float(firstGas) / firstNum
+	return float(lastGas - firstGas) / (lastNum - firstNum)
+
+
+def CollectResults(config: CompilerConfig) -> dict:
+	def _Load(fileName: str):
+		with open(os.path.join(config.buildDir, fileName), 'r') as f:
+			return json.load(f)
+
+	return {
+		'name'         : config.name,
+		'optimizeRuns' : config.optimizeRuns,
+		'viaIR'        : config.viaIR,
+		'deploy'       : _Load('deploy_gas_cost.json')['deployPubSub'],
+		'register'     : AvgGasCost(_Load('register_gas_cost.json')),
+		'subscribe'    : AvgGasCost(_Load('subscribe_gas_cost.json')),
+		'publishPerSub': PerSubscriberGasCost(
+			_Load('publish_gas_cost.json')[0]
+		),
+	}
+
+
+def MarkParetoFront(results: List[dict]) -> None:
+	'''
+	Mark the configs for which no other config is at least as cheap in
+	both the one-off cost (deploying PubSubService and registering a
+	publisher) and the per-call cost (subscribing, plus publishing to one
+	more subscriber), and strictly cheaper in one of them
+	'''
+	for res in results:
+		res['oneOffCost'] = res['deploy'] + res['register']
+		res['perCallCost'] = res['subscribe'] + res['publishPerSub']
+
+	for res in results:
+		res['pareto'] = not any(
+			(other['oneOffCost'] <= res['oneOffCost']) and
+			(other['perCallCost'] <= res['perCallCost']) and
+			(
+				(other['oneOffCost'] < res['oneOffCost']) or
+				(other['perCallCost'] < res['perCallCost'])
+			)
+			for other in results
+		)
+
+
+def PrintParetoTable(results: List[dict]) -> None:
+	print(
+		'{:<20} {:>10} {:>10} {:>10} {:>12} {:>10} {:>10}  {}'.format(
+			'config', 'deploy', 'register', 'subscribe', 'publish/sub',
+			'one-off', 'per-call', 'pareto',
+		)
+	)
+	for res in sorted(results, key=lambda x: x['oneOffCost']):
+		print(
+			'{:<20} {:>10} {:>10.0f} {:>10.0f} {:>12.0f} {:>10.0f} '
+			'{:>10.0f}  {}'.format(
+				res['name'],
+				res['deploy'],
+				res['register'],
+				res['subscribe'],
+				res['publishPerSub'],
+				res['oneOffCost'],
+				res['perCallCost'],
+				'*' if res['pareto'] else '',
+			)
+		)
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Gas cost evaluation over a matrix of compiler '
+			'configurations'
+	)
+	argParser.add_argument(
+		'--runs', type=int, required=False, nargs='+',
+		default=[ 1, 10, 100, 200, 1000, 10000, 100000, 1000000 ],
+		help='values of --optimize-runs to evaluate'
+	)
+	argParser.add_argument(
+		'--via-ir', type=str, required=False, nargs='+',
+		choices=[ 'on', 'off' ], default=[ 'on', 'off' ],
+		help='whether to evaluate the IR pipeline, the legacy one, or both'
+	)
+	argParser.add_argument(
+		'--solc', type=str, required=False, default=SOLC_BIN_PATH,
+		help='path to the solc binary'
+	)
+	argParser.add_argument(
+		'--jobs', type=int, required=False, default=4,
+		help='number of configs built and evaluated in parallel'
+	)
+	argParser.add_argument(
+		'--base-port', type=int, required=False, default=7600,
+		help='ganache port of the first config; each config uses its own'
+	)
+	args = argParser.parse_args()
+
+	configs = [
+		CompilerConfig(optimizeRuns=runs, viaIR=(viaIR == 'on'))
+		for viaIR in args.via_ir
+		for runs in args.runs
+	]
+
+	with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as pool:
+		futures = [
+			pool.submit(RunConfig, args.solc, config, args.base_port + i)
+			for i, config in enumerate(configs)
+		]
+		results = [ x.result() for x in futures ]
+	results = [ x for x in results if x is not None ]
+
+	if len(results) == 0:
+		print('No compiler config was evaluated successfully')
+		return
+
+	MarkParetoFront(results)
+	print('Compiler matrix gas cost results:')
+	PrintParetoTable(results)
+
+	# save results
+	outputFile = os.path.join(MATRIX_DIR_PATH, 'compiler_matrix_gas_cost.json')
+	with open(outputFile, 'w') as f:
+		json.dump(results, f, indent='\t')
+
+
+if __name__ == "__main__":
+	main()
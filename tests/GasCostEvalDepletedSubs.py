@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import json
+import os
+import random
+
+from typing import List, Tuple
+
+from GasCostEvalMetrics import PrintMetricsSummary, WriteMetricsReport
+from GasCostEvalUtils import (
+	BUILD_DIR_PATH,
+	CallContractFunc,
+	ConnectGanache,
+	DeployContract,
+	EstimatePublishGas,
+	SelectRandomAccount,
+	StartGanache,
+	StopGanache,
+	ViewContractFunc,
+)
+
+
+FUNDED_DEPOSIT_WEI   = 10000000000000000 # 0.01 ether
+# the minimum deposit accepted by the EventManager; at any realistic gas
+# price it can't cover a single notification, so the first publish
+# drains it and parks the subscriber
+DEPLETED_DEPOSIT_WEI = 100000000
+
+
+def RunTests(
+	numFunded: int,
+	numDepletedList: List[int],
+) -> List[Tuple[int, int, int]]:
+	w3 = ConnectGanache()
+
+	# setup account
+	privKey = SelectRandomAccount(w3)
+
+	publishCost = []
+
+	for numDepleted in numDepletedList:
+		print()
+		print(f'Running test with {numFunded} funded and '
+			f'{numDepleted} depleted subscribers')
+		print()
+
+		# deploy PubSub and Publisher contracts
+		print('Deploying PubSub contract...')
+		pubSubContract, _ = DeployContract(w3, 'PubSubService', [ ], privKey)
+		print('Deploying publisher contract...')
+		publisherContract, _ = DeployContract(
+			w3, 'HelloWorldPublisher', [ ], privKey
+		)
+
+		# register publisher
+		print('Registering publisher...')
+		CallContractFunc(
+			w3, publisherContract, 'register', [ pubSubContract.address ], privKey
+		)
+
+		# subscribe, interleaving funded and depleted subscribers so parking
+		# has to move records around the active list
+		deposits = (
+			[ FUNDED_DEPOSIT_WEI ] * numFunded +
+			[ DEPLETED_DEPOSIT_WEI ] * numDepleted
+		)
+		random.shuffle(deposits)
+		print('Subscribing {} subscribers to publisher...'.format(len(deposits)))
+		funded = []
+		for deposit in deposits:
+			subPrivKey = SelectRandomAccount(w3)
+			subscriberContract, _ = DeployContract(
+				w3, 'HelloWorldSubscriber', [ pubSubContract.address ], subPrivKey
+			)
+			CallContractFunc(
+				w3,
+				subscriberContract,
+				'subscribe',
+				[ publisherContract.address ],
+				subPrivKey,
+				value=deposit,
+			)
+			if deposit == FUNDED_DEPOSIT_WEI:
+				funded.append(subscriberContract)
+
+		# the first publish drains and parks the depleted subscribers;
+		# the second one shows the steady-state cost
+		publishGas = []
+		for _ in range(2):
+			expectedMsg = random.randbytes(32).hex()
+			CallContractFunc(
+				w3, publisherContract, 'setSendData', [ expectedMsg ], privKey
+			)
+			print('Publishing...')
+			pubTxReceipt = CallContractFunc(
+				w3,
+				publisherContract,
+				'publish',
+				[ ],
+				privKey,
+				gas=EstimatePublishGas(len(deposits)),
+			)
+			publishGas.append(pubTxReceipt.gasUsed)
+
+			# ensure every funded subscriber received the message
+			for subscriberContract in funded:
+				msg = ViewContractFunc(w3, subscriberContract, 'm_recvData')
+				if msg != expectedMsg:
+					raise RuntimeError(
+						'Message received does not match the expected message '
+						'"{} != {}"'.format(
+							msg,
+							expectedMsg,
+						)
+					)
+
+		# record gas used
+		publishCost.append((
+			numDepleted,
+			publishGas[0],
+			publishGas[1],
+		))
+
+	return publishCost
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Publish gas cost evaluation with depleted subscribers'
+	)
+	argParser.add_argument(
+		'--funded', type=int, required=False, default=10,
+		help='number of subscribers with enough balance'
+	)
+	argParser.add_argument(
+		'--depleted', type=int, required=False, nargs='+',
+		default=[ 0, 5, 10, 20, 40 ],
+		help='numbers of depleted subscribers to evaluate'
+	)
+	argParser.add_argument(
+		'--prometheus', action='store_true',
+		help='also write the metrics in the Prometheus text format'
+	)
+	args = argParser.parse_args()
+
+	ganacheProc = StartGanache()
+
+	try:
+		publishCost = RunTests(args.funded, args.depleted)
+
+		print('Publish gas cost results ({} funded subscribers):'.format(
+			args.funded
+		))
+		for numDepleted, firstGas, steadyGas in publishCost:
+			print('{:03} depleted: first {:010} gas, steady {:010} gas'.format(
+				numDepleted,
+				firstGas,
+				steadyGas,
+			))
+
+		# save results
+		outputFile = os.path.join(BUILD_DIR_PATH, 'publish_depleted_gas_cost.json')
+		with open(outputFile, 'w') as f:
+			json.dump(
+				{ 'funded': args.funded, 'results': publishCost, },
+				f,
+				indent='\t'
+			)
+
+		PrintMetricsSummary()
+		WriteMetricsReport(outputFile, args.prometheus)
+
+	finally:
+		# finish and exit
+		StopGanache(ganacheProc)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import json
+import os
+import random
+
+from typing import Any, List, NamedTuple, Optional
+
+from web3 import Web3
+from web3.contract import Contract
+
+from GasCostEvalMetrics import (
+	METRICS,
+	PrintMetricsSummary,
+	WriteMetricsReport,
+)
+from GasCostEvalUtils import (
+	BUILD_DIR_PATH,
+	CallContractFunc,
+	ConnectGanache,
+	DeployContract,
+	DeploySubscriberFleet,
+	EstimatePublishGas,
+	LoadContract,
+	SetupAccount,
+	StartGanache,
+	StopGanache,
+	ViewContractFunc,
+)
+# found through the utils directory, which GasCostEvalUtils puts on the path
+from MulticallReader import MulticallReader, ReadCall
+
+
+# long series against many subscribers need more gas than a mainnet block
+BLOCK_GAS_LIMIT     = 1000000000
+OWNER_ACCOUNT_IDX   = 0
+RELAYER_ACCOUNT_IDX = 1
+PAYLOAD_SIZE        = 32
+
+
+class SubscriberGroup(NamedTuple):
+	count: int
+	depositWei: int
+
+
+def ParseMix(mix: str) -> List[SubscriberGroup]:
+	# e.g., '10x0.01+10x1' for 10 subscribers depositing 0.01 ether and 10
+	# depositing 1 ether
+	groups = []
+	for part in mix.split('+'):
+		count, depositEther = part.split('x')
+		groups.append(SubscriberGroup(
+			int(count),
+			Web3.to_wei(depositEther, 'ether'),
+		))
+	return groups
+
+
+def Snapshot(w3: Web3) -> str:
+	# through the middlewares, so a TxRecorder sees the snapshots
+	return w3.manager.request_blocking('evm_snapshot', [ ])
+
+
+def Revert(w3: Web3, snapshotId: str) -> None:
+	# a snapshot can only be reverted to once
+	if not w3.manager.request_blocking('evm_revert', [ snapshotId ]):
+		raise RuntimeError('Snapshot {} is not found'.format(snapshotId))
+
+
+def SendPublish(
+	w3: Web3,
+	publisherContract: Contract,
+	payload: bytes,
+	privKey: str,
+	gasPriceWei: int,
+	gas: int,
+) -> Any:
+	# signed here rather than by EthContractHelper, since the gas price is
+	# what the simulation varies
+	account = w3.eth.account.from_key(privKey)
+	tx = publisherContract.functions.publishData(payload).build_transaction({
+		'from'    : account.address,
+		'nonce'   : w3.eth.get_transaction_count(account.address),
+		'gas'     : gas,
+		'gasPrice': gasPriceWei,
+		'chainId' : w3.eth.chain_id,
+	})
+	signedTx = account.sign_transaction(tx)
+	txHash = w3.eth.send_raw_transaction(signedTx.rawTransaction)
+	receipt = w3.eth.wait_for_transaction_receipt(txHash)
+	# a failed publish still costs a fee but moves no balances, which
+	# would skew the economics instead of failing the run
+	if receipt.status != 1:
+		raise RuntimeError('Publish transaction {} failed'.format(
+			txHash.hex()
+		))
+	return receipt
+
+
+def RunSeries(
+	w3: Web3,
+	reader: MulticallReader,
+	aggregatorContract: Contract,
+	eventMgrContract: Contract,
+	publisherContract: Contract,
+	subscriberAddrs: List[str],
+	relayerPrivKey: str,
+	gasPriceWei: int,
+	numPublishes: int,
+	sampleEvery: int,
+) -> dict:
+	'''
+	Publish up to numPublishes times (stopping once every subscriber is
+	parked), and follow the subscriber balances, the parked subscribers and
+	the relayer's Ether balance with one batched read after each publish
+	'''
+	relayerAddr = w3.eth.account.from_key(relayerPrivKey).address
+	numSubscribers = len(subscriberAddrs)
+	reads = [
+		ReadCall(eventMgrContract, 'balancesOf', [ subscriberAddrs ]),
+		ReadCall(eventMgrContract, 'getSubscriberCount', [ 0 ]),
+		ReadCall(eventMgrContract, 'getParkedRecords', [ 0, numSubscribers ]),
+		ReadCall(aggregatorContract, 'getEthBalance', [ relayerAddr ]),
+	]
+
+	balances, numActive, _, relayerWei = reader.ReadValues(reads)
+	depositsWei = list(balances)
+	depletedAt: List[Optional[int]] = [ None ] * numSubscribers
+
+	netWeis = []
+	totalFeeWei = 0
+	totalCompensationWei = 0
+	series = []
+	for i in range(numPublishes):
+		if numActive == 0:
+			break
+
+		with METRICS.Phase('publish'):
+			receipt = SendPublish(
+				w3,
+				publisherContract,
+				random.randbytes(PAYLOAD_SIZE),
+				relayerPrivKey,
+				gasPriceWei,
+				EstimatePublishGas(numActive),
+			)
+		with METRICS.Phase('read'):
+			values = reader.ReadValues(reads)
+		newBalances, numActive, (parkedAddrs, _), newRelayerWei = values
+
+		# every Wei a subscriber is charged goes to the relayer
+		totalCompensationWei += sum(balances) - sum(newBalances)
+		totalFeeWei += receipt.gasUsed * receipt.effectiveGasPrice
+		netWeis.append(newRelayerWei - relayerWei)
+
+		parkedAddrs = set(parkedAddrs)
+		for j, subscriberAddr in enumerate(subscriberAddrs):
+			if depletedAt[j] is None and subscriberAddr in parkedAddrs:
+				depletedAt[j] = i + 1
+
+		balances, relayerWei = newBalances, newRelayerWei
+		if (i + 1) % sampleEvery == 0:
+			series.append({
+				'publish'      : i + 1,
+				'numActive'    : numActive,
+				'balancesWei'  : sum(balances),
+				'relayerNetWei': sum(netWeis),
+			})
+
+	numRun = len(netWeis)
+	drainWeiPerPublish = [
+		(depositsWei[j] - balances[j]) / (depletedAt[j] or max(numRun, 1))
+		for j in range(numSubscribers)
+	]
+
+	return {
+		'numPublishes'        : numRun,
+		'depositsWei'         : depositsWei,
+		'finalBalancesWei'    : balances,
+		'depletedAt'          : depletedAt,
+		'drainWeiPerPublish'  : drainWeiPerPublish,
+		'totalFeeWei'         : totalFeeWei,
+		'totalCompensationWei': totalCompensationWei,
+		'totalNetWei'         : sum(netWeis),
+		'netWeiPerPublish'    : sum(netWeis) / max(numRun, 1),
+		'minNetWei'           : min(netWeis) if numRun > 0 else 0,
+		'lossPublishes'       : len([ x for x in netWeis if x < 0 ]),
+		'series'              : series,
+	}
+
+
+def SummarizeGroups(
+	groups: List[SubscriberGroup],
+	seriesResult: dict,
+) -> List[dict]:
+	summaries = []
+	start = 0
+	for group in groups:
+		end = start + group.count
+		depletedAt = [
+			x for x in seriesResult['depletedAt'][start:end] if x is not None
+		]
+		summaries.append({
+			'count'               : group.count,
+			'depositWei'          : group.depositWei,
+			'drainWeiPerPublish'  : sum(
+				seriesResult['drainWeiPerPublish'][start:end]
+			) / group.count,
+			'numDepleted'         : len(depletedAt),
+			'publishesToDepletion': (
+				sum(depletedAt) / len(depletedAt) if len(depletedAt) > 0
+					else None
+			),
+		})
+		start = end
+	return summaries
+
+
+def RunTests(
+	mixes: List[str],
+	gasPricesGwei: List[int],
+	numPublishes: int,
+	sampleEvery: int,
+) -> List[dict]:
+	w3 = ConnectGanache()
+
+	ownerPrivKey = SetupAccount(w3, OWNER_ACCOUNT_IDX)
+	relayerPrivKey = SetupAccount(w3, RELAYER_ACCOUNT_IDX)
+
+	# deploy the contracts shared by every run
+	with METRICS.Phase('deploy'):
+		aggregatorContract, _ = DeployContract(
+			w3, 'ReadAggregator', [ ], ownerPrivKey
+		)
+		factoryContract, _ = DeployContract(
+			w3, 'SubscriberFleetFactory', [ ], ownerPrivKey
+		)
+		pubSubContract, _ = DeployContract(
+			w3, 'PubSubService', [ ], ownerPrivKey
+		)
+		publisherContract, _ = DeployContract(
+			w3, 'HelloWorldPublisher', [ ], ownerPrivKey
+		)
+		CallContractFunc(
+			w3,
+			publisherContract,
+			'register',
+			[ pubSubContract.address ],
+			ownerPrivKey,
+		)
+		eventMgrContract = LoadContract(
+			w3,
+			'EventManager',
+			ViewContractFunc(
+				w3,
+				pubSubContract,
+				'getEventManagerAddr',
+				[ publisherContract.address ]
+			),
+		)
+	reader = MulticallReader(w3, aggregatorContract.address)
+	baseSnapshot = Snapshot(w3)
+
+	results = []
+	for mix in mixes:
+		groups = ParseMix(mix)
+
+		# subscribe the mix once; every gas price starts from this state
+		Revert(w3, baseSnapshot)
+		baseSnapshot = Snapshot(w3)
+		print('Subscribing mix {}...'.format(mix))
+		subscriberAddrs = []
+		with METRICS.Phase('subscribe'):
+			for group in groups:
+				subscriberAddrs += [
+					x.address for x in DeploySubscriberFleet(
+						w3,
+						factoryContract,
+						'GasEvalPayloadSubscriber',
+						pubSubContract.address,
+						publisherContract.address,
+						group.count,
+						group.depositWei,
+						ownerPrivKey,
+					)
+				]
+		mixSnapshot = Snapshot(w3)
+
+		for gasPriceGwei in gasPricesGwei:
+			print('Publishing to mix {} at {} gwei...'.format(
+				mix,
+				gasPriceGwei,
+			))
+			Revert(w3, mixSnapshot)
+			mixSnapshot = Snapshot(w3)
+
+			seriesResult = RunSeries(
+				w3,
+				reader,
+				aggregatorContract,
+				eventMgrContract,
+				publisherContract,
+				subscriberAddrs,
+				relayerPrivKey,
+				Web3.to_wei(gasPriceGwei, 'gwei'),
+				numPublishes,
+				sampleEvery,
+			)
+			results.append({
+				'mix'         : mix,
+				'gasPriceGwei': gasPriceGwei,
+				'groups'      : SummarizeGroups(groups, seriesResult),
+				'relayer'     : {
+					k: seriesResult[k] for k in [
+						'totalFeeWei',
+						'totalCompensationWei',
+						'totalNetWei',
+						'netWeiPerPublish',
+						'minNetWei',
+						'lossPublishes',
+					]
+				},
+				'numPublishes': seriesResult['numPublishes'],
+				'series'      : seriesResult['series'],
+			})
+
+	return results
+
+
+def PrintEconomics(results: List[dict]) -> None:
+	for res in results:
+		print('Mix {}, {} gwei, {} publishes:'.format(
+			res['mix'],
+			res['gasPriceGwei'],
+			res['numPublishes'],
+		))
+		for group in res['groups']:
+			print(
+				'  {:04} subscribers with {} Wei: drain {:.0f} Wei/publish, '
+				'{} depleted (after {} publishes on average)'.format(
+					group['count'],
+					group['depositWei'],
+					group['drainWeiPerPublish'],
+					group['numDepleted'],
+					'-' if group['publishesToDepletion'] is None
+						else '{:.1f}'.format(group['publishesToDepletion']),
+				)
+			)
+		relayer = res['relayer']
+		print(
+			'  relayer: net {:.0f} Wei/publish, min {} Wei, '
+			'{} publishes at a loss'.format(
+				relayer['netWeiPerPublish'],
+				relayer['minNetWei'],
+				relayer['lossPublishes'],
+			)
+		)
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Simulate long publish series to evaluate how fast '
+			'subscriber deposits drain and whether the relayer is fully '
+			'reimbursed'
+	)
+	argParser.add_argument(
+		'--mixes', type=str, required=False, nargs='+',
+		default=[ '20x0.01', '10x0.001+10x1' ],
+		help='subscriber mixes as <count>x<deposit in ether>, joined by +'
+	)
+	argParser.add_argument(
+		'--gas-prices', type=int, required=False, nargs='+',
+		default=[ 1, 20, 100 ],
+		help='gas prices (in gwei) to publish at'
+	)
+	argParser.add_argument(
+		'--publishes', type=int, required=False, default=1000,
+		help='maximum number of publishes in each series'
+	)
+	argParser.add_argument(
+		'--sample-every', type=int, required=False, default=50,
+		help='number of publishes between samples of the series'
+	)
+	argParser.add_argument(
+		'--output', type=str, required=False,
+		default=os.path.join(BUILD_DIR_PATH, 'publish_economics.json'),
+		help='path of the results file'
+	)
+	argParser.add_argument(
+		'--prometheus', action='store_true',
+		help='also write the metrics in the Prometheus text format'
+	)
+	args = argParser.parse_args()
+
+	ganacheProc = StartGanache(
+		extraArgs=[
+			'--miner.blockGasLimit', str(BLOCK_GAS_LIMIT),
+			'--miner.callGasLimit', str(BLOCK_GAS_LIMIT),
+		]
+	)
+
+	try:
+		results = RunTests(
+			args.mixes,
+			args.gas_prices,
+			args.publishes,
+			args.sample_every,
+		)
+
+		print('Publish economics results:')
+		PrintEconomics(results)
+
+		# save results
+		with open(args.output, 'w') as f:
+			json.dump(results, f, indent='\t')
+
+		PrintMetricsSummary()
+		WriteMetricsReport(args.output, args.prometheus)
+
+	finally:
+		# finish and exit
+		StopGanache(ganacheProc)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from typing import List, NamedTuple, Tuple
+
+from GasCostEvalRecorder import RECORD_PATH_ENV_VAR
+from GasCostEvalUtils import (
+	BUILD_DIR_PATH,
+	GANACHE_PORT,
+	NUM_OF_ACCOUNTS,
+	PROJECT_CONFIG_PATH,
+	CallContractFunc,
+	ConnectGanache,
+	DeployContract,
+	DeploySubscriberFleet,
+	EstimatePublishGas,
+	LoadContract,
+	SetupAccount,
+	StartGanache,
+	StopGanache,
+	ViewContractFunc,
+)
+
+
+FIXTURES_DIR_PATH   = os.path.join(BUILD_DIR_PATH, 'fixtures')
+# bump when the layout of the fixtures changes
+FIXTURE_VERSION     = 1
+# the ganache account that deploys and owns everything in a fixture
+OWNER_ACCOUNT_IDX   = 0
+SUBSCRIBER_NAME     = 'GasEvalPayloadSubscriber'
+SUBSCRIBER_DEPOSIT  = 10000000000000000 # 0.01 ether
+# publishing to 1000 subscribers needs far more gas than a mainnet block has
+BLOCK_GAS_LIMIT     = 1000000000
+FIXTURE_GANACHE_ARGS = [
+	'--miner.blockGasLimit', str(BLOCK_GAS_LIMIT),
+	'--miner.callGasLimit', str(BLOCK_GAS_LIMIT),
+]
+
+
+class Topology(NamedTuple):
+	numPublishers: int
+	numSubscribers: int # per publisher
+
+	@property
+	def name(self) -> str:
+		return '{}x{}'.format(self.numPublishers, self.numSubscribers)
+
+	@staticmethod
+	def Parse(name: str) -> 'Topology':
+		numPublishers, numSubscribers = name.split('x')
+		return Topology(int(numPublishers), int(numSubscribers))
+
+
+STANDARD_TOPOLOGIES = [
+	Topology(1, 1000),
+	Topology(100, 10),
+]
+
+
+def FixtureKey(topology: Topology) -> str:
+	'''
+	Key of a fixture: the checksums of the built contract artifacts, the
+	topology, and everything else the chain state depends on
+	'''
+	h = hashlib.sha256()
+	h.update(json.dumps({
+		'version'        : FIXTURE_VERSION,
+		'topology'       : topology.name,
+		'numAccounts'    : NUM_OF_ACCOUNTS,
+		'ownerAccountIdx': OWNER_ACCOUNT_IDX,
+		'subscriber'     : SUBSCRIBER_NAME,
+		'deposit'        : SUBSCRIBER_DEPOSIT,
+		'ganacheArgs'    : FIXTURE_GANACHE_ARGS,
+	}, sort_keys=True).encode())
+
+	with open(PROJECT_CONFIG_PATH, 'r') as f:
+		modules = set(json.load(f)['contractModuleMap'].values())
+	for module in sorted(modules):
+		checksumsPath = os.path.join(BUILD_DIR_PATH, module, 'checksums.txt')
+		if not os.path.isfile(checksumsPath):
+			raise FileNotFoundError(
+				'{} is not found; build the contracts first'.format(
+					checksumsPath
+				)
+			)
+		with open(checksumsPath, 'rb') as f:
+			h.update(f.read())
+
+	return h.hexdigest()
+
+
+def FixtureDir(topology: Topology) -> str:
+	return os.path.join(
+		FIXTURES_DIR_PATH,
+		'{}-{}'.format(topology.name, FixtureKey(topology)[:16]),
+	)
+
+
+def BuildFixture(topology: Topology, port: int = GANACHE_PORT) -> str:
+	'''
+	Deploy the topology on a ganache whose database is kept, and save the
+	database with a manifest of the deployed addresses
+	@return The fixture directory
+	'''
+	fixtureDir = FixtureDir(topology)
+	tmpDir = fixtureDir + '.tmp'
+	shutil.rmtree(tmpDir, ignore_errors=True)
+	dbDir = os.path.join(tmpDir, 'db')
+	os.makedirs(dbDir)
+
+	print('Building fixture {}...'.format(topology.name))
+	ganacheProc = StartGanache(
+		port=port,
+		extraArgs=FIXTURE_GANACHE_ARGS + [ '--database.dbPath', dbDir ],
+	)
+
+	try:
+		w3 = ConnectGanache(port)
+		privKey = SetupAccount(w3, OWNER_ACCOUNT_IDX)
+
+		pubSubContract, _ = DeployContract(w3, 'PubSubService', [ ], privKey)
+		factoryContract, _ = DeployContract(
+			w3, 'SubscriberFleetFactory', [ ], privKey
+		)
+
+		publishers = []
+		for i in range(topology.numPublishers):
+			print('Deploying publisher {} of {}...'.format(
+				i + 1,
+				topology.numPublishers,
+			))
+			publisherContract, _ = DeployContract(
+				w3, 'HelloWorldPublisher', [ ], privKey
+			)
+			CallContractFunc(
+				w3,
+				publisherContract,
+				'register',
+				[ pubSubContract.address ],
+				privKey,
+			)
+			subscribers = DeploySubscriberFleet(
+				w3,
+				factoryContract,
+				SUBSCRIBER_NAME,
+				pubSubContract.address,
+				publisherContract.address,
+				topology.numSubscribers,
+				SUBSCRIBER_DEPOSIT,
+				privKey,
+			)
+			publishers.append({
+				'publisherAddr': publisherContract.address,
+				'eventMgrAddr' : ViewContractFunc(
+					w3,
+					pubSubContract,
+					'getEventManagerAddr',
+					[ publisherContract.address ],
+				),
+				'subscriberAddrs': [ x.address for x in subscribers ],
+			})
+
+		manifest = {
+			'key'            : FixtureKey(topology),
+			'topology'       : topology.name,
+			'ownerAccountIdx': OWNER_ACCOUNT_IDX,
+			'subscriberName' : SUBSCRIBER_NAME,
+			'pubSubAddr'     : pubSubContract.address,
+			'factoryAddr'    : factoryContract.address,
+			'publishers'     : publishers,
+		}
+
+	finally:
+		# ganache has to shut down cleanly to flush its database
+		StopGanache(ganacheProc)
+
+	with open(os.path.join(tmpDir, 'manifest.json'), 'w') as f:
+		json.dump(manifest, f, indent='\t')
+
+	# the fixture only appears once it is complete
+	shutil.rmtree(fixtureDir, ignore_errors=True)
+	os.replace(tmpDir, fixtureDir)
+
+	return fixtureDir
+
+
+def EnsureFixture(topology: Topology, port: int = GANACHE_PORT) -> str:
+	fixtureDir = FixtureDir(topology)
+	if not os.path.isfile(os.path.join(fixtureDir, 'manifest.json')):
+		BuildFixture(topology, port)
+	return fixtureDir
+
+
+def StartFromFixture(
+	topology: Topology,
+	port: int = GANACHE_PORT,
+) -> Tuple[subprocess.Popen, dict, str]:
+	'''
+	Start ganache on a copy of the database of the topology's fixture,
+	building the fixture first if there is none for the current artifacts
+	@return The ganache process, the manifest of the fixture, and the
+	        working directory to remove (by StopFromFixture) afterwards
+	'''
+	# a replay starts from a fresh chain, without the fixture's state
+	if os.environ.get(RECORD_PATH_ENV_VAR):
+		raise RuntimeError(
+			'Runs started from a fixture cannot be recorded; unset {}'.format(
+				RECORD_PATH_ENV_VAR
+			)
+		)
+
+	fixtureDir = EnsureFixture(topology, port)
+	with open(os.path.join(fixtureDir, 'manifest.json'), 'r') as f:
+		manifest = json.load(f)
+
+	# ganache writes to its database, so the fixture itself is never used
+	workDir = tempfile.mkdtemp(prefix='ganache_fixture_')
+	dbDir = os.path.join(workDir, 'db')
+	shutil.copytree(os.path.join(fixtureDir, 'db'), dbDir)
+
+	ganacheProc = StartGanache(
+		port=port,
+		extraArgs=FIXTURE_GANACHE_ARGS + [ '--database.dbPath', dbDir ],
+	)
+
+	return ganacheProc, manifest, workDir
+
+
+def StopFromFixture(ganacheProc: subprocess.Popen, workDir: str) -> None:
+	StopGanache(ganacheProc)
+	shutil.rmtree(workDir, ignore_errors=True)
+
+
+def RunPublishTests(topology: Topology, port: int) -> List[dict]:
+	'''
+	Publish once from every publisher of the topology's fixture
+	'''
+	start = time.time()
+	ganacheProc, manifest, workDir = StartFromFixture(topology, port)
+
+	try:
+		w3 = ConnectGanache(port)
+		print('Started from fixture in {:.1f} s'.format(time.time() - start))
+		privKey = SetupAccount(w3, manifest['ownerAccountIdx'])
+
+		results = []
+		for publisher in manifest['publishers']:
+			publisherContract = LoadContract(
+				w3,
+				'HelloWorldPublisher',
+				publisher['publisherAddr'],
+			)
+			receipt = CallContractFunc(
+				w3,
+				publisherContract,
+				'publishData',
+				[ random.randbytes(32) ],
+				privKey,
+				gas=EstimatePublishGas(len(publisher['subscriberAddrs'])),
+			)
+			results.append({
+				'publisherAddr' : publisher['publisherAddr'],
+				'numSubscribers': len(publisher['subscriberAddrs']),
+				'publishGas'    : receipt.gasUsed,
+			})
+
+	finally:
+		StopFromFixture(ganacheProc, workDir)
+
+	return results
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Build chain database fixtures of standard publisher '
+			'and subscriber topologies, and evaluate publish gas cost on them'
+	)
+	argParser.add_argument(
+		'--topologies', type=str, required=False, nargs='+',
+		default=[ x.name for x in STANDARD_TOPOLOGIES ],
+		help='topologies as <publishers>x<subscribers per publisher>'
+	)
+	argParser.add_argument(
+		'--port', type=int, required=False, default=GANACHE_PORT,
+		help='port of the ganache instances to start'
+	)
+	argParser.add_argument(
+		'--rebuild', action='store_true',
+		help='build the fixtures even if they exist'
+	)
+	argParser.add_argument(
+		'--publish', action='store_true',
+		help='publish from every publisher of each fixture and save the '
+			'gas cost'
+	)
+	args = argParser.parse_args()
+
+	for topology in [ Topology.Parse(x) for x in args.topologies ]:
+		if args.rebuild:
+			fixtureDir = BuildFixture(topology, args.port)
+		else:
+			fixtureDir = EnsureFixture(topology, args.port)
+		print('Fixture {}: {}'.format(topology.name, fixtureDir))
+
+		if args.publish:
+			results = RunPublishTests(topology, args.port)
+			print('Average publish gas cost: {:.0f}'.format(
+				sum([ x['publishGas'] for x in results ]) / len(results)
+			))
+
+			# save results
+			outputFile = os.path.join(
+				BUILD_DIR_PATH,
+				'fixture_{}_publish_gas_cost.json'.format(topology.name),
+			)
+			with open(outputFile, 'w') as f:
+				json.dump(results, f, indent='\t')
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import contextlib
+import json
+import os
+import time
+
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from web3 import Web3
+
+
+# upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS_SEC = (
+	0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+	0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+PROMETHEUS_PREFIX   = 'pubsub_eval'
+
+
+class LatencyHistogram(object):
+
+	def __init__(self) -> None:
+		self.count = 0
+		self.sumSec = 0.0
+		# cumulative, as in Prometheus: bucket i counts latencies up to
+		# LATENCY_BUCKETS_SEC[i]
+		self.bucketCounts = [ 0 ] * len(LATENCY_BUCKETS_SEC)
+
+	def Observe(self, sec: float) -> None:
+		self.count += 1
+		self.sumSec += sec
+		for i, bound in enumerate(LATENCY_BUCKETS_SEC):
+			if sec <= bound:
+				self.bucketCounts[i] += 1
+
+	def ToDict(self) -> dict:
+		return {
+			'count': self.count,
+			'sumSec': self.sumSec,
+			'buckets': {
+				str(bound): n
+				for bound, n in zip(LATENCY_BUCKETS_SEC, self.bucketCounts)
+			},
+		}
+
+
+class EvalMetrics(object):
+	'''
+	RPC counts and latencies (by JSON-RPC method), time spent in the
+	EthContractHelper entry points, time spent in named phases of an
+	evaluation (e.g., deploy, subscribe, publish, verify), and counts of
+	other harness events
+
+	For each helper entry point, the time not spent waiting for RPCs is
+	kept separately; it is the local work, such as encoding and signing,
+	plus the sleeps between receipt polls.
+	'''
+
+	def __init__(self) -> None:
+		self.rpc: Dict[str, LatencyHistogram] = {}
+		self.rpcErrors: Dict[str, int] = {}
+		self.rpcTotalSec = 0.0
+		self.helpers: Dict[str, LatencyHistogram] = {}
+		self.helperLocalSec: Dict[str, float] = {}
+		self.phases: Dict[str, LatencyHistogram] = {}
+		self.events: Dict[str, int] = {}
+
+	def RecordRpc(self, method: str, sec: float, failed: bool) -> None:
+		self.rpc.setdefault(method, LatencyHistogram()).Observe(sec)
+		self.rpcTotalSec += sec
+		if failed:
+			self.rpcErrors[method] = self.rpcErrors.get(method, 0) + 1
+
+	def CountEvent(self, name: str) -> None:
+		self.events[name] = self.events.get(name, 0) + 1
+
+	@contextlib.contextmanager
+	def Phase(self, name: str) -> Iterator[None]:
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.phases.setdefault(name, LatencyHistogram()).Observe(
+				time.perf_counter() - start
+			)
+
+	@contextlib.contextmanager
+	def Helper(self, name: str) -> Iterator[None]:
+		start = time.perf_counter()
+		rpcStartSec = self.rpcTotalSec
+		try:
+			yield
+		finally:
+			elapsed = time.perf_counter() - start
+			self.helpers.setdefault(name, LatencyHistogram()).Observe(elapsed)
+			self.helperLocalSec[name] = self.helperLocalSec.get(name, 0.0) + (
+				elapsed - (self.rpcTotalSec - rpcStartSec)
+			)
+
+	def ToDict(self) -> dict:
+		return {
+			'rpc': {
+				m: dict(hist.ToDict(), errors=self.rpcErrors.get(m, 0))
+				for m, hist in sorted(self.rpc.items())
+			},
+			'helpers': {
+				name: dict(hist.ToDict(), localSec=self.helperLocalSec[name])
+				for name, hist in sorted(self.helpers.items())
+			},
+			'phases': {
+				name: hist.ToDict()
+				for name, hist in sorted(self.phases.items())
+			},
+			'events': dict(sorted(self.events.items())),
+		}
+
+	def ToPrometheus(self) -> str:
+		lines: List[str] = []
+
+		def _Histogram(
+			metric: str,
+			helpText: str,
+			label: str,
+			hists: Dict[str, LatencyHistogram],
+		) -> None:
+			name = '{}_{}_seconds'.format(PROMETHEUS_PREFIX, metric)
+			lines.append('# HELP {} {}'.format(name, helpText))
+			lines.append('# TYPE {} histogram'.format(name))
+			for value, hist in sorted(hists.items()):
+				for bound, n in zip(LATENCY_BUCKETS_SEC, hist.bucketCounts):
+					lines.append('{}_bucket{{{}="{}",le="{}"}} {}'.format(
+						name, label, value, bound, n
+					))
+				lines.append('{}_bucket{{{}="{}",le="+Inf"}} {}'.format(
+					name, label, value, hist.count
+				))
+				lines.append('{}_sum{{{}="{}"}} {}'.format(
+					name, label, value, hist.sumSec
+				))
+				lines.append('{}_count{{{}="{}"}} {}'.format(
+					name, label, value, hist.count
+				))
+
+		def _Counter(
+			metric: str,
+			helpText: str,
+			label: str,
+			values: List[Tuple[str, Any]],
+		) -> None:
+			name = '{}_{}'.format(PROMETHEUS_PREFIX, metric)
+			lines.append('# HELP {} {}'.format(name, helpText))
+			lines.append('# TYPE {} counter'.format(name))
+			for value, n in values:
+				lines.append('{}{{{}="{}"}} {}'.format(name, label, value, n))
+
+		_Histogram('rpc', 'Latency of JSON-RPC requests', 'method', self.rpc)
+		_Counter(
+			'rpc_errors_total',
+			'JSON-RPC requests that failed',
+			'method',
+			[ (m, self.rpcErrors.get(m, 0)) for m in sorted(self.rpc.keys()) ],
+		)
+		_Histogram(
+			'helper',
+			'Time spent in EthContractHelper entry points',
+			'helper',
+			self.helpers,
+		)
+		_Counter(
+			'helper_local_seconds_total',
+			'Time spent in EthContractHelper entry points outside of RPCs',
+			'helper',
+			sorted(self.helperLocalSec.items()),
+		)
+		_Histogram(
+			'phase',
+			'Time spent in evaluation phases',
+			'phase',
+			self.phases,
+		)
+		_Counter(
+			'events_total',
+			'Occurrences of harness events (e.g., gas limit cache hits)',
+			'event',
+			sorted(self.events.items()),
+		)
+
+		return '\n'.join(lines) + '\n'
+
+
+METRICS = EvalMetrics()
+
+
+def MetricsMiddleware(
+	makeRequest: Callable[[str, Any], Any],
+	w3: Web3,
+) -> Callable[[str, Any], Any]:
+	'''
+	web3 middleware recording every request that reaches the provider
+	'''
+	def _Middleware(method: str, params: Any) -> Any:
+		start = time.perf_counter()
+		try:
+			response = makeRequest(method, params)
+		except Exception:
+			METRICS.RecordRpc(method, time.perf_counter() - start, True)
+			raise
+		METRICS.RecordRpc(
+			method,
+			time.perf_counter() - start,
+			'error' in response,
+		)
+		return response
+
+	return _Middleware
+
+
+def InstallMetrics(w3: Web3) -> None:
+	# the innermost layer, so only requests sent to the node are counted
+	# and their latency excludes the other middlewares
+	w3.middleware_onion.inject(MetricsMiddleware, 'eval_metrics', layer=0)
+
+
+def PrintMetricsSummary() -> None:
+	print('RPCs by method:')
+	for method, hist in sorted(
+		METRICS.rpc.items(),
+		key=lambda x: x[1].sumSec,
+		reverse=True,
+	):
+		print('{:32} {:8} calls, {:9.3f} s'.format(
+			method, hist.count, hist.sumSec
+		))
+	print('Phases:')
+	for name, hist in sorted(METRICS.phases.items()):
+		print('{:32} {:8} times, {:9.3f} s'.format(
+			name, hist.count, hist.sumSec
+		))
+
+
+def WriteMetricsReport(resultPath: str, prometheus: bool = False) -> None:
+	'''
+	Write the metrics next to a gas cost result file, as
+	<result>_metrics.json and, optionally, <result>_metrics.prom
+	'''
+	basePath, _ = os.path.splitext(resultPath)
+
+	with open(basePath + '_metrics.json', 'w') as f:
+		json.dump(METRICS.ToDict(), f, indent='\t')
+
+	if prometheus:
+		with open(basePath + '_metrics.prom', 'w') as f:
+			f.write(METRICS.ToPrometheus())
@@ -8,82 +8,35 @@
 ###
 
 
+import argparse
 import json
 import os
-import random
-import signal
-import subprocess
-import sys
-import time
 
-from web3 import Web3
 from typing import List, Tuple
 
-
-BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
-UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
-PYHELPER_DIR        = os.path.join(UTILS_DIR_PATH, 'PyEthHelper')
-PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
-CHECKSUM_KEYS_PATH  = os.path.join(BUILD_DIR_PATH, 'ganache_keys_checksum.json')
-GANACHE_KEYS_PATH   = os.path.join(BUILD_DIR_PATH, 'ganache_keys.json')
-GANACHE_PORT        = 7545
-NUM_OF_ACCOUNTS     = 100
-GANACHE_NET_ID      = 1337
-
-
-sys.path.append(PYHELPER_DIR)
-from PyEthHelper import EthContractHelper
-from PyEthHelper import GanacheAccounts
-
-
-def StartGanache() -> subprocess.Popen:
-	cmd = [
-		'ganache-cli',
-		'-p', str(GANACHE_PORT),
-		'-d',
-		'-a', str(NUM_OF_ACCOUNTS),
-		'--network-id', str(GANACHE_NET_ID),
-		'--chain.hardfork', 'shanghai',
-		'--wallet.accountKeysPath', str(GANACHE_KEYS_PATH),
-	]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-	return proc
-
-
-def SelectRandomAccount(
-	w3: Web3,
-	numAccounts: int = NUM_OF_ACCOUNTS
-) -> str:
-	accountIdx = random.randint(0, numAccounts - 1)
-	# accountIdx = 0
-	return EthContractHelper.SetupSendingAccount(
-		w3=w3,
-		account=accountIdx,
-		keyJson=CHECKSUM_KEYS_PATH
-	)
-
-
-def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+from GasCostEvalUtils import (
+	GANACHE_PORT,
+	ConnectGanache,
+	EthContractHelper,
+	EvalBuild,
+	SelectRandomAccount,
+	StartGanache,
+	StopGanache,
+)
+
+
+def RunTests(
+	build: EvalBuild,
+	port: int,
+	registerFunc: str = 'register',
+) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 	maxNumPublishers = 20
 
 	# connect to ganache
-	ganacheUrl = 'http://localhost:{}'.format(GANACHE_PORT)
-	w3 = Web3(Web3.HTTPProvider(ganacheUrl))
-	while not w3.is_connected():
-		print('Attempting to connect to ganache...')
-		time.sleep(1)
-	print('Connected to ganache')
-
-	# checksum keys
-	GanacheAccounts.ChecksumGanacheKeysFile(
-		CHECKSUM_KEYS_PATH,
-		GANACHE_KEYS_PATH
-	)
+	w3 = ConnectGanache(port, build)
 
 	# setup account
-	privKey = SelectRandomAccount(w3)
+	privKey = SelectRandomAccount(w3, build=build)
 
 
 	registerCost = []
@@ -99,7 +52,7 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 		print('Deploying PubSub contract...')
 		pubSubContract = EthContractHelper.LoadContract(
 			w3=w3,
-			projConf=PROJECT_CONFIG_PATH,
+			projConf=build.projConfPath,
 			contractName='PubSubService',
 			release=None, # use locally built contract
 			address=None, # deploy new contract
@@ -119,7 +72,7 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 		# load deployed PubSub contract
 		pubSubContract = EthContractHelper.LoadContract(
 			w3=w3,
-			projConf=PROJECT_CONFIG_PATH,
+			projConf=build.projConfPath,
 			contractName='PubSubService',
 			release=None, # use locally built contract
 			address=pubSubAddr, # use deployed contract
@@ -130,13 +83,13 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 		print('Deploying {} publishers...'.format(numPublishers))
 		for pubIndex in range(0, numPublishers):
 			# choose a random account to deploy from
-			privKey = SelectRandomAccount(w3)
+			privKey = SelectRandomAccount(w3, build=build)
 
 			# deploy Publisher contract
 			# print('Deploying publisher contract...')
 			publisherContract = EthContractHelper.LoadContract(
 				w3=w3,
-				projConf=PROJECT_CONFIG_PATH,
+				projConf=build.projConfPath,
 				contractName='HelloWorldPublisher',
 				release=None, # use locally built contract
 				address=None, # deploy new contract
@@ -156,7 +109,7 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 			# load deployed Publisher contract
 			publisherContract = EthContractHelper.LoadContract(
 				w3=w3,
-				projConf=PROJECT_CONFIG_PATH,
+				projConf=build.projConfPath,
 				contractName='HelloWorldPublisher',
 				release=None, # use locally built contract
 				address=publisherAddr, # use deployed contract
@@ -167,7 +120,7 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 			regTxReceipt = EthContractHelper.CallContractFunc(
 				w3=w3,
 				contract=publisherContract,
-				funcName='register',
+				funcName=registerFunc,
 				arguments=[ pubSubAddr ],
 				privKey=privKey,
 				gas=None, # let web3 estimate
@@ -190,13 +143,13 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 			publisherAddr = publisherContract.address
 
 			# choose a random account to deploy from
-			privKey = SelectRandomAccount(w3)
+			privKey = SelectRandomAccount(w3, build=build)
 
 			# deploy Subscriber contract
 			# print('Deploying subscriber contract...')
 			subscriberContract = EthContractHelper.LoadContract(
 				w3=w3,
-				projConf=PROJECT_CONFIG_PATH,
+				projConf=build.projConfPath,
 				contractName='HelloWorldSubscriber',
 				release=None, # use locally built contract
 				address=None, # deploy new contract
@@ -215,7 +168,7 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 			# load deployed Subscriber contract
 			subscriberContract = EthContractHelper.LoadContract(
 				w3=w3,
-				projConf=PROJECT_CONFIG_PATH,
+				projConf=build.projConfPath,
 				contractName='HelloWorldSubscriber',
 				release=None, # use locally built contract
 				address=subscriberAddr, # use deployed contract
@@ -275,33 +228,268 @@ def RunTests() -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
 	return registerCost, subscribeCost
 
 
-def StopGanache(ganacheProc: subprocess.Popen) -> None:
-	print('Shutting down ganache (it may take ~15 seconds)...')
-	waitEnd = time.time() + 20
-	ganacheProc.terminate()
-	while ganacheProc.poll() is None:
-		try:
-			if time.time() > waitEnd:
-				print('Force to shut down ganache')
-				ganacheProc.kill()
-			else:
-				print('Still waiting for ganache to shut down...')
-				ganacheProc.send_signal(signal.SIGINT)
-			ganacheProc.wait(timeout=2)
-		except subprocess.TimeoutExpired:
-			continue
-	print('Ganache has been shut down')
+def RunBatchTests(
+	build: EvalBuild,
+	port: int,
+) -> Tuple[List[Tuple[int, float]], List[Tuple[int, float]]]:
+	maxNumPublishers = 20
+
+	# connect to ganache
+	w3 = ConnectGanache(port, build)
+
+	# setup account
+	privKey = SelectRandomAccount(w3, build=build)
+
+
+	registerCost = []
+	subscribeCost = []
+
+
+	for numPublishers in range(1, maxNumPublishers + 1):
+		print()
+		print(f'Running batch test with {numPublishers} publishers')
+		print()
+
+		# deploy PubSub contract
+		print('Deploying PubSub contract...')
+		pubSubContract = EthContractHelper.LoadContract(
+			w3=w3,
+			projConf=build.projConfPath,
+			contractName='PubSubService',
+			release=None, # use locally built contract
+			address=None, # deploy new contract
+		)
+		pubSubReceipt = EthContractHelper.DeployContract(
+			w3=w3,
+			contract=pubSubContract,
+			arguments=[ ],
+			privKey=privKey,
+			gas=None, # let web3 estimate
+			value=0,
+			confirmPrompt=False # don't prompt for confirmation
+		)
+		pubSubAddr = pubSubReceipt.contractAddress
+		pubSubContract = EthContractHelper.LoadContract(
+			w3=w3,
+			projConf=build.projConfPath,
+			contractName='PubSubService',
+			release=None, # use locally built contract
+			address=pubSubAddr, # use deployed contract
+		)
+
+		# deploy Publisher contracts
+		print('Deploying {} publishers...'.format(numPublishers))
+		publishers = []
+		for pubIndex in range(0, numPublishers):
+			publisherContract = EthContractHelper.LoadContract(
+				w3=w3,
+				projConf=build.projConfPath,
+				contractName='HelloWorldPublisher',
+				release=None, # use locally built contract
+				address=None, # deploy new contract
+			)
+			publisherReceipt = EthContractHelper.DeployContract(
+				w3=w3,
+				contract=publisherContract,
+				arguments=[ ],
+				privKey=privKey,
+				gas=None, # let web3 estimate
+				value=0,
+				confirmPrompt=False # don't prompt for confirmation
+			)
+			publishers.append(EthContractHelper.LoadContract(
+				w3=w3,
+				projConf=build.projConfPath,
+				contractName='HelloWorldPublisher',
+				release=None, # use locally built contract
+				address=publisherReceipt.contractAddress, # use deployed contract
+			))
+		publisherAddrs = [ x.address for x in publishers ]
+
+		# register all publishers in one transaction
+		regTxReceipt = EthContractHelper.CallContractFunc(
+			w3=w3,
+			contract=pubSubContract,
+			funcName='registerMany',
+			arguments=[ publisherAddrs ],
+			privKey=privKey,
+			gas=None, # let web3 estimate
+			value=0,
+			confirmPrompt=False # don't prompt for confirmation
+		)
+		print('Batch register gas used: {}'.format(regTxReceipt.gasUsed))
+		registerCost.append((
+			numPublishers,
+			regTxReceipt.gasUsed / numPublishers, # average gas cost
+		))
+
+		# let the publishers pick up their EventManager addresses
+		for publisherContract in publishers:
+			EthContractHelper.CallContractFunc(
+				w3=w3,
+				contract=publisherContract,
+				funcName='loadEventMgrAddr',
+				arguments=[ pubSubAddr ],
+				privKey=privKey,
+				gas=None, # let web3 estimate
+				value=0,
+				confirmPrompt=False # don't prompt for confirmation
+			)
+
+		# deploy one subscriber for all publishers
+		subscriberContract = EthContractHelper.LoadContract(
+			w3=w3,
+			projConf=build.projConfPath,
+			contractName='HelloWorldMultiSubscriber',
+			release=None, # use locally built contract
+			address=None, # deploy new contract
+		)
+		subscriberReceipt = EthContractHelper.DeployContract(
+			w3=w3,
+			contract=subscriberContract,
+			arguments=[ pubSubAddr ],
+			privKey=privKey,
+			gas=None, # let web3 estimate
+			value=0,
+			confirmPrompt=False # don't prompt for confirmation
+		)
+		subscriberContract = EthContractHelper.LoadContract(
+			w3=w3,
+			projConf=build.projConfPath,
+			contractName='HelloWorldMultiSubscriber',
+			release=None, # use locally built contract
+			address=subscriberReceipt.contractAddress, # use deployed contract
+		)
+
+		# subscribe to all publishers in one transaction
+		deposits = [ 10000000000000000 ] * numPublishers # 0.01 ether each
+		subTxReceipt = EthContractHelper.CallContractFunc(
+			w3=w3,
+			contract=subscriberContract,
+			funcName='subscribeMany',
+			arguments=[ publisherAddrs, deposits ],
+			privKey=privKey,
+			gas=None, # let web3 estimate
+			value=sum(deposits),
+			confirmPrompt=False # don't prompt for confirmation
+		)
+		print('Batch subscribe gas used: {}'.format(subTxReceipt.gasUsed))
+
+		# check if the subscriber was successfully subscribed
+		for publisherContract in publishers:
+			eventMgrAddr = EthContractHelper.CallContractFunc(
+				w3=w3,
+				contract=publisherContract,
+				funcName='m_eventMgrAddr',
+				arguments=[ ],
+				privKey=None,
+				gas=None,
+				value=0,
+				confirmPrompt=False # don't prompt for confirmation
+			)
+			isSubscribed = EthContractHelper.CallContractFunc(
+				w3=w3,
+				contract=subscriberContract,
+				funcName='m_eventMgrMap',
+				arguments=[ eventMgrAddr ],
+				privKey=None,
+				gas=None,
+				value=0,
+				confirmPrompt=False # don't prompt for confirmation
+			)
+			if not isSubscribed:
+				raise RuntimeError('Subscriber was not subscribed to publisher')
+
+		subscribeCost.append((
+			numPublishers,
+			subTxReceipt.gasUsed / numPublishers, # average gas cost
+		))
+
+	return registerCost, subscribeCost
+
+
+def AvgGasCost(gasResults: List[List[Tuple[int, float]]]) -> float:
+	costs = [ cost for result in gasResults for _, cost in result ]
+	return sum(costs) / len(costs)
+
+
+def PrintCloneRegisterSavings(
+	regGasResults: List[List[Tuple[int, float]]],
+	baselinePath: str,
+) -> None:
+	cloneCost = AvgGasCost(regGasResults)
+	print('Register gas cost via clone: {:.2f} gas'.format(cloneCost))
+
+	if not os.path.isfile(baselinePath):
+		print('No full-deployment results at {} to compare with'.format(
+			baselinePath
+		))
+		return
+
+	with open(baselinePath, 'r') as f:
+		fullCost = AvgGasCost(json.load(f))
+	print('Register gas cost via full deployment: {:.2f} gas'.format(fullCost))
+	print('Saved per register: {:.2f} gas ({:.2f}%)'.format(
+		fullCost - cloneCost,
+		100.0 * (fullCost - cloneCost) / fullCost,
+	))
+
+
+def PrintBatchSavings(
+	name: str,
+	perCallResults: List[List[Tuple[int, float]]],
+	batchResults: List[List[Tuple[int, float]]],
+) -> None:
+	perCallByNum = { num: cost for num, cost in perCallResults[0] }
+	for num, cost in batchResults[0]:
+		print('{} {:03} publishers: {:010.2f} gas per call, '
+			'{:010.2f} gas batched (saved {:.2f})'.format(
+				name,
+				num,
+				perCallByNum[num],
+				cost,
+				perCallByNum[num] - cost,
+			)
+		)
 
 
 def main():
-	ganacheProc = StartGanache()
+	argParser = argparse.ArgumentParser(
+		description='Register and subscribe gas cost evaluation with multiple '
+			'publishers'
+	)
+	argParser.add_argument(
+		'--clone', action='store_true',
+		help='register publishers with minimal-proxy EventManager clones'
+	)
+	argParser.add_argument(
+		'--batch', action='store_true',
+		help='also evaluate registerMany and subscribeMany'
+	)
+	argParser.add_argument(
+		'--build-dir', type=str, required=False, default=None,
+		help='directory of a separate build to evaluate, where the results '
+			'are written as well (default: the build directory)'
+	)
+	argParser.add_argument(
+		'--port', type=int, required=False, default=GANACHE_PORT,
+		help='port of the ganache instance to start'
+	)
+	args = argParser.parse_args()
+
+	registerFunc = 'registerClone' if args.clone else 'register'
+	outputSuffix = '_clone' if args.clone else ''
+
+	build = EvalBuild.FromDir(args.build_dir)
+
+	ganacheProc = StartGanache(port=args.port, build=build)
 
 	try:
 		regGasResults = []
 		subsGasResults = []
 
 		for _ in range(3):
-			registerCost, subscribeCost = RunTests()
+			registerCost, subscribeCost = RunTests(build, args.port, registerFunc)
 
 			# print('Subscribe gas cost results:')
 			# for cost in subscribeCost:
@@ -310,11 +498,48 @@ def main():
 			regGasResults.append(registerCost)
 			subsGasResults.append(subscribeCost)
 
+		if args.clone:
+			PrintCloneRegisterSavings(
+				regGasResults,
+				os.path.join(build.buildDir, 'register_gas_cost.json')
+			)
+
+		if args.batch:
+			regBatchResults = []
+			subsBatchResults = []
+			for _ in range(3):
+				registerCost, subscribeCost = RunBatchTests(build, args.port)
+				regBatchResults.append(registerCost)
+				subsBatchResults.append(subscribeCost)
+
+			# registerMany spawns clones, so it is compared with per-call
+			# registration via registerClone, not the full deployment
+			regCloneResults = regGasResults
+			if not args.clone:
+				regCloneResults = [ RunTests(build, args.port, 'registerClone')[0] ]
+			PrintBatchSavings('Register ', regCloneResults, regBatchResults)
+			PrintBatchSavings('Subscribe', subsGasResults, subsBatchResults)
+
+			outputFile = os.path.join(
+				build.buildDir, 'register_batch_gas_cost.json'
+			)
+			with open(outputFile, 'w') as f:
+				json.dump(regBatchResults, f, indent='\t')
+			outputFile = os.path.join(
+				build.buildDir, 'subscribe_batch_gas_cost.json'
+			)
+			with open(outputFile, 'w') as f:
+				json.dump(subsBatchResults, f, indent='\t')
+
 		# save results
-		outputFile = os.path.join(BUILD_DIR_PATH, 'subscribe_gas_cost.json')
+		outputFile = os.path.join(
+			build.buildDir, 'subscribe_gas_cost{}.json'.format(outputSuffix)
+		)
 		with open(outputFile, 'w') as f:
 			json.dump(subsGasResults, f, indent='\t')
-		outputFile = os.path.join(BUILD_DIR_PATH, 'register_gas_cost.json')
+		outputFile = os.path.join(
+			build.buildDir, 'register_gas_cost{}.json'.format(outputSuffix)
+		)
 		with open(outputFile, 'w') as f:
 			json.dump(regGasResults, f, indent='\t')
 
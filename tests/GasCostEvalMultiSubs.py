@@ -8,82 +8,36 @@
 ###
 
 
+import argparse
 import json
 import os
 import random
-import signal
-import subprocess
-import sys
-import time
-
-from web3 import Web3
-from typing import List, Tuple
-
-
-BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
-UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
-PYHELPER_DIR        = os.path.join(UTILS_DIR_PATH, 'PyEthHelper')
-PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
-CHECKSUM_KEYS_PATH  = os.path.join(BUILD_DIR_PATH, 'ganache_keys_checksum.json')
-GANACHE_KEYS_PATH   = os.path.join(BUILD_DIR_PATH, 'ganache_keys.json')
-GANACHE_PORT        = 7545
-NUM_OF_ACCOUNTS     = 100
-GANACHE_NET_ID      = 1337
-
-
-sys.path.append(PYHELPER_DIR)
-from PyEthHelper import EthContractHelper
-from PyEthHelper import GanacheAccounts
-
-
-def StartGanache() -> subprocess.Popen:
-	cmd = [
-		'ganache-cli',
-		'-p', str(GANACHE_PORT),
-		'-d',
-		'-a', str(NUM_OF_ACCOUNTS),
-		'--network-id', str(GANACHE_NET_ID),
-		'--chain.hardfork', 'shanghai',
-		'--wallet.accountKeysPath', str(GANACHE_KEYS_PATH),
-	]
-	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-	return proc
 
+from typing import List, Optional, Tuple
 
-def SelectRandomAccount(
-	w3: Web3,
-	numAccounts: int = NUM_OF_ACCOUNTS
-) -> str:
-	accountIdx = random.randint(0, numAccounts - 1)
-	# accountIdx = 0
-	return EthContractHelper.SetupSendingAccount(
-		w3=w3,
-		account=accountIdx,
-		keyJson=CHECKSUM_KEYS_PATH
-	)
+from GasCostEvalUtils import (
+	GANACHE_PORT,
+	ConnectGanache,
+	EthContractHelper,
+	EvalBuild,
+	SelectRandomAccount,
+	StartGanache,
+	StopGanache,
+)
 
 
-def RunTests() -> List[Tuple[int, int]]:
+def RunTests(
+	build: EvalBuild,
+	port: int,
+	registerFunc: str = 'register',
+) -> List[Tuple[int, int]]:
 	maxNumSubscribers = 20
 
 	# connect to ganache
-	ganacheUrl = 'http://localhost:{}'.format(GANACHE_PORT)
-	w3 = Web3(Web3.HTTPProvider(ganacheUrl))
-	while not w3.is_connected():
-		print('Attempting to connect to ganache...')
-		time.sleep(1)
-	print('Connected to ganache')
-
-	# checksum keys
-	GanacheAccounts.ChecksumGanacheKeysFile(
-		CHECKSUM_KEYS_PATH,
-		GANACHE_KEYS_PATH
-	)
+	w3 = ConnectGanache(port, build)
 
 	# setup account
-	privKey = SelectRandomAccount(w3)
+	privKey = SelectRandomAccount(w3, build=build)
 
 
 	publishCost = []
@@ -98,7 +52,7 @@ def RunTests() -> List[Tuple[int, int]]:
 		print('Deploying PubSub contract...')
 		pubSubContract = EthContractHelper.LoadContract(
 			w3=w3,
-			projConf=PROJECT_CONFIG_PATH,
+			projConf=build.projConfPath,
 			contractName='PubSubService',
 			release=None, # use locally built contract
 			address=None, # deploy new contract
@@ -118,7 +72,7 @@ def RunTests() -> List[Tuple[int, int]]:
 		# load deployed PubSub contract
 		pubSubContract = EthContractHelper.LoadContract(
 			w3=w3,
-			projConf=PROJECT_CONFIG_PATH,
+			projConf=build.projConfPath,
 			contractName='PubSubService',
 			release=None, # use locally built contract
 			address=pubSubAddr, # use deployed contract
@@ -128,7 +82,7 @@ def RunTests() -> List[Tuple[int, int]]:
 		print('Deploying publisher contract...')
 		publisherContract = EthContractHelper.LoadContract(
 			w3=w3,
-			projConf=PROJECT_CONFIG_PATH,
+			projConf=build.projConfPath,
 			contractName='HelloWorldPublisher',
 			release=None, # use locally built contract
 			address=None, # deploy new contract
@@ -148,7 +102,7 @@ def RunTests() -> List[Tuple[int, int]]:
 		# load deployed Publisher contract
 		publisherContract = EthContractHelper.LoadContract(
 			w3=w3,
-			projConf=PROJECT_CONFIG_PATH,
+			projConf=build.projConfPath,
 			contractName='HelloWorldPublisher',
 			release=None, # use locally built contract
 			address=publisherAddr, # use deployed contract
@@ -159,7 +113,7 @@ def RunTests() -> List[Tuple[int, int]]:
 		EthContractHelper.CallContractFunc(
 			w3=w3,
 			contract=publisherContract,
-			funcName='register',
+			funcName=registerFunc,
 			arguments=[ pubSubAddr ],
 			privKey=privKey,
 			gas=None, # let web3 estimate
@@ -173,13 +127,13 @@ def RunTests() -> List[Tuple[int, int]]:
 		)
 		for subsIndex in range(0, numSubscribers):
 			# choose a random account to deploy from
-			privKey = SelectRandomAccount(w3)
+			privKey = SelectRandomAccount(w3, build=build)
 
 			# deploy Subscriber contract
 			# print('Deploying subscriber contract...')
 			subscriberContract = EthContractHelper.LoadContract(
 				w3=w3,
-				projConf=PROJECT_CONFIG_PATH,
+				projConf=build.projConfPath,
 				contractName='HelloWorldSubscriber',
 				release=None, # use locally built contract
 				address=None, # deploy new contract
@@ -198,7 +152,7 @@ def RunTests() -> List[Tuple[int, int]]:
 			# load deployed Subscriber contract
 			subscriberContract = EthContractHelper.LoadContract(
 				w3=w3,
-				projConf=PROJECT_CONFIG_PATH,
+				projConf=build.projConfPath,
 				contractName='HelloWorldSubscriber',
 				release=None, # use locally built contract
 				address=subscriberAddr, # use deployed contract
@@ -297,32 +251,106 @@ def RunTests() -> List[Tuple[int, int]]:
 	return publishCost
 
 
-def StopGanache(ganacheProc: subprocess.Popen) -> None:
-	print('Shutting down ganache (it may take ~15 seconds)...')
-	waitEnd = time.time() + 20
-	ganacheProc.terminate()
-	while ganacheProc.poll() is None:
-		try:
-			if time.time() > waitEnd:
-				print('Force to shut down ganache')
-				ganacheProc.kill()
-			else:
-				print('Still waiting for ganache to shut down...')
-				ganacheProc.send_signal(signal.SIGINT)
-			ganacheProc.wait(timeout=2)
-		except subprocess.TimeoutExpired:
-			continue
-	print('Ganache has been shut down')
+def PerSubscriberGasCost(publishCost: List[Tuple[int, int]]) -> float:
+	# the marginal publish cost of one more subscriber, averaged over the sweep
+	(firstNum, firstGas), (lastNum, lastGas) = publishCost[0], publishCost[-1]
+	if lastNum == firstNum:
+		return float(firstGas) / firstNum
+	return float(lastGas - firstGas) / (lastNum - firstNum)
+
+
+def PrintPerSubscriberGasCost(
+	gasResults: List[List[Tuple[int, int]]],
+	baselinePath: Optional[str] = None,
+) -> None:
+	perSubCost = PerSubscriberGasCost(gasResults[0])
+	print('Publish gas cost per subscriber: {:.2f} gas'.format(perSubCost))
+
+	if baselinePath is None:
+		return
+
+	with open(baselinePath, 'r') as f:
+		baseline = json.load(f)
+	basePerSubCost = PerSubscriberGasCost(baseline[0])
+	print('Baseline ({}) per subscriber: {:.2f} gas'.format(
+		baselinePath,
+		basePerSubCost,
+	))
+	print('Saved per subscriber: {:.2f} gas ({:.2f}%)'.format(
+		basePerSubCost - perSubCost,
+		100.0 * (basePerSubCost - perSubCost) / basePerSubCost,
+	))
+
+	baseByNum = { num: gas for num, gas in baseline[0] }
+	for num, gas in gasResults[0]:
+		if num in baseByNum:
+			print('{:03} subscribers: {:010} gas (baseline {:010}, saved {})'.format(
+				num,
+				gas,
+				baseByNum[num],
+				baseByNum[num] - gas,
+			))
+
+
+def PrintCloneDelegateCallCost(
+	gasResults: List[List[Tuple[int, int]]],
+	baselinePath: str,
+) -> None:
+	if not os.path.isfile(baselinePath):
+		print('No full-deployment results at {} to compare with'.format(
+			baselinePath
+		))
+		return
+
+	with open(baselinePath, 'r') as f:
+		baseline = json.load(f)
+
+	baseByNum = { num: gas for num, gas in baseline[0] }
+	extraCosts = [
+		gas - baseByNum[num] for num, gas in gasResults[0] if num in baseByNum
+	]
+	if len(extraCosts) == 0:
+		return
+	print('Extra publish gas via clone (delegatecall): {:.2f} gas'.format(
+		sum(extraCosts) / len(extraCosts)
+	))
 
 
 def main():
-	ganacheProc = StartGanache()
+	argParser = argparse.ArgumentParser(
+		description='Publish gas cost evaluation with multiple subscribers'
+	)
+	argParser.add_argument(
+		'--baseline', type=str, required=False, default=None,
+		help='a publish_gas_cost.json from a previous build to compare with'
+	)
+	argParser.add_argument(
+		'--clone', action='store_true',
+		help='register the publisher with a minimal-proxy EventManager clone'
+	)
+	argParser.add_argument(
+		'--build-dir', type=str, required=False, default=None,
+		help='directory of a separate build to evaluate, where the results '
+			'are written as well (default: the build directory)'
+	)
+	argParser.add_argument(
+		'--port', type=int, required=False, default=GANACHE_PORT,
+		help='port of the ganache instance to start'
+	)
+	args = argParser.parse_args()
+
+	registerFunc = 'registerClone' if args.clone else 'register'
+	outputSuffix = '_clone' if args.clone else ''
+
+	build = EvalBuild.FromDir(args.build_dir)
+
+	ganacheProc = StartGanache(port=args.port, build=build)
 
 	try:
 		gasResults = []
 
 		for _ in range(3):
-			publishCost = RunTests()
+			publishCost = RunTests(build, args.port, registerFunc)
 
 			print('Publish gas cost results:')
 			for cost in publishCost:
@@ -330,8 +358,17 @@ def main():
 
 			gasResults.append(publishCost)
 
+		PrintPerSubscriberGasCost(gasResults, args.baseline)
+		if args.clone:
+			PrintCloneDelegateCallCost(
+				gasResults,
+				os.path.join(build.buildDir, 'publish_gas_cost.json')
+			)
+
 		# save results
-		outputFile = os.path.join(BUILD_DIR_PATH, 'publish_gas_cost.json')
+		outputFile = os.path.join(
+			build.buildDir, 'publish_gas_cost{}.json'.format(outputSuffix)
+		)
 		with open(outputFile, 'w') as f:
 			json.dump(gasResults, f, indent='\t')
 
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import json
+import os
+import random
+
+from typing import List, Optional, Tuple
+
+from eth_utils import keccak
+
+from GasCostEvalMetrics import (
+	METRICS,
+	PrintMetricsSummary,
+	WriteMetricsReport,
+)
+from GasCostEvalUtils import (
+	BUILD_DIR_PATH,
+	CallContractFunc,
+	ConnectGanache,
+	DeployContract,
+	EstimateBudgetPublishGas,
+	EstimatePublishGas,
+	LoadContract,
+	SearchMinGasLimit,
+	SelectRandomAccount,
+	StartGanache,
+	StopGanache,
+	ViewContractFunc,
+)
+# found through the utils directory, which GasCostEvalUtils puts on the path
+from MulticallReader import MulticallReader, ReadCall
+
+
+def RunTests(
+	payloadSizes: List[int],
+	numSubscribersList: List[int],
+	publishFunc: str = 'publishData',
+	gasBudget: Optional[int] = None,
+) -> List[Tuple[int, int, int, int]]:
+	w3 = ConnectGanache()
+
+	# setup account
+	privKey = SelectRandomAccount(w3)
+
+	# every subscriber is checked with a single eth_call after each publish
+	aggregatorContract, _ = DeployContract(w3, 'ReadAggregator', [ ], privKey)
+	reader = MulticallReader(w3, aggregatorContract.address)
+
+	publishCost = []
+
+	for numSubscribers in numSubscribersList:
+		print()
+		print(f'Running test with {numSubscribers} subscribers')
+		print()
+
+		# deploy PubSub and Publisher contracts
+		with METRICS.Phase('deploy'):
+			pubSubContract, _ = DeployContract(
+				w3, 'PubSubService', [ ], privKey
+			)
+			publisherContract, _ = DeployContract(
+				w3, 'HelloWorldPublisher', [ ], privKey
+			)
+		with METRICS.Phase('register'):
+			CallContractFunc(
+				w3,
+				publisherContract,
+				'register',
+				[ pubSubContract.address ],
+				privKey,
+			)
+			eventMgrContract = LoadContract(
+				w3,
+				'EventManager',
+				ViewContractFunc(
+					w3,
+					pubSubContract,
+					'getEventManagerAddr',
+					[ publisherContract.address ]
+				),
+			)
+
+		# subscribe, optionally declaring a gas budget
+		subscribers = []
+		with METRICS.Phase('subscribe'):
+			for _ in range(numSubscribers):
+				subPrivKey = SelectRandomAccount(w3)
+				subscriberContract, _ = DeployContract(
+					w3,
+					'GasEvalPayloadSubscriber',
+					[ pubSubContract.address ],
+					subPrivKey
+				)
+				CallContractFunc(
+					w3,
+					subscriberContract,
+					'subscribe' if gasBudget is None else 'subscribeBudget',
+					[ publisherContract.address ] +
+						([ ] if gasBudget is None else [ gasBudget ]),
+					subPrivKey,
+					value=10000000000000000, # 0.01 ether
+				)
+				subscribers.append(subscriberContract)
+
+		# with declared budgets, the gas limit follows the sum of the budgets
+		# instead of the worst case of every subscriber
+		if gasBudget is None:
+			limitGas = EstimatePublishGas(numSubscribers)
+		else:
+			limitGas = EstimateBudgetPublishGas(eventMgrContract, numSubscribers)
+		print('Rough publish gas limit: {}'.format(limitGas))
+
+		for payloadSize in payloadSizes:
+			payload = random.randbytes(payloadSize)
+
+			# the lowest limit the publish passes with is a metric of its
+			# own, since publishers have to supply it up front
+			with METRICS.Phase('search_gas'):
+				minLimitGas = SearchMinGasLimit(
+					w3,
+					publisherContract,
+					publishFunc,
+					[ payload ],
+					privKey,
+					# leave room for the calldata and the memory it occupies
+					limitGas + (64 * payloadSize),
+				)
+			print('Minimal publish gas limit: {}'.format(minLimitGas))
+
+			# publish the payload straight from calldata
+			print('Publishing {} bytes...'.format(payloadSize))
+			with METRICS.Phase('publish'):
+				pubTxReceipt = CallContractFunc(
+					w3,
+					publisherContract,
+					publishFunc,
+					[ payload ],
+					privKey,
+					gas=minLimitGas,
+				)
+
+			# ensure every subscriber received the payload (or its hash)
+			with METRICS.Phase('verify'):
+				recvHashes = reader.ReadValues([
+					ReadCall(x, 'm_recvDataHash') for x in subscribers
+				])
+			for subscriberContract, recvHash in zip(subscribers, recvHashes):
+				if recvHash != keccak(payload):
+					raise RuntimeError(
+						'Subscriber {} did not receive the {}-byte '
+						'payload'.format(subscriberContract.address, payloadSize)
+					)
+
+			print('Gas used: {}'.format(pubTxReceipt.gasUsed))
+			publishCost.append((
+				payloadSize,
+				numSubscribers,
+				pubTxReceipt.gasUsed,
+				minLimitGas,
+			))
+
+	return publishCost
+
+
+def PrintPayloadGasCost(
+	publishCost: List[Tuple[int, int, int, int]],
+	baselinePath: Optional[str] = None,
+) -> None:
+	baseByKey = {}
+	if baselinePath is not None:
+		with open(baselinePath, 'r') as f:
+			# older results have no minimal gas limit
+			baseByKey = {
+				(x[0], x[1]): x[2] for x in json.load(f)
+			}
+
+	for size, num, gas, minLimitGas in publishCost:
+		line = '{:06} bytes, {:03} subscribers: '.format(size, num)
+		line += '{:010} gas, limit {:010}'.format(gas, minLimitGas)
+		if (size, num) in baseByKey:
+			baseGas = baseByKey[(size, num)]
+			line += ' (baseline {:010}, saved {} / {:.2f}%)'.format(
+				baseGas,
+				baseGas - gas,
+				100.0 * (baseGas - gas) / baseGas,
+			)
+		print(line)
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Publish gas cost evaluation by payload size and '
+			'number of subscribers'
+	)
+	argParser.add_argument(
+		'--sizes', type=int, required=False, nargs='+',
+		default=[ 32, 256, 1024, 4096, 16384 ],
+		help='payload sizes (in bytes) to evaluate'
+	)
+	argParser.add_argument(
+		'--subscribers', type=int, required=False, nargs='+',
+		default=[ 1, 5, 10, 20 ],
+		help='numbers of subscribers to evaluate'
+	)
+	argParser.add_argument(
+		'--hash', action='store_true',
+		help='publish in hash-only mode, where subscribers only receive '
+			'the hash of the payload'
+	)
+	argParser.add_argument(
+		'--gas-budget', type=int, required=False, default=None,
+		help='gas budget declared by each subscriber when subscribing '
+			'(default: the EventManager\'s default budget)'
+	)
+	argParser.add_argument(
+		'--baseline', type=str, required=False, default=None,
+		help='a publish_payload_gas_cost.json from a previous build to '
+			'compare with'
+	)
+	argParser.add_argument(
+		'--prometheus', action='store_true',
+		help='also write the metrics in the Prometheus text format'
+	)
+	args = argParser.parse_args()
+
+	ganacheProc = StartGanache()
+
+	try:
+		publishCost = RunTests(
+			args.sizes,
+			args.subscribers,
+			'publishDataHash' if args.hash else 'publishData',
+			args.gas_budget,
+		)
+
+		print('Publish gas cost results:')
+		PrintPayloadGasCost(publishCost, args.baseline)
+
+		# save results
+		outputFile = os.path.join(
+			BUILD_DIR_PATH,
+			'publish_payload{}{}_gas_cost.json'.format(
+				'_hash' if args.hash else '',
+				'' if args.gas_budget is None else '_budget',
+			)
+		)
+		with open(outputFile, 'w') as f:
+			json.dump(publishCost, f, indent='\t')
+
+		PrintMetricsSummary()
+		WriteMetricsReport(outputFile, args.prometheus)
+
+	finally:
+		# finish and exit
+		StopGanache(ganacheProc)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import json
+import os
+import random
+
+from typing import List
+
+from GasCostEvalMetrics import PrintMetricsSummary, WriteMetricsReport
+from GasCostEvalUtils import (
+	BUILD_DIR_PATH,
+	CallContractFunc,
+	ConnectGanache,
+	DeployContract,
+	DeploySubscriberFleet,
+	EstimatePublishGas,
+	SelectRandomAccount,
+	StartGanache,
+	StopGanache,
+	ViewContractFunc,
+)
+
+
+# pushing to 1000 subscribers needs far more gas than a mainnet block has
+BLOCK_GAS_LIMIT = 1000000000
+
+
+def RunTests(
+	numSubscribersList: List[int],
+	numPullSamples: int,
+) -> List[dict]:
+	w3 = ConnectGanache()
+
+	# setup account
+	privKey = SelectRandomAccount(w3)
+
+	results = []
+
+	for numSubscribers in numSubscribersList:
+		print()
+		print(f'Running test with {numSubscribers} subscribers')
+		print()
+
+		# deploy PubSub and Publisher contracts
+		pubSubContract, _ = DeployContract(w3, 'PubSubService', [ ], privKey)
+		publisherContract, _ = DeployContract(
+			w3, 'HelloWorldPublisher', [ ], privKey
+		)
+		CallContractFunc(
+			w3, publisherContract, 'register', [ pubSubContract.address ], privKey
+		)
+		factoryContract, _ = DeployContract(
+			w3, 'SubscriberFleetFactory', [ ], privKey
+		)
+
+		# subscribers for push delivery, deployed and subscribed in batches
+		print('Subscribing {} subscribers to publisher...'.format(numSubscribers))
+		DeploySubscriberFleet(
+			w3,
+			factoryContract,
+			'GasEvalPayloadSubscriber',
+			pubSubContract.address,
+			publisherContract.address,
+			numSubscribers,
+			10000000000000000, # 0.01 ether
+			privKey,
+		)
+
+		# pull subscribers don't register anywhere, so their number has no
+		# effect on the post cost; only a sample is deployed to measure the
+		# cost each of them pays to read a message
+		pullSubscribers = []
+		for _ in range(min(numSubscribers, numPullSamples)):
+			subscriberContract, _ = DeployContract(
+				w3,
+				'HelloWorldPullSubscriber',
+				[ pubSubContract.address, publisherContract.address ],
+				SelectRandomAccount(w3)
+			)
+			pullSubscribers.append(subscriberContract)
+
+		expectedMsg = random.randbytes(32).hex()
+		CallContractFunc(
+			w3, publisherContract, 'setSendData', [ expectedMsg ], privKey
+		)
+
+		# post to the inbox (sequence number 1)
+		print('Posting...')
+		postTxReceipt = CallContractFunc(
+			w3, publisherContract, 'post', [ ], privKey
+		)
+
+		# push to every subscriber (sequence number 2)
+		print('Publishing...')
+		pubTxReceipt = CallContractFunc(
+			w3,
+			publisherContract,
+			'publish',
+			[ ],
+			privKey,
+			gas=EstimatePublishGas(numSubscribers),
+		)
+
+		# each pull subscriber reads the posted message at its own cost
+		pullGas = []
+		for subscriberContract in pullSubscribers:
+			pullTxReceipt = CallContractFunc(
+				w3, subscriberContract, 'pull', [ 1 ], SelectRandomAccount(w3)
+			)
+			msg = ViewContractFunc(w3, subscriberContract, 'm_recvData')
+			if msg != expectedMsg:
+				raise RuntimeError(
+					'Message pulled does not match the expected message '
+					'"{} != {}"'.format(
+						msg,
+						expectedMsg,
+					)
+				)
+			pullGas.append(pullTxReceipt.gasUsed)
+
+		results.append({
+			'numSubscribers': numSubscribers,
+			'pushPublishGas': pubTxReceipt.gasUsed,
+			'pullPostGas'   : postTxReceipt.gasUsed,
+			'pullReadGas'   : sum(pullGas) / len(pullGas),
+		})
+
+	return results
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Publish gas cost evaluation of push vs pull delivery'
+	)
+	argParser.add_argument(
+		'--subscribers', type=int, required=False, nargs='+',
+		default=[ 1, 10, 100, 1000 ],
+		help='numbers of subscribers to evaluate'
+	)
+	argParser.add_argument(
+		'--pull-samples', type=int, required=False, default=10,
+		help='number of pull subscribers used to measure the read cost'
+	)
+	argParser.add_argument(
+		'--prometheus', action='store_true',
+		help='also write the metrics in the Prometheus text format'
+	)
+	args = argParser.parse_args()
+
+	ganacheProc = StartGanache(
+		extraArgs=[
+			'--miner.blockGasLimit', str(BLOCK_GAS_LIMIT),
+			'--miner.callGasLimit', str(BLOCK_GAS_LIMIT),
+		]
+	)
+
+	try:
+		results = RunTests(args.subscribers, args.pull_samples)
+
+		print('Push vs pull gas cost results:')
+		for res in results:
+			print(
+				'{:04} subscribers: push {:011} gas, post {:08} gas '
+				'(+ {:.0f} gas per subscriber read)'.format(
+					res['numSubscribers'],
+					res['pushPublishGas'],
+					res['pullPostGas'],
+					res['pullReadGas'],
+				)
+			)
+
+		# save results
+		outputFile = os.path.join(BUILD_DIR_PATH, 'push_pull_gas_cost.json')
+		with open(outputFile, 'w') as f:
+			json.dump(results, f, indent='\t')
+
+		PrintMetricsSummary()
+		WriteMetricsReport(outputFile, args.prometheus)
+
+	finally:
+		# finish and exit
+		StopGanache(ganacheProc)
+
+
+if __name__ == "__main__":
+	main()
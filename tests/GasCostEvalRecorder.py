@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import atexit
+import gzip
+import json
+
+from typing import Any, Callable, Dict, List, Optional
+from hexbytes import HexBytes
+from web3 import Web3
+
+
+# set to a file path to record the transactions of an evaluation run
+RECORD_PATH_ENV_VAR = 'GAS_EVAL_RECORD_PATH'
+RECORD_VERSION      = 2
+
+
+def _Hex(value: Any) -> str:
+	return Web3.to_hex(HexBytes(value))
+
+
+class TxRecorder(object):
+	'''
+	Capture the signed raw transactions sent to the node, in order, with
+	the gasUsed and status of their receipts, so a run can be replayed by
+	GasCostEvalReplay.py without the contract plumbing
+
+	Chain snapshots and reverts (evm_snapshot and evm_revert) are recorded
+	too, as [ txIndex, method, snapshotNum ] in "snapshots": the call was
+	made before txs[txIndex] was sent, on the snapshotNum-th snapshot of
+	the run (node-assigned snapshot IDs may differ in the replay).
+
+	The record is a gzipped JSON document:
+	{ "version", "numAccounts", "blockGasLimit", "txs": [ [ rawTx,
+	gasUsed, status ], ... ], "snapshots": [ [ txIndex, method,
+	snapshotNum ], ... ] }; it is written when the process exits.
+	'''
+
+	def __init__(self, path: str) -> None:
+		self.path = path
+		self.numAccounts: Optional[int] = None
+		self.blockGasLimit: Optional[int] = None
+		self.txs: List[List[Any]] = []
+		self.indexByHash: Dict[str, int] = {}
+		self.snapshots: List[List[Any]] = []
+		self.snapshotNumById: Dict[str, int] = {}
+
+	def Attach(self, w3: Web3) -> None:
+		# only the first node is recorded; the evaluations talk to a
+		# single ganache instance
+		if self.numAccounts is None:
+			self.numAccounts = len(w3.eth.accounts)
+			self.blockGasLimit = w3.eth.get_block('latest').gasLimit
+		w3.middleware_onion.inject(self.Middleware, 'tx_recorder', layer=0)
+
+	def Middleware(
+		self,
+		makeRequest: Callable[[str, Any], Any],
+		w3: Web3,
+	) -> Callable[[str, Any], Any]:
+		def _Middleware(method: str, params: Any) -> Any:
+			response = makeRequest(method, params)
+			result = response.get('result')
+			if result is None:
+				return response
+
+			if method == 'eth_sendRawTransaction':
+				self.indexByHash[_Hex(result)] = len(self.txs)
+				self.txs.append([ _Hex(params[0]), None, None ])
+			elif method == 'eth_getTransactionReceipt':
+				index = self.indexByHash.get(_Hex(params[0]))
+				if index is not None:
+					self.txs[index][1] = int(result['gasUsed'], 16)
+					self.txs[index][2] = int(result['status'], 16)
+			elif method == 'evm_snapshot':
+				snapshotNum = len(self.snapshotNumById)
+				self.snapshotNumById[str(result)] = snapshotNum
+				self.snapshots.append([ len(self.txs), method, snapshotNum ])
+			elif method == 'evm_revert' and result:
+				snapshotNum = self.snapshotNumById.get(str(params[0]))
+				if snapshotNum is None:
+					raise RuntimeError(
+						'Cannot record a revert to snapshot {}, which was '
+						'taken before the recording started'.format(params[0])
+					)
+				self.snapshots.append([ len(self.txs), method, snapshotNum ])
+			return response
+
+		return _Middleware
+
+	def Save(self) -> None:
+		with gzip.open(self.path, 'wt') as f:
+			json.dump(
+				{
+					'version'      : RECORD_VERSION,
+					'numAccounts'  : self.numAccounts,
+					'blockGasLimit': self.blockGasLimit,
+					'txs'          : self.txs,
+					'snapshots'    : self.snapshots,
+				},
+				f,
+				separators=(',', ':'),
+			)
+		print('Recorded {} transactions to {}'.format(
+			len(self.txs),
+			self.path,
+		))
+
+
+_RECORDER: Optional[TxRecorder] = None
+
+
+def StartRecording(w3: Web3, path: str) -> None:
+	global _RECORDER
+	if _RECORDER is None:
+		_RECORDER = TxRecorder(path)
+		atexit.register(_RECORDER.Save)
+	_RECORDER.Attach(w3)
+
+
+def LoadRecord(path: str) -> dict:
+	with gzip.open(path, 'rt') as f:
+		record = json.load(f)
+	if record.get('version') != RECORD_VERSION:
+		raise ValueError(
+			'Unsupported record version {}'.format(record.get('version'))
+		)
+	return record
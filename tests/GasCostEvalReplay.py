@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import sys
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from GasCostEvalRecorder import LoadRecord
+from GasCostEvalUtils import (
+	GANACHE_PORT,
+	ConnectGanache,
+	StartGanache,
+	StopGanache,
+)
+
+
+RECEIPT_BATCH_SIZE = 500
+
+
+def Replay(
+	record: dict,
+	port: int,
+) -> List[Tuple[int, str, Optional[int], int]]:
+	'''
+	Send the recorded raw transactions to a fresh node, taking and
+	reverting to snapshots where the run did, and fetch their receipts in
+	batches
+	@return (index, hash, recorded gasUsed, replayed gasUsed) of every
+	        transaction whose gasUsed or status differs from the record
+	'''
+	ganacheUrl = 'http://localhost:{}'.format(port)
+	session = requests.Session()
+
+	def _Rpc(payload: Any) -> Any:
+		resp = session.post(ganacheUrl, json=payload)
+		resp.raise_for_status()
+		return resp.json()
+
+	txHashes: List[str] = []
+	mismatches = []
+
+	def _CheckReceipts(start: int) -> None:
+		# fetch the receipts of txs[start:] with batched requests
+		for batchStart in range(start, len(txHashes), RECEIPT_BATCH_SIZE):
+			batch = [
+				{
+					'jsonrpc': '2.0',
+					'id'     : batchStart + j,
+					'method' : 'eth_getTransactionReceipt',
+					'params' : [ txHash ],
+				}
+				for j, txHash in enumerate(
+					txHashes[batchStart : batchStart + RECEIPT_BATCH_SIZE]
+				)
+			]
+			for resp in _Rpc(batch):
+				i = resp['id']
+				receipt = resp.get('result')
+				if receipt is None:
+					raise RuntimeError(
+						'Transaction {} has no receipt'.format(i)
+					)
+
+				_, recGasUsed, recStatus = record['txs'][i]
+				gasUsed = int(receipt['gasUsed'], 16)
+				status = int(receipt['status'], 16)
+				# transactions whose receipts were never fetched during the
+				# recording have nothing to compare with
+				if (
+					(recGasUsed is not None) and
+					(gasUsed != recGasUsed or status != recStatus)
+				):
+					mismatches.append((i, txHashes[i], recGasUsed, gasUsed))
+
+	# node-assigned IDs of the snapshots, by their number in the record
+	snapshotIds: Dict[int, str] = {}
+	snapshots = record['snapshots']
+	nextSnapshot = 0
+	checkedTxs = 0
+
+	def _ApplySnapshots(txIndex: int) -> None:
+		nonlocal nextSnapshot, checkedTxs
+		while (
+			(nextSnapshot < len(snapshots)) and
+			(snapshots[nextSnapshot][0] == txIndex)
+		):
+			_, method, snapshotNum = snapshots[nextSnapshot]
+			nextSnapshot += 1
+			if method == 'evm_snapshot':
+				params = [ ]
+			else:
+				# the receipts are gone once the chain is reverted
+				_CheckReceipts(checkedTxs)
+				checkedTxs = len(txHashes)
+				params = [ snapshotIds[snapshotNum] ]
+			resp = _Rpc({
+				'jsonrpc': '2.0',
+				'id'     : 0,
+				'method' : method,
+				'params' : params,
+			})
+			if ('error' in resp) or (not resp['result']):
+				raise RuntimeError('{} before transaction {} failed'.format(
+					method,
+					txIndex,
+				))
+			if method == 'evm_snapshot':
+				snapshotIds[snapshotNum] = resp['result']
+
+	# submit the transactions back to back, without waiting for receipts;
+	# ganache mines each one as it arrives, so they are executed in the
+	# recorded order
+	for i, (rawTx, _, _) in enumerate(record['txs']):
+		_ApplySnapshots(i)
+		resp = _Rpc({
+			'jsonrpc': '2.0',
+			'id'     : i,
+			'method' : 'eth_sendRawTransaction',
+			'params' : [ rawTx ],
+		})
+		if 'error' in resp:
+			raise RuntimeError('Transaction {} was rejected: {}'.format(
+				i,
+				resp['error'].get('message'),
+			))
+		txHashes.append(resp['result'])
+	_ApplySnapshots(len(record['txs']))
+	_CheckReceipts(checkedTxs)
+
+	return sorted(mismatches)
+
+
+def ReplayRecord(
+	record: dict,
+	port: int = GANACHE_PORT,
+) -> List[Tuple[int, str, Optional[int], int]]:
+	'''
+	Replay the record on a ganache started with the recorded accounts and
+	block gas limit
+	@return The mismatches found by Replay
+	'''
+	ganacheProc = StartGanache(
+		port=port,
+		numAccounts=record['numAccounts'],
+		extraArgs=[
+			'--miner.blockGasLimit', str(record['blockGasLimit']),
+			'--miner.callGasLimit', str(record['blockGasLimit']),
+		],
+	)
+
+	try:
+		ConnectGanache(port)
+
+		start = time.perf_counter()
+		mismatches = Replay(record, port)
+		elapsed = time.perf_counter() - start
+
+		print('Replayed {} transactions in {:.2f} s ({:.0f} tx/s)'.format(
+			len(record['txs']),
+			elapsed,
+			len(record['txs']) / max(elapsed, 1e-9),
+		))
+
+	finally:
+		# finish and exit
+		StopGanache(ganacheProc)
+
+	return mismatches
+
+
+def PrintMismatches(
+	mismatches: List[Tuple[int, str, Optional[int], int]],
+) -> None:
+	for i, txHash, recGasUsed, gasUsed in mismatches:
+		print('Transaction {} ({}): recorded {} gas, replayed {}'.format(
+			i,
+			txHash,
+			recGasUsed,
+			gasUsed,
+		))
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Replay the transactions recorded from a gas cost '
+			'evaluation (with the GAS_EVAL_RECORD_PATH environment '
+			'variable) on a fresh ganache, and check their gas usage'
+	)
+	argParser.add_argument(
+		'record', type=str,
+		help='path to the record file'
+	)
+	argParser.add_argument(
+		'--port', type=int, required=False, default=GANACHE_PORT,
+		help='port of the ganache instance to start'
+	)
+	args = argParser.parse_args()
+
+	mismatches = ReplayRecord(LoadRecord(args.record), args.port)
+	PrintMismatches(mismatches)
+
+	if len(mismatches) > 0:
+		print('{} transactions differ from the record'.format(len(mismatches)))
+		sys.exit(1)
+	print('All transactions match the record')
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from GasCostEvalRecorder import RECORD_PATH_ENV_VAR, LoadRecord
+from GasCostEvalReplay import PrintMismatches, ReplayRecord
+from GasCostEvalUtils import GANACHE_PORT
+
+
+TESTS_DIR_PATH   = os.path.dirname(os.path.abspath(__file__))
+ECONOMICS_SCRIPT = os.path.join(TESTS_DIR_PATH, 'GasCostEvalEconomics.py')
+# two mixes at two gas prices, so the run reverts to the base snapshot
+# between the mixes, and to each mix's snapshot between the gas prices
+ECONOMICS_ARGS   = [
+	'--mixes', '2x0.01', '1x0.001+1x1',
+	'--gas-prices', '1', '20',
+	'--publishes', '5',
+	'--sample-every', '1',
+]
+
+
+def RecordEconomicsRun(workDir: str) -> dict:
+	'''
+	Run a short GasCostEvalEconomics.py with the recorder on
+	@return The record of the run
+	'''
+	recordPath = os.path.join(workDir, 'economics.rec.gz')
+	env = dict(os.environ)
+	env[RECORD_PATH_ENV_VAR] = recordPath
+	subprocess.run(
+		[ sys.executable, ECONOMICS_SCRIPT ] + ECONOMICS_ARGS + [
+			'--output', os.path.join(workDir, 'publish_economics.json'),
+		],
+		env=env,
+		check=True,
+	)
+	return LoadRecord(recordPath)
+
+
+def CheckRecord(record: dict) -> None:
+	methods = set([ x[1] for x in record['snapshots'] ])
+	if 'evm_revert' not in methods:
+		raise RuntimeError(
+			'The record has no reverts to replay (snapshots: {})'.format(
+				record['snapshots']
+			)
+		)
+	if all([ gasUsed is None for _, gasUsed, _ in record['txs'] ]):
+		raise RuntimeError('The record has no receipts to compare with')
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Record a short publish economics run, which takes and '
+			'reverts to snapshots, and check that its replay matches the '
+			'record'
+	)
+	argParser.add_argument(
+		'--port', type=int, required=False, default=GANACHE_PORT + 1,
+		help='port of the ganache instance to replay on'
+	)
+	args = argParser.parse_args()
+
+	with tempfile.TemporaryDirectory() as workDir:
+		record = RecordEconomicsRun(workDir)
+	CheckRecord(record)
+	print('Recorded {} transactions and {} snapshot calls'.format(
+		len(record['txs']),
+		len(record['snapshots']),
+	))
+
+	mismatches = ReplayRecord(record, args.port)
+	PrintMismatches(mismatches)
+
+	if len(mismatches) > 0:
+		print('{} transactions differ from the record'.format(len(mismatches)))
+		sys.exit(1)
+	print('The replay matches the record')
+
+
+if __name__ == "__main__":
+	main()
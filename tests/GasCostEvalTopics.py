@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import json
+import os
+import random
+
+from typing import List
+
+from eth_utils import keccak
+
+from GasCostEvalMetrics import PrintMetricsSummary, WriteMetricsReport
+from GasCostEvalUtils import (
+	BUILD_DIR_PATH,
+	CallContractFunc,
+	ConnectGanache,
+	DeployContract,
+	EstimatePublishGas,
+	SelectRandomAccount,
+	StartGanache,
+	StopGanache,
+	ViewContractFunc,
+)
+
+
+def AssignTopics(
+	numSubscribers: int,
+	numTopics: int,
+	skew: float,
+) -> List[int]:
+	'''
+	Assign each subscriber a topic in [1, numTopics], following a Zipf-like
+	distribution where topic k is chosen with weight 1 / k^skew;
+	a skew of 0 spreads the subscribers evenly over the topics
+	'''
+	topics = list(range(1, numTopics + 1))
+	weights = [ 1.0 / (k ** skew) for k in topics ]
+	return random.choices(topics, weights=weights, k=numSubscribers)
+
+
+def RunTests(
+	numSubscribersList: List[int],
+	numTopics: int,
+	skew: float,
+) -> List[dict]:
+	w3 = ConnectGanache()
+
+	# setup account
+	privKey = SelectRandomAccount(w3)
+
+	results = []
+
+	for numSubscribers in numSubscribersList:
+		print()
+		print(f'Running test with {numSubscribers} subscribers')
+		print()
+
+		# deploy PubSub and Publisher contracts
+		pubSubContract, _ = DeployContract(w3, 'PubSubService', [ ], privKey)
+		publisherContract, _ = DeployContract(
+			w3, 'HelloWorldPublisher', [ ], privKey
+		)
+		CallContractFunc(
+			w3, publisherContract, 'register', [ pubSubContract.address ], privKey
+		)
+
+		# subscribe every subscriber twice: once to its own topic, and once
+		# (through a second subscriber contract) to the default topic, so
+		# the topic and broadcast publishes reach the same number of
+		# subscribers in total
+		topicAssignment = AssignTopics(numSubscribers, numTopics, skew)
+		topicSubscribers = { topic: [] for topic in range(1, numTopics + 1) }
+		print('Subscribing {} subscribers to publisher...'.format(numSubscribers))
+		for topic in topicAssignment:
+			subPrivKey = SelectRandomAccount(w3)
+
+			subscriberContract, _ = DeployContract(
+				w3,
+				'GasEvalPayloadSubscriber',
+				[ pubSubContract.address ],
+				subPrivKey
+			)
+			CallContractFunc(
+				w3,
+				subscriberContract,
+				'subscribeTopic',
+				[ publisherContract.address, topic ],
+				subPrivKey,
+				value=10000000000000000, # 0.01 ether
+			)
+			topicSubscribers[topic].append(subscriberContract)
+
+			broadcastContract, _ = DeployContract(
+				w3,
+				'GasEvalPayloadSubscriber',
+				[ pubSubContract.address ],
+				subPrivKey
+			)
+			CallContractFunc(
+				w3,
+				broadcastContract,
+				'subscribe',
+				[ publisherContract.address ],
+				subPrivKey,
+				value=10000000000000000, # 0.01 ether
+			)
+
+		payload = random.randbytes(32)
+
+		# broadcast: every subscriber receives the message
+		print('Broadcasting...')
+		broadcastTxReceipt = CallContractFunc(
+			w3,
+			publisherContract,
+			'publishData',
+			[ payload ],
+			privKey,
+			gas=EstimatePublishGas(numSubscribers),
+		)
+
+		# topic: one publish per topic, each reaching only its subscribers
+		topicGas = {}
+		for topic, subscribers in topicSubscribers.items():
+			print('Publishing to topic {} ({} subscribers)...'.format(
+				topic,
+				len(subscribers),
+			))
+			topicTxReceipt = CallContractFunc(
+				w3,
+				publisherContract,
+				'publishDataTopic',
+				[ topic, payload ],
+				privKey,
+				gas=EstimatePublishGas(len(subscribers)),
+			)
+			for subscriberContract in subscribers:
+				recvHash = ViewContractFunc(
+					w3, subscriberContract, 'm_recvDataHash'
+				)
+				if recvHash != keccak(payload):
+					raise RuntimeError(
+						'Subscriber {} did not receive topic {}'.format(
+							subscriberContract.address,
+							topic,
+						)
+					)
+			topicGas[topic] = {
+				'numSubscribers': len(subscribers),
+				'publishGas'    : topicTxReceipt.gasUsed,
+			}
+
+		results.append({
+			'numSubscribers'  : numSubscribers,
+			'numTopics'       : numTopics,
+			'skew'            : skew,
+			'broadcastGas'    : broadcastTxReceipt.gasUsed,
+			'topicGas'        : topicGas,
+		})
+
+	return results
+
+
+def PrintTopicGasCost(results: List[dict]) -> None:
+	for res in results:
+		topicGasList = [ t['publishGas'] for t in res['topicGas'].values() ]
+		hottest = max(
+			res['topicGas'].values(),
+			key=lambda t: t['numSubscribers'],
+		)
+		print(
+			'{:04} subscribers: broadcast {:010} gas, '
+			'per topic avg {:.0f} gas, hottest topic ({} subscribers) '
+			'{:010} gas'.format(
+				res['numSubscribers'],
+				res['broadcastGas'],
+				sum(topicGasList) / len(topicGasList),
+				hottest['numSubscribers'],
+				hottest['publishGas'],
+			)
+		)
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Publish gas cost evaluation of topic-scoped '
+			'subscriptions vs broadcast'
+	)
+	argParser.add_argument(
+		'--subscribers', type=int, required=False, nargs='+',
+		default=[ 10, 20, 40 ],
+		help='numbers of subscribers to evaluate'
+	)
+	argParser.add_argument(
+		'--topics', type=int, required=False, default=8,
+		help='number of topics the subscribers are spread over'
+	)
+	argParser.add_argument(
+		'--skew', type=float, required=False, default=1.0,
+		help='Zipf exponent of the topic popularity (0 for uniform)'
+	)
+	argParser.add_argument(
+		'--prometheus', action='store_true',
+		help='also write the metrics in the Prometheus text format'
+	)
+	args = argParser.parse_args()
+
+	ganacheProc = StartGanache()
+
+	try:
+		results = RunTests(args.subscribers, args.topics, args.skew)
+
+		print('Topic gas cost results:')
+		PrintTopicGasCost(results)
+
+		# save results
+		outputFile = os.path.join(BUILD_DIR_PATH, 'publish_topic_gas_cost.json')
+		with open(outputFile, 'w') as f:
+			json.dump(results, f, indent='\t')
+
+		PrintMetricsSummary()
+		WriteMetricsReport(outputFile, args.prometheus)
+
+	finally:
+		# finish and exit
+		StopGanache(ganacheProc)
+
+
+if __name__ == "__main__":
+	main()
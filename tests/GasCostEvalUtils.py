@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+from eth_abi import encode as AbiEncode
+from eth_utils import function_abi_to_4byte_selector, keccak
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from web3 import Web3
+from web3.contract import Contract
+from web3.exceptions import ContractLogicError
+
+from GasCostEvalMetrics import METRICS, InstallMetrics
+from GasCostEvalRecorder import RECORD_PATH_ENV_VAR, StartRecording
+
+
+BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
+UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
+PYHELPER_DIR        = os.path.join(UTILS_DIR_PATH, 'PyEthHelper')
+PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
+CHECKSUM_KEYS_PATH  = os.path.join(BUILD_DIR_PATH, 'ganache_keys_checksum.json')
+GANACHE_KEYS_PATH   = os.path.join(BUILD_DIR_PATH, 'ganache_keys.json')
+GANACHE_PORT        = 7545
+NUM_OF_ACCOUNTS     = 100
+GANACHE_NET_ID      = 1337
+# estimateGas results are cached with this much headroom, so a repeated
+# call whose storage writes cost a little more still fits
+GAS_LIMIT_HEADROOM  = 1.25
+# the selector of Solidity's Panic(uint256) error
+PANIC_SELECTOR      = '4e487b71'
+
+
+sys.path.append(PYHELPER_DIR)
+from PyEthHelper import EthContractHelper
+from PyEthHelper import GanacheAccounts
+sys.path.append(UTILS_DIR_PATH)
+
+
+class EvalBuild(NamedTuple):
+	'''
+	The build an evaluation runs against: the contract artifacts (found
+	through the project config) and the ganache keys
+	'''
+
+	buildDir: str
+	projConfPath: str
+
+	@property
+	def checksumKeysPath(self) -> str:
+		return os.path.join(self.buildDir, 'ganache_keys_checksum.json')
+
+	@property
+	def ganacheKeysPath(self) -> str:
+		return os.path.join(self.buildDir, 'ganache_keys.json')
+
+	@staticmethod
+	def FromDir(buildDir: Optional[str]) -> 'EvalBuild':
+		'''
+		A separate build (e.g. one cell of GasCostEvalCompilerMatrix), or the
+		default one if buildDir is None
+		'''
+		if buildDir is None:
+			return DEFAULT_BUILD
+		buildDir = os.path.abspath(buildDir)
+		# a separate build comes with its own project config, whose
+		# buildDir points the contract loader at its artifacts
+		return EvalBuild(buildDir, os.path.join(buildDir, 'project_conf.json'))
+
+
+DEFAULT_BUILD = EvalBuild(BUILD_DIR_PATH, PROJECT_CONFIG_PATH)
+
+
+def StartGanache(
+	port: int = GANACHE_PORT,
+	numAccounts: int = NUM_OF_ACCOUNTS,
+	extraArgs: Optional[List[str]] = None,
+	build: EvalBuild = DEFAULT_BUILD,
+) -> subprocess.Popen:
+	cmd = [
+		'ganache-cli',
+		'-p', str(port),
+		'-d',
+		'-a', str(numAccounts),
+		'--network-id', str(GANACHE_NET_ID),
+		'--chain.hardfork', 'shanghai',
+		'--wallet.accountKeysPath', str(build.ganacheKeysPath),
+	]
+	if extraArgs is not None:
+		cmd += extraArgs
+	proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+	return proc
+
+
+def StopGanache(ganacheProc: subprocess.Popen) -> None:
+	print('Shutting down ganache (it may take ~15 seconds)...')
+	waitEnd = time.time() + 20
+	ganacheProc.terminate()
+	while ganacheProc.poll() is None:
+		try:
+			if time.time() > waitEnd:
+				print('Force to shut down ganache')
+				ganacheProc.kill()
+			else:
+				print('Still waiting for ganache to shut down...')
+				ganacheProc.send_signal(signal.SIGINT)
+			ganacheProc.wait(timeout=2)
+		except subprocess.TimeoutExpired:
+			continue
+	print('Ganache has been shut down')
+
+
+def ConnectGanache(
+	port: int = GANACHE_PORT,
+	build: EvalBuild = DEFAULT_BUILD,
+) -> Web3:
+	ganacheUrl = 'http://localhost:{}'.format(port)
+	w3 = Web3(Web3.HTTPProvider(ganacheUrl))
+	InstallMetrics(w3)
+	while not w3.is_connected():
+		print('Attempting to connect to ganache...')
+		time.sleep(1)
+	print('Connected to ganache')
+
+	recordPath = os.environ.get(RECORD_PATH_ENV_VAR)
+	if recordPath:
+		StartRecording(w3, recordPath)
+
+	# checksum keys
+	GanacheAccounts.ChecksumGanacheKeysFile(
+		build.checksumKeysPath,
+		build.ganacheKeysPath
+	)
+
+	return w3
+
+
+def SetupAccount(
+	w3: Web3,
+	accountIdx: int,
+	build: EvalBuild = DEFAULT_BUILD,
+) -> str:
+	return EthContractHelper.SetupSendingAccount(
+		w3=w3,
+		account=accountIdx,
+		keyJson=build.checksumKeysPath
+	)
+
+
+def SelectRandomAccount(
+	w3: Web3,
+	numAccounts: int = NUM_OF_ACCOUNTS,
+	build: EvalBuild = DEFAULT_BUILD,
+) -> str:
+	return SetupAccount(w3, random.randint(0, numAccounts - 1), build)
+
+
+def LoadContract(
+	w3: Web3,
+	contractName: str,
+	address: Optional[str] = None,
+	build: EvalBuild = DEFAULT_BUILD,
+) -> Contract:
+	return EthContractHelper.LoadContract(
+		w3=w3,
+		projConf=build.projConfPath,
+		contractName=contractName,
+		release=None, # use locally built contract
+		address=address,
+	)
+
+
+def _ArgShape(arg: Any) -> Any:
+	# the part of an argument that affects the gas cost the most: the type,
+	# the length of byte strings and lists, and the value of integers, since
+	# they may drive loops (e.g., the count of SubscriberFleetFactory)
+	if isinstance(arg, (bytes, bytearray, str)):
+		return (type(arg).__name__, len(arg))
+	if isinstance(arg, (list, tuple)):
+		return tuple([ _ArgShape(x) for x in arg ])
+	if isinstance(arg, int):
+		return (type(arg).__name__, arg)
+	return type(arg).__name__
+
+
+class GasLimitCache(object):
+	'''
+	Known-good gas limits of transactions, keyed by the code hash of the
+	contract, the function selector and the shape of the arguments, so
+	repeated calls of the same kind skip eth_estimateGas
+	'''
+
+	def __init__(self) -> None:
+		self.limits: Dict[Tuple[Any, ...], int] = {}
+		self.codeHashes: Dict[str, bytes] = {}
+		self.blockGasLimit: Optional[int] = None
+
+	def CodeHash(self, w3: Web3, address: str) -> bytes:
+		if address not in self.codeHashes:
+			self.codeHashes[address] = keccak(w3.eth.get_code(address))
+		return self.codeHashes[address]
+
+	def BlockGasLimit(self, w3: Web3) -> int:
+		if self.blockGasLimit is None:
+			self.blockGasLimit = w3.eth.get_block('latest').gasLimit
+		return self.blockGasLimit
+
+	def Send(
+		self,
+		w3: Web3,
+		key: Tuple[Any, ...],
+		estimate: Callable[[], int],
+		check: Callable[[int], Any],
+		send: Callable[[int], Any],
+	) -> Any:
+		'''
+		Send a transaction with the cached gas limit of its key, or with a
+		fresh estimation if there is none or the cached one falls short;
+		a cached limit is first tried with check (an eth_call), so a stale
+		one never costs a failed transaction
+		'''
+		cachedGas = self.limits.get(key)
+		if cachedGas is not None:
+			METRICS.CountEvent('gas_limit_cache_hit')
+			try:
+				check(cachedGas)
+			except (ContractLogicError, ValueError):
+				# the state has changed enough for the cached limit to
+				# fall short
+				METRICS.CountEvent('gas_limit_cache_stale')
+				del self.limits[key]
+			else:
+				return send(cachedGas)
+		else:
+			METRICS.CountEvent('gas_limit_cache_miss')
+
+		gas = min(
+			int(estimate() * GAS_LIMIT_HEADROOM),
+			self.BlockGasLimit(w3),
+		)
+		receipt = send(gas)
+		if receipt.status == 1:
+			self.limits[key] = gas
+		return receipt
+
+
+GAS_LIMIT_CACHE = GasLimitCache()
+
+
+def DeployContract(
+	w3: Web3,
+	contractName: str,
+	arguments: List[Any],
+	privKey: str,
+	value: int = 0,
+) -> Tuple[Contract, Any]:
+	contract = LoadContract(w3, contractName)
+	constructor = contract.constructor(*arguments)
+	key = (
+		keccak(contract.bytecode),
+		'constructor',
+		_ArgShape(arguments),
+		value > 0,
+	)
+
+	def _Send(gas: int) -> Any:
+		return EthContractHelper.DeployContract(
+			w3=w3,
+			contract=contract,
+			arguments=arguments,
+			privKey=privKey,
+			gas=gas,
+			value=value,
+			confirmPrompt=False # don't prompt for confirmation
+		)
+
+	tx = {
+		'from': w3.eth.account.from_key(privKey).address,
+		'value': value,
+	}
+
+	with METRICS.Helper('DeployContract'):
+		receipt = GAS_LIMIT_CACHE.Send(
+			w3,
+			key,
+			lambda: constructor.estimate_gas(tx),
+			lambda gas: w3.eth.call(dict(
+				tx,
+				data=constructor.data_in_transaction,
+				gas=gas,
+				gasPrice=w3.eth.gas_price,
+			)),
+			_Send,
+		)
+
+	return LoadContract(w3, contractName, receipt.contractAddress), receipt
+
+
+def CallContractFunc(
+	w3: Web3,
+	contract: Contract,
+	funcName: str,
+	arguments: List[Any],
+	privKey: str,
+	gas: Optional[int] = None,
+	value: int = 0,
+) -> Any:
+	def _Send(gas: int) -> Any:
+		return EthContractHelper.CallContractFunc(
+			w3=w3,
+			contract=contract,
+			funcName=funcName,
+			arguments=arguments,
+			privKey=privKey,
+			gas=gas,
+			value=value,
+			confirmPrompt=False # don't prompt for confirmation
+		)
+
+	with METRICS.Helper('CallContractFunc'):
+		if gas is not None:
+			return _Send(gas)
+
+		# without a given limit, reuse the one of an earlier call of the
+		# same kind, or estimate one
+		func = contract.functions[funcName](*arguments)
+		key = (
+			GAS_LIMIT_CACHE.CodeHash(w3, contract.address),
+			function_abi_to_4byte_selector(func.abi),
+			_ArgShape(arguments),
+			value > 0,
+		)
+		tx = {
+			'from': w3.eth.account.from_key(privKey).address,
+			'value': value,
+		}
+		return GAS_LIMIT_CACHE.Send(
+			w3,
+			key,
+			lambda: func.estimate_gas(tx),
+			lambda gas: func.call(dict(
+				tx,
+				gas=gas,
+				gasPrice=w3.eth.gas_price,
+			)),
+			_Send,
+		)
+
+
+def ViewContractFunc(
+	w3: Web3,
+	contract: Contract,
+	funcName: str,
+	arguments: List[Any] = [],
+) -> Any:
+	with METRICS.Helper('ViewContractFunc'):
+		return EthContractHelper.CallContractFunc(
+			w3=w3,
+			contract=contract,
+			funcName=funcName,
+			arguments=arguments,
+			privKey=None,
+			gas=None,
+			value=0,
+			confirmPrompt=False # don't prompt for confirmation
+		)
+
+
+def EstimatePublishGas(numSubscribers: int) -> int:
+	# the same rough per-subscriber estimation used by GasCostEvalMultiSubs
+	return (
+		100000 + # est gas cost before publishing
+		202000 + # gas cost for publishing
+		100000   # est gas cost after publishing
+	) * max(1, numSubscribers)
+
+
+def EstimateBudgetPublishGas(
+	eventMgrContract: Contract,
+	numSubscribers: int,
+	topic: int = 0,
+) -> int:
+	# the subscribers' declared budgets, plus a rough estimation of the
+	# bookkeeping around each call and of the transaction itself
+	return (
+		eventMgrContract.functions.getTopicGasBudget(topic).call() +
+		50000 * numSubscribers +
+		100000
+	)
+
+
+def _IsPanic(e: ContractLogicError) -> bool:
+	# web3 keeps the revert data in the message, or in e.data for the
+	# releases that have it; either carries the Panic(uint256) selector,
+	# or the node's decoding of it
+	text = ' '.join(
+		[ str(arg) for arg in e.args ] + [ str(getattr(e, 'data', '')) ]
+	).lower()
+	return (PANIC_SELECTOR in text) or ('panic' in text)
+
+
+def SearchMinGasLimit(
+	w3: Web3,
+	contract: Contract,
+	funcName: str,
+	arguments: List[Any],
+	privKey: str,
+	startGas: int,
+	tolerance: int = 0,
+	gasPriceWei: Optional[int] = None,
+) -> int:
+	'''
+	Find the lowest gas limit with which the call succeeds, by a binary
+	search over eth_call; startGas is a first guess of a passing limit
+	(e.g., EstimatePublishGas), doubled until it passes
+	@param gasPriceWei The gas price of the real transaction (default: the
+	                   node's gas price); the EventManager divides by
+	                   tx.gasprice, so the probes must not run at 0
+	@return The limit, at most tolerance above the lowest passing one
+	'''
+	func = contract.functions[funcName](*arguments)
+	tx = {
+		'from'    : w3.eth.account.from_key(privKey).address,
+		'gasPrice': w3.eth.gas_price if gasPriceWei is None else gasPriceWei,
+	}
+	blockGasLimit = GAS_LIMIT_CACHE.BlockGasLimit(w3)
+
+	def _Passes(gas: int) -> bool:
+		# running out of gas, or a revert (e.g., the EventManager's check
+		# of the gas left), means the limit is too low; a panic is a bug
+		# at any limit, and is raised
+		try:
+			func.call(dict(tx, gas=gas))
+			return True
+		except ContractLogicError as e:
+			if _IsPanic(e):
+				raise
+			return False
+		except ValueError as e:
+			if 'out of gas' in str(e).lower():
+				return False
+			raise
+
+	hiGas = min(startGas, blockGasLimit)
+	while not _Passes(hiGas):
+		if hiGas >= blockGasLimit:
+			# run it once more so the reason of the failure is raised
+			func.call(dict(tx, gas=hiGas))
+			raise RuntimeError(
+				'{} fails even with the block gas limit'.format(funcName)
+			)
+		hiGas = min(hiGas * 2, blockGasLimit)
+
+	# no transaction passes below the intrinsic gas
+	loGas = 21000 - 1
+	while hiGas - loGas > tolerance + 1:
+		midGas = (loGas + hiGas) // 2
+		if _Passes(midGas):
+			hiGas = midGas
+		else:
+			loGas = midGas
+
+	return hiGas
+
+
+def DeploySubscriberFleet(
+	w3: Web3,
+	factoryContract: Contract,
+	subscriberName: str,
+	pubSubAddr: str,
+	publisherAddr: str,
+	numSubscribers: int,
+	depositWei: int,
+	privKey: str,
+	batchSize: int = 40,
+) -> List[Contract]:
+	'''
+	Deploy numSubscribers subscriber contracts, subscribed to the publisher,
+	through the SubscriberFleetFactory, in batches of batchSize per
+	transaction; the subscriber contract must take the PubSubService address
+	as its only constructor argument
+	'''
+	initCode = (
+		bytes(LoadContract(w3, subscriberName).bytecode) +
+		AbiEncode([ 'address' ], [ pubSubAddr ])
+	)
+	initCodeHash = keccak(initCode)
+	salt = random.randbytes(32)
+
+	for firstIndex in range(0, numSubscribers, batchSize):
+		count = min(batchSize, numSubscribers - firstIndex)
+		CallContractFunc(
+			w3,
+			factoryContract,
+			'deployFleet',
+			[ initCode, publisherAddr, salt, firstIndex, count, depositWei ],
+			privKey,
+			value=count * depositWei,
+		)
+
+	# CREATE2 addresses follow from the factory, salt, and init code
+	subscribers = []
+	for index in range(numSubscribers):
+		subSalt = keccak(AbiEncode([ 'bytes32', 'uint256' ], [ salt, index ]))
+		subscriberAddr = Web3.to_checksum_address(keccak(
+			b'\xff' +
+			bytes.fromhex(factoryContract.address[2:]) +
+			subSalt +
+			initCodeHash
+		)[12:])
+		subscribers.append(LoadContract(w3, subscriberName, subscriberAddr))
+
+	return subscribers
@@ -0,0 +1,65 @@
+// SPDX-License-Identifier: MIT
+pragma solidity >=0.4.17 <0.9.0;
+
+
+import {Interface_PubSubService} from "../PubSub/Interface_PubSubService.sol";
+
+
+contract GasEvalPayloadSubscriber {
+
+	address public m_pubSubServiceAddr;
+	address public m_eventMgrAddr = address(0);
+	// only the digest is kept, so the cost of handling a message barely
+	// depends on its size
+	bytes32 public m_recvDataHash;
+
+	constructor(address pubSubServiceAddr) {
+		m_pubSubServiceAddr = pubSubServiceAddr;
+	}
+
+	function onNotify(bytes calldata data) external {
+		require(msg.sender == m_eventMgrAddr, "Unauthorized");
+		m_recvDataHash = keccak256(data);
+	}
+
+	function onNotifyHash(bytes32 dataHash, uint256) external {
+		require(msg.sender == m_eventMgrAddr, "Unauthorized");
+		m_recvDataHash = dataHash;
+	}
+
+	function subscribe(address publisherAddr) external payable {
+		require(m_eventMgrAddr == address(0), "Already subscribed");
+
+		m_eventMgrAddr = Interface_PubSubService(
+			m_pubSubServiceAddr
+		).subscribe{
+			value: msg.value
+		}(publisherAddr);
+	}
+
+	function subscribeTopic(address publisherAddr, uint64 topic)
+		external
+		payable
+	{
+		require(m_eventMgrAddr == address(0), "Already subscribed");
+
+		m_eventMgrAddr = Interface_PubSubService(
+			m_pubSubServiceAddr
+		).subscribe{
+			value: msg.value
+		}(publisherAddr, topic);
+	}
+
+	function subscribeBudget(address publisherAddr, uint256 gasBudget)
+		external
+		payable
+	{
+		require(m_eventMgrAddr == address(0), "Already subscribed");
+
+		m_eventMgrAddr = Interface_PubSubService(
+			m_pubSubServiceAddr
+		).subscribe{
+			value: msg.value
+		}(publisherAddr, 0, gasBudget);
+	}
+}
@@ -0,0 +1,71 @@
+// SPDX-License-Identifier: MIT
+pragma solidity >=0.4.17 <0.9.0;
+
+
+import {Interface_PubSubService} from "../PubSub/Interface_PubSubService.sol";
+
+
+contract HelloWorldMultiSubscriber {
+
+	address public m_owner;
+	address public m_pubSubServiceAddr;
+	mapping(address => bool) public m_eventMgrMap;
+	// the last message received from each event manager
+	mapping(address => string) public m_recvData;
+
+	constructor(address pubSubServiceAddr) {
+		m_owner = msg.sender;
+		m_pubSubServiceAddr = pubSubServiceAddr;
+	}
+
+	function onNotify(bytes calldata data) external {
+		require(m_eventMgrMap[msg.sender], "Unauthorized");
+		m_recvData[msg.sender] = string(data);
+	}
+
+	function subscribe(address publisherAddr) external payable {
+		address eventMgrAddr = Interface_PubSubService(
+			m_pubSubServiceAddr
+		).subscribe{
+			value: msg.value
+		}(publisherAddr);
+
+		m_eventMgrMap[eventMgrAddr] = true;
+	}
+
+	function subscribeMany(
+		address[] calldata publisherAddrs,
+		uint256[] calldata deposits
+	) external payable {
+		address[] memory eventMgrAddrs = Interface_PubSubService(
+			m_pubSubServiceAddr
+		).subscribeMany{
+			value: msg.value
+		}(publisherAddrs, deposits);
+
+		for (uint256 i = 0; i < eventMgrAddrs.length; ++i) {
+			m_eventMgrMap[eventMgrAddrs[i]] = true;
+		}
+	}
+
+	function unsubscribe(address publisherAddr) external {
+		require(msg.sender == m_owner, "Only the owner can unsubscribe");
+
+		address eventMgrAddr = Interface_PubSubService(
+			m_pubSubServiceAddr
+		).getEventManagerAddr(publisherAddr);
+		require(m_eventMgrMap[eventMgrAddr], "Not subscribed");
+
+		m_eventMgrMap[eventMgrAddr] = false;
+		Interface_PubSubService(
+			m_pubSubServiceAddr
+		).unsubscribe(publisherAddr);
+
+		// pass the refunded balance on to the owner
+		payable(m_owner).transfer(address(this).balance);
+	}
+
+	receive() external payable {
+		// accept the refund of the remaining balance on unsubscribe
+	}
+}
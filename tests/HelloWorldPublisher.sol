@@ -10,8 +10,15 @@ contract HelloWorldPublisher {
 
 	address public m_eventMgrAddr = address(0);
 	string public m_sendData = "Hello World!";
+	// the deployer may register this publisher via registerMany
+	address public m_registrar;
 
 	constructor() {
+		m_registrar = msg.sender;
+	}
+
+	function pubSubRegistrar() external view returns (address) {
+		return m_registrar;
 	}
 
 	function register(address pubSubServiceAddr) external {
@@ -21,12 +28,52 @@ contract HelloWorldPublisher {
 			Interface_PubSubService(pubSubServiceAddr).register();
 	}
 
+	function registerClone(address pubSubServiceAddr) external {
+		require(m_eventMgrAddr == address(0), "Already registered");
+
+		m_eventMgrAddr =
+			Interface_PubSubService(pubSubServiceAddr).registerClone();
+	}
+
+	function loadEventMgrAddr(address pubSubServiceAddr) external {
+		// for a publisher registered by someone else via registerMany
+		require(m_eventMgrAddr == address(0), "Already registered");
+
+		m_eventMgrAddr = Interface_PubSubService(
+			pubSubServiceAddr
+		).getEventManagerAddr(address(this));
+	}
+
 	function publish() external {
 		Interface_EventManager(
 			m_eventMgrAddr
 		).notifySubscribers(bytes(m_sendData));
 	}
 
+	function publishData(bytes calldata data) external {
+		Interface_EventManager(
+			m_eventMgrAddr
+		).notifySubscribers(data);
+	}
+
+	function publishDataTopic(uint64 topic, bytes calldata data) external {
+		Interface_EventManager(
+			m_eventMgrAddr
+		).notifySubscribers(topic, data);
+	}
+
+	function publishDataHash(bytes calldata data) external {
+		Interface_EventManager(
+			m_eventMgrAddr
+		).notifySubscribersHash(data);
+	}
+
+	function post() external {
+		Interface_EventManager(
+			m_eventMgrAddr
+		).postMessage(bytes(m_sendData));
+	}
+
 	function setSendData(string memory data) external {
 		m_sendData = data;
 	}
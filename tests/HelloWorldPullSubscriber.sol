@@ -0,0 +1,44 @@
+// SPDX-License-Identifier: MIT
+pragma solidity >=0.4.17 <0.9.0;
+
+
+import {Interface_EventManager} from "../PubSub/Interface_EventManager.sol";
+import {Interface_PubSubService} from "../PubSub/Interface_PubSubService.sol";
+
+
+contract HelloWorldPullSubscriber {
+
+	address public m_eventMgrAddr;
+	uint256 public m_nextSeqNum = 1;
+	string public m_recvData;
+
+	constructor(address pubSubServiceAddr, address publisherAddr) {
+		// pulling needs no subscription, only the publisher's event manager
+		m_eventMgrAddr = Interface_PubSubService(
+			pubSubServiceAddr
+		).getEventManagerAddr(publisherAddr);
+	}
+
+	function pull(uint256 maxCount) external returns (uint256) {
+		uint256 latestSeqNum =
+			Interface_EventManager(m_eventMgrAddr).getSeqNum();
+		uint256 seqNum = m_nextSeqNum;
+		uint256 numRecv = 0;
+
+		while ((seqNum <= latestSeqNum) && (numRecv < maxCount)) {
+			// messages that were not posted to the inbox, or that have
+			// been overwritten, are skipped
+			try Interface_EventManager(m_eventMgrAddr).getMessage(
+				seqNum
+			) returns (bytes memory data) {
+				m_recvData = string(data);
+				++numRecv;
+			} catch {
+			}
+			++seqNum;
+		}
+
+		m_nextSeqNum = seqNum;
+		return numRecv;
+	}
+}
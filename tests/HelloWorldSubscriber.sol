@@ -7,15 +7,17 @@ import {Interface_PubSubService} from "../PubSub/Interface_PubSubService.sol";
 
 contract HelloWorldSubscriber {
 
+	address public m_owner;
 	address public m_pubSubServiceAddr;
 	address public m_eventMgrAddr = address(0);
 	string public m_recvData;
 
 	constructor(address pubSubServiceAddr) {
+		m_owner = msg.sender;
 		m_pubSubServiceAddr = pubSubServiceAddr;
 	}
 
-	function onNotify(bytes memory data) external {
+	function onNotify(bytes calldata data) external {
 		require(m_eventMgrAddr != address(0), "Not subscribed");
 		require(msg.sender == m_eventMgrAddr, "Unauthorized");
 		m_recvData = string(data);
@@ -30,4 +32,21 @@ contract HelloWorldSubscriber {
 			value: msg.value
 		}(publisherAddr);
 	}
+
+	function unsubscribe(address publisherAddr) external {
+		require(msg.sender == m_owner, "Only the owner can unsubscribe");
+		require(m_eventMgrAddr != address(0), "Not subscribed");
+
+		m_eventMgrAddr = address(0);
+		Interface_PubSubService(
+			m_pubSubServiceAddr
+		).unsubscribe(publisherAddr);
+
+		// pass the refunded balance on to the owner
+		payable(m_owner).transfer(address(this).balance);
+	}
+
+	receive() external payable {
+		// accept the refund of the remaining balance on unsubscribe
+	}
 }
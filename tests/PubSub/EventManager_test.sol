@@ -15,6 +15,7 @@ import {
     DummyContract,
     TestPublisher,
     TestSubscriber,
+    HashSubscriber,
     FailingSubscriber,
     HungrySubscriber,
     ImcompatibleSubscriber,
@@ -255,6 +256,92 @@ contract EventManager_testSuite {
         );
     }
 
+    /// #value: 3000000000000000000
+    function removeSubscriber() public payable {
+        Assert.equal(
+            msg.value,
+            3000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber testSubscriber1 = new TestSubscriber();
+        address subsAddr1 = address(testSubscriber1);
+        TestSubscriber testSubscriber2 = new TestSubscriber();
+        address subsAddr2 = address(testSubscriber2);
+        TestSubscriber testSubscriber3 = new TestSubscriber();
+        address subsAddr3 = address(testSubscriber3);
+
+        // add subscribers
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(subsAddr1);
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(subsAddr2);
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(subsAddr3);
+
+        // remove subscriber 1 (subscriber 3 gets swapped into its place)
+        try Interface_EventManager(eventMgr1Addr).removeSubscriber(subsAddr1)
+            returns (uint256 refundWei)
+        {
+            Assert.equal(
+                refundWei, 1000000000000000000,
+                "Incorrect refund amount"
+            );
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when removing subscriber");
+        }
+        Assert.equal(
+            subsAddr1.balance, 1000000000000000000,
+            "Subscriber 1 did not receive the refund"
+        );
+        Assert.equal(
+            address(eventMgrInst1).balance, 2000000000000000000,
+            "Incorrect contract balance after remove subscriber"
+        );
+
+        // remove subscriber 1 again -> should fail
+        try Interface_EventManager(eventMgr1Addr).removeSubscriber(subsAddr1) {
+            Assert.ok(false, "Successfully removed subscriber twice");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Subscriber is not found", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when removing subscriber");
+        }
+
+        // the moved subscriber keeps its balance
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).subscriberCheckBalance(
+                subsAddr3
+            ),
+            1000000000000000000,
+            "Incorrect balance of the moved subscriber"
+        );
+
+        // only the remaining subscribers are notified
+        bytes memory testInput = "Hello World";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(testInput);
+        Assert.ok(
+            keccak256(testSubscriber2.m_recvData()) == keccak256(testInput),
+            "Subscriber 2 did not receive the notification"
+        );
+        Assert.ok(
+            keccak256(testSubscriber3.m_recvData()) == keccak256(testInput),
+            "Subscriber 3 did not receive the notification"
+        );
+        Assert.equal(
+            testSubscriber1.m_recvData().length, 0,
+            "Removed subscriber received the notification"
+        );
+    }
+
     /// #value: 2000000000000000000
     function notifySubscribers() public payable {
         Assert.equal(
@@ -366,6 +453,256 @@ contract EventManager_testSuite {
         // );
     }
 
+    /// #value: 3000000000000000000
+    function pagedNotify() public payable {
+        Assert.equal(
+            msg.value,
+            3000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+        TestSubscriber subscriber3 = new TestSubscriber();
+
+        // subscribe subscribers
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber2));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber3));
+
+        bytes memory testInput = "Hello World";
+
+        // post the message; nobody is notified yet
+        Interface_EventManager(eventMgr1Addr).beginNotify(testInput);
+        Assert.equal(
+            subscriber1.m_recvData().length, 0,
+            "Subscriber 1 notified before continueNotify"
+        );
+
+        // another message cannot be published before this one is delivered
+        try Interface_EventManager(eventMgr1Addr).notifySubscribers(testInput) {
+            Assert.ok(false, "Published while a delivery is in progress");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Delivery in progress", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when notifying subscribers");
+        }
+
+        // continue with the wrong data -> should fail
+        try Interface_EventManager(eventMgr1Addr).continueNotify("Bye", 2) {
+            Assert.ok(false, "Continued delivery with wrong data");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Data does not match pending delivery", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when continuing delivery");
+        }
+
+        // first slice
+        Interface_EventManager(eventMgr1Addr).continueNotify(testInput, 2);
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(testInput),
+            "Subscriber 1 did not receive the notification"
+        );
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(testInput),
+            "Subscriber 2 did not receive the notification"
+        );
+        Assert.equal(
+            subscriber3.m_recvData().length, 0,
+            "Subscriber 3 notified in the first slice"
+        );
+        (, uint256 cursor, uint256 end) =
+            Interface_EventManager(eventMgr1Addr).getPendingDelivery();
+        Assert.equal(cursor, 2, "Incorrect cursor after the first slice");
+        Assert.equal(end, 3, "Incorrect end of the pending delivery");
+
+        // second slice finishes the delivery
+        Interface_EventManager(eventMgr1Addr).continueNotify(testInput, 2);
+        Assert.ok(
+            keccak256(subscriber3.m_recvData()) == keccak256(testInput),
+            "Subscriber 3 did not receive the notification"
+        );
+        (bytes32 dataHash, , ) =
+            Interface_EventManager(eventMgr1Addr).getPendingDelivery();
+        Assert.equal(
+            dataHash, bytes32(0),
+            "Pending delivery not cleared after the last slice"
+        );
+
+        // nothing left to deliver
+        try Interface_EventManager(eventMgr1Addr).continueNotify(testInput, 2) {
+            Assert.ok(false, "Continued a finished delivery");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "No pending delivery", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when continuing delivery");
+        }
+    }
+
+    /// #value: 3000000000000000000
+    function cancelPagedNotify() public payable {
+        Assert.equal(
+            msg.value,
+            3000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+        TestSubscriber subscriber3 = new TestSubscriber();
+
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber2));
+
+        bytes memory testInput = "Hello World";
+        Interface_EventManager(eventMgr1Addr).beginNotify(testInput);
+
+        // nobody can join while the delivery is pending
+        try Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber3)) {
+            Assert.ok(false, "Subscriber added during a delivery");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Delivery in progress", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when adding subscriber");
+        }
+
+        // the publisher drops the delivery after the first slice
+        Interface_EventManager(eventMgr1Addr).continueNotify(testInput, 1);
+        Interface_EventManager(eventMgr1Addr).cancelNotify();
+        (bytes32 dataHash, , ) =
+            Interface_EventManager(eventMgr1Addr).getPendingDelivery();
+        Assert.equal(
+            dataHash, bytes32(0),
+            "Pending delivery not cleared by cancelNotify"
+        );
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(testInput),
+            "Subscriber 1 did not receive the notification"
+        );
+        Assert.equal(
+            subscriber2.m_recvData().length, 0,
+            "Subscriber 2 notified after the cancellation"
+        );
+
+        // subscribing and publishing resume
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber3));
+        bytes memory nextInput = "Hello Again";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(nextInput);
+        Assert.ok(
+            keccak256(subscriber3.m_recvData()) == keccak256(nextInput),
+            "Subscriber 3 did not receive the next notification"
+        );
+
+        // nothing left to cancel
+        try Interface_EventManager(eventMgr1Addr).cancelNotify() {
+            Assert.ok(false, "Cancelled without a pending delivery");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "No pending delivery", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when cancelling delivery");
+        }
+    }
+
+    /// #value: 3000000000000000000
+    function parkDepletedSubscribers() public payable {
+        Assert.equal(
+            msg.value,
+            3000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+        TestSubscriber subscriber3 = new TestSubscriber();
+
+        // subscriber 1 is funded; 2 and 3 only pay the minimum deposit
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 100000000
+        }(address(subscriber2));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 100000000
+        }(address(subscriber3));
+
+        // with this incentive, the minimum deposit cannot pay for a
+        // notification, so subscribers 2 and 3 are parked
+        Interface_EventManager(eventMgr1Addr).updateIncentive(300000000);
+
+        bytes memory testInput = "Hello World";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(testInput);
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(testInput),
+            "Subscriber 1 did not receive the notification"
+        );
+        Assert.equal(
+            subscriber2.m_recvData().length, 0,
+            "Depleted subscriber 2 received the notification"
+        );
+
+        // parked subscribers keep their balance
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).subscriberCheckBalance(
+                address(subscriber2)
+            ),
+            100000000,
+            "Parked subscriber 2 has been charged"
+        );
+
+        // a parked subscriber can still be removed and refunded
+        try Interface_EventManager(eventMgr1Addr).removeSubscriber(
+            address(subscriber3)
+        ) returns (uint256 refundWei) {
+            Assert.equal(refundWei, 100000000, "Incorrect refund amount");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when removing subscriber");
+        }
+
+        // adding balance puts subscriber 2 back into the active set
+        Interface_EventManager(eventMgr1Addr).subscriberAddBalance{
+            value: 1000000000000000000
+        }(address(subscriber2));
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).subscriberCheckBalance(
+                address(subscriber2)
+            ),
+            1000000000100000000,
+            "Incorrect balance after re-activation"
+        );
+
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(testInput);
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(testInput),
+            "Re-activated subscriber 2 did not receive the notification"
+        );
+    }
+
     /// #value: 2000000000000000000
     function notifySubscribersWithInsufficientGas() public payable {
         Assert.equal(
@@ -378,6 +715,16 @@ contract EventManager_testSuite {
         EventManager eventMgrInst1 = new EventManager(address(this));
         address eventMgr1Addr = address(eventMgrInst1);
 
+        // a topic without subscribers needs no gas for them, i.e., less
+        // than the finishing cost
+        try Interface_EventManager(eventMgr1Addr).notifySubscribers{
+            gas: 80000
+        }("Hello Nobody") {
+            Assert.ok(true, "Empty topic notified");
+        } catch {
+            Assert.ok(false, "Unexpected error when notifying empty topic");
+        }
+
         // Add a subscriber
         TestSubscriber testSubscriber1 = new TestSubscriber();
         address subsAddr1 = address(testSubscriber1);
@@ -419,6 +766,20 @@ contract EventManager_testSuite {
             );
         }
 
+        // the limit must fit in the packed record
+        try Interface_EventManager(
+            eventMgr1Addr
+        ).setPerSubscriberLimitGas(16777216) {
+            Assert.ok(false, "Per subscriber limit gas set too large");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Limit is too large", reason);
+        } catch {
+            Assert.ok(
+                false,
+                "Unexpected error when setting per subscriber limit gas"
+            );
+        }
+
         // Create a dummy contract and make it as the owner
         DummyContract dummyContract = new DummyContract();
         EventManager eventMgrInst2 = new EventManager(address(dummyContract));
@@ -731,4 +1092,470 @@ contract EventManager_testSuite {
             "Subscriber 2's balance not deducted"
         );
     }
+
+    /// #value: 2000000000000000000
+    function notifyLargePayload() public payable {
+        Assert.equal(
+            msg.value,
+            2000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+        // an address without code can't be notified
+        address codelessAddr = address(0x1234);
+
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 100000000
+        }(codelessAddr);
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 900000000000000000 - 100000000
+        }(address(subscriber2));
+
+        // a payload spanning many words is delivered intact to every
+        // subscriber, from the single encoded call buffer
+        bytes memory testInput = new bytes(1000);
+        for (uint256 i = 0; i < testInput.length; ++i) {
+            testInput[i] = bytes1(uint8(i));
+        }
+        try Interface_EventManager(eventMgr1Addr).notifySubscribers(
+            testInput
+        ) {
+            Assert.ok(true, "Notification succeeded");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when notifying subscribers");
+        }
+
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(testInput),
+            "Subscriber 1 did not receive the notification"
+        );
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(testInput),
+            "Subscriber 2 did not receive the notification"
+        );
+
+        // the codeless subscriber does not break the delivery to others,
+        // and it is still charged for the call
+        Assert.ok(
+            Interface_EventManager(eventMgr1Addr).subscriberCheckBalance(
+                codelessAddr
+            ) <= 100000000,
+            "Codeless subscriber's balance increased"
+        );
+    }
+
+    /// #value: 2000000000000000000
+    function notifyHash() public payable {
+        Assert.equal(
+            msg.value,
+            2000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        HashSubscriber subscriber2 = new HashSubscriber();
+
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber2));
+
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).getSeqNum(), 0,
+            "Nothing should have been published"
+        );
+
+        // a full message gets sequence number 1
+        bytes memory fullInput = "Hello World";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(fullInput);
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).getSeqNum(), 1,
+            "The first message should have sequence number 1"
+        );
+
+        // a hash-only message gets sequence number 2
+        bytes memory hashInput = "Hello Hash";
+        try Interface_EventManager(eventMgr1Addr).notifySubscribersHash(
+            hashInput
+        ) {
+            Assert.ok(true, "Hash notification succeeded");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when notifying subscribers");
+        }
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).getSeqNum(), 2,
+            "The second message should have sequence number 2"
+        );
+        Assert.equal(
+            subscriber2.m_recvDataHash(), keccak256(hashInput),
+            "Subscriber 2 did not receive the hash"
+        );
+        Assert.equal(
+            subscriber2.m_recvSeqNum(), 2,
+            "Subscriber 2 did not receive the sequence number"
+        );
+        // subscriber 1 does not implement onNotifyHash
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(fullInput),
+            "Subscriber 1 should keep the full message"
+        );
+
+        // the data can be checked against the hash later
+        try subscriber2.submitData("Hello Fake") {
+            Assert.ok(false, "Mismatching data should be rejected");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Data does not match the notified hash", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when submitting data");
+        }
+        subscriber2.submitData(hashInput);
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(hashInput),
+            "Subscriber 2 did not accept the matching data"
+        );
+    }
+
+    function inboxMessages() public {
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+
+        // post two messages to the inbox
+        Interface_EventManager(eventMgr1Addr).postMessage("message 1");
+        Interface_EventManager(eventMgr1Addr).postMessage("message 2");
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).getSeqNum(), 2,
+            "Incorrect sequence number"
+        );
+        Assert.ok(
+            keccak256(Interface_EventManager(eventMgr1Addr).getMessage(1)) ==
+                keccak256("message 1"),
+            "Incorrect message 1"
+        );
+        Assert.ok(
+            keccak256(Interface_EventManager(eventMgr1Addr).getMessage(2)) ==
+                keccak256("message 2"),
+            "Incorrect message 2"
+        );
+
+        // a pushed message is not in the inbox
+        Interface_EventManager(eventMgr1Addr).notifySubscribers("message 3");
+        try Interface_EventManager(eventMgr1Addr).getMessage(3) {
+            Assert.ok(false, "Pushed message should not be in the inbox");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Message is not available", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when getting message");
+        }
+        try Interface_EventManager(eventMgr1Addr).getMessage(0) {
+            Assert.ok(false, "Message 0 should not exist");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Message is not available", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when getting message");
+        }
+
+        // only the latest 64 messages are kept
+        for (uint256 i = 0; i < 64; ++i) {
+            Interface_EventManager(eventMgr1Addr).postMessage("message n");
+        }
+        try Interface_EventManager(eventMgr1Addr).getMessage(2) {
+            Assert.ok(false, "Message 2 should have been overwritten");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Message is not available", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when getting message");
+        }
+        Assert.ok(
+            keccak256(Interface_EventManager(eventMgr1Addr).getMessage(67)) ==
+                keccak256("message n"),
+            "Incorrect latest message"
+        );
+    }
+
+    /// #value: 3000000000000000000
+    function topicSubscriptions() public payable {
+        Assert.equal(
+            msg.value,
+            3000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+        TestSubscriber subscriber3 = new TestSubscriber();
+
+        // subscriber 1 on the default topic, 2 and 3 on topic 7
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber2), 7);
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber3), 7);
+
+        // only the subscribers of topic 7 are notified
+        bytes memory topicInput = "Hello Topic";
+        try Interface_EventManager(eventMgr1Addr).notifySubscribers(
+            7,
+            topicInput
+        ) {
+            Assert.ok(true, "Notification succeeded");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when notifying subscribers");
+        }
+        Assert.equal(
+            subscriber1.m_recvData().length, 0,
+            "Subscriber 1 should not receive topic 7"
+        );
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(topicInput),
+            "Subscriber 2 did not receive topic 7"
+        );
+        Assert.ok(
+            keccak256(subscriber3.m_recvData()) == keccak256(topicInput),
+            "Subscriber 3 did not receive topic 7"
+        );
+
+        // only the subscribers of the default topic are notified
+        bytes memory defaultInput = "Hello Default";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(defaultInput);
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(defaultInput),
+            "Subscriber 1 did not receive the default topic"
+        );
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(topicInput),
+            "Subscriber 2 should not receive the default topic"
+        );
+
+        // removing subscriber 2 keeps subscriber 3 on topic 7
+        Interface_EventManager(eventMgr1Addr).removeSubscriber(
+            address(subscriber2)
+        );
+        bytes memory topicInput2 = "Hello Topic Again";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(7, topicInput2);
+        Assert.ok(
+            keccak256(subscriber3.m_recvData()) == keccak256(topicInput2),
+            "Subscriber 3 did not receive topic 7 again"
+        );
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(defaultInput),
+            "Subscriber 1 should not receive topic 7"
+        );
+    }
+
+    /// #value: 2000000000000000000
+    function subscriberGasBudgets() public payable {
+        Assert.equal(
+            msg.value,
+            2000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+
+        // subscriber 1 declares its own budget, subscriber 2 uses the
+        // default one
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1), 0, 100000);
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber2));
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).subscriberCheckGasBudget(
+                address(subscriber1)
+            ),
+            100000,
+            "Incorrect gas budget of subscriber 1"
+        );
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).subscriberCheckGasBudget(
+                address(subscriber2)
+            ),
+            202000,
+            "Incorrect gas budget of subscriber 2"
+        );
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).getTopicGasBudget(0),
+            100000 + 202000 + 90000,
+            "Incorrect gas budget of the topic"
+        );
+
+        // budgets cannot exceed the default one, so a subscriber cannot
+        // make the topic too costly to publish to
+        TestSubscriber subscriber3 = new TestSubscriber();
+        try Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 100000000
+        }(address(subscriber3), 0, 202001) {
+            Assert.ok(false, "Subscriber added with an oversized budget");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Gas budget is too large", reason);
+        } catch {
+            Assert.ok(false, "Unexpected error when adding subscriber");
+        }
+
+        // both subscribers are notified within their budgets
+        bytes memory testInput = "Hello Budget";
+        Interface_EventManager(eventMgr1Addr).notifySubscribers(testInput);
+        Assert.ok(
+            keccak256(subscriber1.m_recvData()) == keccak256(testInput),
+            "Subscriber 1 did not receive the notification"
+        );
+        Assert.ok(
+            keccak256(subscriber2.m_recvData()) == keccak256(testInput),
+            "Subscriber 2 did not receive the notification"
+        );
+
+        // removing a subscriber takes its budget off the topic
+        Interface_EventManager(eventMgr1Addr).removeSubscriber(
+            address(subscriber2)
+        );
+        Assert.equal(
+            Interface_EventManager(eventMgr1Addr).getTopicGasBudget(0),
+            100000 + 90000,
+            "Incorrect gas budget of the topic after removal"
+        );
+    }
+
+    /// #value: 3000000000000000000
+    function pagedSubscriberViews() public payable {
+        Assert.equal(
+            msg.value,
+            3000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        // Create a new EventManager contract
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        Interface_EventManager eventMgr1 =
+            Interface_EventManager(address(eventMgrInst1));
+        TestSubscriber subscriber1 = new TestSubscriber();
+        TestSubscriber subscriber2 = new TestSubscriber();
+        TestSubscriber subscriber3 = new TestSubscriber();
+
+        // subscriber 2 only pays the minimum deposit
+        eventMgr1.addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+        eventMgr1.addSubscriber{ value: 100000000 }(address(subscriber2));
+        eventMgr1.addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber3));
+        Assert.equal(
+            eventMgr1.getSubscriberCount(0),
+            3,
+            "Incorrect number of subscribers"
+        );
+
+        // pages are cut at the end of the list
+        address[] memory subscriberAddrs = eventMgr1.getSubscribers(0, 1, 10);
+        Assert.equal(subscriberAddrs.length, 2, "Incorrect page size");
+        Assert.equal(
+            subscriberAddrs[0],
+            address(subscriber2),
+            "Incorrect subscriber at offset 1"
+        );
+        Assert.equal(
+            subscriberAddrs[1],
+            address(subscriber3),
+            "Incorrect subscriber at offset 2"
+        );
+        Assert.equal(
+            eventMgr1.getSubscribers(0, 3, 10).length,
+            0,
+            "Page past the end of the list is not empty"
+        );
+
+        uint256[] memory balancesWei;
+        (subscriberAddrs, balancesWei) =
+            eventMgr1.getSubscriberRecords(0, 0, 1);
+        Assert.equal(subscriberAddrs.length, 1, "Incorrect record page size");
+        Assert.equal(
+            subscriberAddrs[0],
+            address(subscriber1),
+            "Incorrect subscriber record"
+        );
+        Assert.equal(
+            balancesWei[0],
+            1000000000000000000,
+            "Incorrect balance in subscriber record"
+        );
+
+        // subscriber 2 cannot pay for a notification, so it is parked
+        eventMgr1.updateIncentive(300000000);
+        eventMgr1.notifySubscribers("Hello Pages");
+        Assert.equal(
+            eventMgr1.getSubscriberCount(0),
+            2,
+            "Incorrect number of subscribers after parking"
+        );
+        Assert.equal(
+            eventMgr1.getParkedCount(),
+            1,
+            "Incorrect number of parked subscribers"
+        );
+        (subscriberAddrs, balancesWei) = eventMgr1.getParkedRecords(0, 10);
+        Assert.equal(
+            subscriberAddrs[0],
+            address(subscriber2),
+            "Incorrect parked subscriber"
+        );
+        Assert.equal(
+            balancesWei[0],
+            100000000,
+            "Incorrect balance of parked subscriber"
+        );
+
+        // balances of active, parked and unknown addresses
+        subscriberAddrs = new address[](3);
+        subscriberAddrs[0] = address(subscriber1);
+        subscriberAddrs[1] = address(subscriber2);
+        subscriberAddrs[2] = address(this);
+        balancesWei = eventMgr1.balancesOf(subscriberAddrs);
+        Assert.equal(
+            balancesWei[0],
+            eventMgr1.subscriberCheckBalance(address(subscriber1)),
+            "Incorrect balance of active subscriber"
+        );
+        Assert.equal(
+            balancesWei[1],
+            100000000,
+            "Incorrect balance of parked subscriber"
+        );
+        Assert.equal(
+            balancesWei[2],
+            0,
+            "Unknown address has a balance"
+        );
+    }
 }
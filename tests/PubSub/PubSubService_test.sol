@@ -145,6 +145,114 @@ contract PubSubService_testSuite {
         }
     }
 
+    /// #value: 200000000
+    function registerClonePublisher() public payable {
+        Assert.equal(msg.value, 200000000, "msg.value not set correctly");
+
+        PubSubService pubSubService = new PubSubService();
+        address pubSubServiceAddr = address(pubSubService);
+        address implAddr = pubSubService.getEventManagerImpl();
+
+        // register through a minimal-proxy clone
+        TestPublisher publisher = new TestPublisher();
+        address publisherAddr = address(publisher);
+        address eventMgrAddr;
+        try publisher.registerClone(pubSubServiceAddr) returns (address addr) {
+            eventMgrAddr = addr;
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Publisher registration via clone failed");
+        }
+        Assert.equal(
+            pubSubService.getEventManagerAddr(publisherAddr),
+            eventMgrAddr,
+            "Event manager address matches"
+        );
+        Assert.notEqual(
+            eventMgrAddr,
+            implAddr,
+            "Clone should not be the implementation"
+        );
+        Assert.equal(
+            eventMgrAddr.code.length,
+            45,
+            "Clone should be an EIP-1167 minimal proxy"
+        );
+
+        // the publisher cannot register again, in either mode
+        try publisher.registerClone(pubSubServiceAddr) {
+            Assert.ok(false, "Publisher should not be able to register again");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Publisher already registered", reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while registering again");
+        }
+
+        // neither the clone nor the implementation can be re-initialized
+        try Interface_EventManager(eventMgrAddr).initialize(address(this)) {
+            Assert.ok(false, "Clone should not be initialized twice");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Already initialized", reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while initializing clone");
+        }
+        try Interface_EventManager(implAddr).initialize(address(this)) {
+            Assert.ok(false, "Implementation should not be initialized");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Already initialized", reason);
+        } catch (bytes memory) {
+            Assert.ok(
+                false,
+                "Unexpected error occurred while initializing implementation"
+            );
+        }
+
+        // the clone has the default minimum deposit set by initialize
+        TestSubscriber subscriber = new TestSubscriber();
+        try subscriber.subscribe{
+            value: 10000
+        }(pubSubServiceAddr, publisherAddr) {
+            Assert.ok(false, "Deposit below the minimum should be rejected");
+        } catch Error(string memory reason) {
+            Assert.equal(
+                reason,
+                "You need to send at least the minimum deposit",
+                reason
+            );
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while subscribing");
+        }
+        subscriber.subscribe{
+            value: 100000000
+        }(pubSubServiceAddr, publisherAddr);
+
+        // publish through the clone
+        bytes memory data = "Hello from a clone";
+        try publisher.notifySubscribers(data) {
+            Assert.ok(true, "Notification sent");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Notification through the clone failed");
+        }
+        Assert.equal(
+            keccak256(subscriber.m_recvData()),
+            keccak256(data),
+            "Subscriber should receive the data"
+        );
+
+        // the subscriber can unsubscribe and get refunded by the clone
+        uint256 balanceWei = Interface_EventManager(
+            eventMgrAddr
+        ).subscriberCheckBalance(address(subscriber));
+        Assert.equal(
+            subscriber.unsubscribe(pubSubServiceAddr, publisherAddr),
+            balanceWei,
+            "Refund amount is incorrect"
+        );
+    }
+
     /// #value: 200000000
     function subscribe() public payable {
         Assert.equal(msg.value, 200000000, "msg.value not set correctly");
@@ -208,4 +316,180 @@ contract PubSubService_testSuite {
             );
         }
     }
+
+    /// #value: 300000000
+    function batchRegisterAndSubscribe() public payable {
+        Assert.equal(msg.value, 300000000, "msg.value not set correctly");
+
+        PubSubService pubSubService = new PubSubService();
+        address pubSubServiceAddr = address(pubSubService);
+
+        // register two publishers in one call
+        address[] memory publisherAddrs = new address[](2);
+        publisherAddrs[0] = address(new TestPublisher());
+        publisherAddrs[1] = address(new TestPublisher());
+        address[] memory eventMgrAddrs =
+            pubSubService.registerMany(publisherAddrs);
+        Assert.equal(eventMgrAddrs.length, 2, "Two event managers expected");
+        Assert.equal(
+            pubSubService.getEventManagerAddr(publisherAddrs[0]),
+            eventMgrAddrs[0],
+            "Event manager address matches"
+        );
+        Assert.equal(
+            pubSubService.getEventManagerAddr(publisherAddrs[1]),
+            eventMgrAddrs[1],
+            "Event manager address matches"
+        );
+
+        // a publisher that names another registrar cannot be registered
+        // by this caller
+        TestPublisher otherPublisher = new TestPublisher();
+        otherPublisher.setRegistrar(address(0));
+        address[] memory otherAddrs = new address[](1);
+        otherAddrs[0] = address(otherPublisher);
+        try pubSubService.registerMany(otherAddrs) {
+            Assert.ok(false, "Publisher registered without its consent");
+        } catch Error(string memory reason) {
+            Assert.equal(
+                reason,
+                "Caller is not the publisher's registrar",
+                reason
+            );
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while registering");
+        }
+
+        // a registered publisher cannot be registered again
+        try pubSubService.registerMany(publisherAddrs) {
+            Assert.ok(false, "Publishers should not be registered twice");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Publisher already registered", reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while registering");
+        }
+
+        TestSubscriber subscriber = new TestSubscriber();
+        uint256[] memory deposits = new uint256[](2);
+        deposits[0] = 100000000;
+        deposits[1] = 200000000;
+
+        // the deposits must add up to the value sent
+        try subscriber.subscribeMany{
+            value: 100000000
+        }(pubSubServiceAddr, publisherAddrs, deposits) {
+            Assert.ok(false, "Deposits should add up to the value");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Deposits do not add up to the value", reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while subscribing");
+        }
+
+        // subscribe to both publishers in one call
+        try subscriber.subscribeMany{
+            value: 300000000
+        }(pubSubServiceAddr, publisherAddrs, deposits)
+            returns (address[] memory addrs)
+        {
+            Assert.equal(addrs[0], eventMgrAddrs[0], "Event manager 1 matches");
+            Assert.equal(addrs[1], eventMgrAddrs[1], "Event manager 2 matches");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while subscribing");
+        }
+        Assert.equal(
+            Interface_EventManager(eventMgrAddrs[0]).subscriberCheckBalance(
+                address(subscriber)
+            ),
+            100000000,
+            "Subscriber balance 1 is correct"
+        );
+        Assert.equal(
+            Interface_EventManager(eventMgrAddrs[1]).subscriberCheckBalance(
+                address(subscriber)
+            ),
+            200000000,
+            "Subscriber balance 2 is correct"
+        );
+
+        // the pre-registered publisher can publish to its event manager
+        TestPublisher(publisherAddrs[1]).setEventMgrAddr(eventMgrAddrs[1]);
+        bytes memory data = "Hello from a batch";
+        TestPublisher(publisherAddrs[1]).notifySubscribers(data);
+        Assert.equal(
+            keccak256(subscriber.m_recvData()),
+            keccak256(data),
+            "Subscriber should receive the data"
+        );
+    }
+
+    /// #value: 200000000
+    function unsubscribe() public payable {
+        Assert.equal(msg.value, 200000000, "msg.value not set correctly");
+
+        // PubSubService
+        PubSubService pubSubService = new PubSubService();
+        address pubSubServiceAddr = address(pubSubService);
+
+        // Publisher
+        TestPublisher publisher = new TestPublisher();
+        address eventMgrAddr = publisher.register(pubSubServiceAddr);
+        address publisherAddr = address(publisher);
+
+        // Subscriber
+        TestSubscriber subscriber = new TestSubscriber();
+        subscriber.subscribe{
+            value: 100000000
+        }(pubSubServiceAddr, publisherAddr);
+
+        // A successful unsubscription
+        try subscriber.unsubscribe(
+            pubSubServiceAddr,
+            publisherAddr
+        ) returns (uint256 refundWei) {
+            Assert.equal(refundWei, 100000000, "Refund amount is incorrect");
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while unsubscribing");
+        }
+        Assert.equal(
+            address(subscriber).balance,
+            100000000,
+            "Subscriber did not receive the refund"
+        );
+        Assert.equal(
+            eventMgrAddr.balance,
+            0,
+            "Event manager should not hold the refunded balance"
+        );
+
+        // unsubscribe again
+        try subscriber.unsubscribe(pubSubServiceAddr, publisherAddr) {
+            Assert.ok(false, "Subscriber should not be able to unsubscribe twice");
+        } catch Error(string memory reason) {
+            Assert.equal(reason, "Subscriber is not found", reason);
+        } catch (bytes memory) {
+            Assert.ok(
+                false,
+                "Unexpected error occurred while unsubscribing again"
+            );
+        }
+
+        // subscribe again after unsubscribing
+        try subscriber.subscribe{
+            value: 100000000
+        }(pubSubServiceAddr, publisherAddr) returns (address addr) {
+            Assert.equal(
+                addr,
+                eventMgrAddr,
+                "event manager address does not match"
+            );
+        } catch Error(string memory reason) {
+            Assert.ok(false, reason);
+        } catch (bytes memory) {
+            Assert.ok(false, "Unexpected error occurred while re-subscribing");
+        }
+    }
 }
@@ -0,0 +1,94 @@
+// SPDX-License-Identifier: MIT
+pragma solidity >=0.4.17 <0.9.0;
+
+// This import is automatically injected by Remix
+import "remix_tests.sol";
+
+import {EventManager} from "../../PubSub/EventManager.sol";
+import {ReadAggregator} from "../../PubSub/ReadAggregator.sol";
+import {Interface_EventManager} from "../../PubSub/Interface_EventManager.sol";
+import {TestSubscriber} from "./TestUtils.sol";
+
+
+// File name has to end with '_test.sol', this file can contain more than one testSuite contracts
+contract ReadAggregator_testSuite {
+
+    /// 'beforeAll' runs before all other tests
+    /// More special functions are: 'beforeEach', 'beforeAll', 'afterEach' & 'afterAll'
+    function beforeAll() public {
+    }
+
+    /// #value: 1000000000000000000
+    function aggregateReads() public payable {
+        Assert.equal(
+            msg.value,
+            1000000000000000000,
+            "Incorrect value sent to contract"
+        );
+
+        ReadAggregator aggregator = new ReadAggregator();
+        EventManager eventMgrInst1 = new EventManager(address(this));
+        address eventMgr1Addr = address(eventMgrInst1);
+
+        TestSubscriber subscriber1 = new TestSubscriber();
+        Interface_EventManager(eventMgr1Addr).addSubscriber{
+            value: 1000000000000000000
+        }(address(subscriber1));
+
+        // three reads that succeed, and one that reverts
+        ReadAggregator.Call[] memory calls = new ReadAggregator.Call[](4);
+        calls[0] = ReadAggregator.Call({
+            target:   eventMgr1Addr,
+            callData: abi.encodeCall(
+                Interface_EventManager.subscriberCheckBalance,
+                (address(subscriber1))
+            )
+        });
+        calls[1] = ReadAggregator.Call({
+            target:   eventMgr1Addr,
+            callData: abi.encodeCall(Interface_EventManager.getSeqNum, ())
+        });
+        calls[2] = ReadAggregator.Call({
+            target:   eventMgr1Addr,
+            callData: abi.encodeCall(
+                Interface_EventManager.subscriberCheckBalance,
+                (address(this))
+            )
+        });
+        calls[3] = ReadAggregator.Call({
+            target:   address(aggregator),
+            callData: abi.encodeCall(
+                ReadAggregator.getEthBalance,
+                (eventMgr1Addr)
+            )
+        });
+
+        ReadAggregator.Result[] memory results = aggregator.aggregate(calls);
+        Assert.equal(results.length, 4, "Incorrect number of results");
+
+        Assert.ok(results[0].success, "Balance read failed");
+        Assert.equal(
+            abi.decode(results[0].returnData, (uint256)),
+            1000000000000000000,
+            "Incorrect balance"
+        );
+
+        Assert.ok(results[1].success, "Sequence number read failed");
+        Assert.equal(
+            abi.decode(results[1].returnData, (uint256)),
+            0,
+            "Incorrect sequence number"
+        );
+
+        // the failed read is reported without reverting the batch
+        Assert.ok(!results[2].success, "Read of an unknown subscriber");
+
+        // the aggregator reads Ether balances through itself
+        Assert.ok(results[3].success, "Ether balance read failed");
+        Assert.equal(
+            abi.decode(results[3].returnData, (uint256)),
+            eventMgr1Addr.balance,
+            "Incorrect Ether balance"
+        );
+    }
+}
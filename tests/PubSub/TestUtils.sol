@@ -33,6 +33,55 @@ contract TestSubscriber{
         }(publisherAddr);
         return m_eventMgrAddr;
     }
+
+    function subscribeMany(
+        address pubSubServiceAddr,
+        address[] memory publisherAddrs,
+        uint256[] memory deposits
+    )
+        external
+        payable
+        returns (address[] memory)
+    {
+        return Interface_PubSubService(pubSubServiceAddr).subscribeMany{
+            value: msg.value
+        }(publisherAddrs, deposits);
+    }
+
+    function unsubscribe(address pubSubServiceAddr, address publisherAddr)
+        external
+        returns (uint256)
+    {
+        return Interface_PubSubService(pubSubServiceAddr).unsubscribe(
+            publisherAddr
+        );
+    }
+
+    receive() external payable {
+    }
+}
+
+
+contract HashSubscriber{
+    bytes32 public m_recvDataHash;
+    uint256 public m_recvSeqNum;
+    bytes public m_recvData;
+
+    constructor() {
+    }
+
+    function onNotifyHash(bytes32 dataHash, uint256 seqNum) external {
+        m_recvDataHash = dataHash;
+        m_recvSeqNum = seqNum;
+    }
+
+    function submitData(bytes calldata data) external {
+        require(
+            keccak256(data) == m_recvDataHash,
+            "Data does not match the notified hash"
+        );
+        m_recvData = data;
+    }
 }
 
 
@@ -107,8 +156,14 @@ contract ReentrySubscriber{
 
 contract TestPublisher{
     address public m_eventMgrAddr;
+    address public m_registrar;
 
     constructor() {
+        m_registrar = msg.sender;
+    }
+
+    function pubSubRegistrar() external view returns (address) {
+        return m_registrar;
     }
 
     function register(address pubSubServiceAddr) external returns (address) {
@@ -116,10 +171,20 @@ contract TestPublisher{
         return m_eventMgrAddr;
     }
 
+    function registerClone(address pubSubServiceAddr) external returns (address) {
+        m_eventMgrAddr =
+            Interface_PubSubService(pubSubServiceAddr).registerClone();
+        return m_eventMgrAddr;
+    }
+
     function setEventMgrAddr(address eventMgrAddr) external {
         m_eventMgrAddr = eventMgrAddr;
     }
 
+    function setRegistrar(address registrar) external {
+        m_registrar = registrar;
+    }
+
     function notifySubscribers(bytes memory data) external {
         Interface_EventManager(m_eventMgrAddr).notifySubscribers(data);
     }
@@ -0,0 +1,109 @@
+// SPDX-License-Identifier: MIT
+pragma solidity >=0.4.17 <0.9.0;
+
+
+// the part of the subscriber contracts (e.g. HelloWorldSubscriber,
+// GasEvalPayloadSubscriber) that the factory relies on
+interface Interface_FleetSubscriber {
+	function subscribe(address publisherAddr) external payable;
+	// only needed by unsubscribeFleet (e.g., HelloWorldSubscriber)
+	function unsubscribe(address publisherAddr) external;
+}
+
+
+contract SubscriberFleetFactory {
+
+	// the subscribers are created by the factory, which makes the factory
+	// their owner; it unsubscribes them on behalf of this account
+	address public m_owner;
+
+	constructor() {
+		m_owner = msg.sender;
+	}
+
+	function deployFleet(
+		bytes calldata initCode,
+		address publisherAddr,
+		bytes32 salt,
+		uint256 firstIndex,
+		uint256 count,
+		uint256 depositWei
+	)
+		external
+		payable
+		returns (address[] memory subscriberAddrs)
+	{
+		require(
+			msg.value == count * depositWei,
+			"Deposits do not add up to the value"
+		);
+
+		// the init code (creation code followed by the constructor
+		// arguments) is copied into memory once for all subscribers
+		bytes memory code = initCode;
+
+		subscriberAddrs = new address[](count);
+		for (uint256 i = 0; i < count; ++i) {
+			// CREATE2, so the address of every subscriber can be computed
+			// off-chain from (salt, index) without reading the receipt
+			bytes32 subSalt = keccak256(abi.encode(salt, firstIndex + i));
+			address subscriberAddr;
+			assembly {
+				subscriberAddr := create2(
+					0,
+					add(code, 0x20),
+					mload(code),
+					subSalt
+				)
+			}
+			require(subscriberAddr != address(0), "Deployment failed");
+
+			Interface_FleetSubscriber(subscriberAddr).subscribe{
+				value: depositWei
+			}(publisherAddr);
+
+			subscriberAddrs[i] = subscriberAddr;
+		}
+	}
+
+	function unsubscribeFleet(
+		address[] calldata subscriberAddrs,
+		address publisherAddr
+	)
+		external
+	{
+		require(msg.sender == m_owner, "Only the owner can unsubscribe");
+
+		for (uint256 i = 0; i < subscriberAddrs.length; ++i) {
+			// the subscriber passes its refund on to the factory
+			Interface_FleetSubscriber(subscriberAddrs[i]).unsubscribe(
+				publisherAddr
+			);
+		}
+
+		// pass the refunded balances on to the owner
+		payable(m_owner).transfer(address(this).balance);
+	}
+
+	function computeAddress(
+		bytes32 initCodeHash,
+		bytes32 salt,
+		uint256 index
+	)
+		external
+		view
+		returns (address)
+	{
+		bytes32 subSalt = keccak256(abi.encode(salt, index));
+		return address(uint160(uint256(keccak256(abi.encodePacked(
+			bytes1(0xff),
+			address(this),
+			subSalt,
+			initCodeHash
+		)))));
+	}
+
+	receive() external payable {
+		// accept the refunds passed on by the subscribers
+	}
+}
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import json
+import os
+
+from eth_abi import decode as AbiDecode
+from eth_utils import keccak, to_checksum_address
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# ABI types that occupy exactly one 32-byte word and can be decoded by slicing
+_STATIC_WORD_PREFIXES = ('uint', 'int', 'address', 'bool', 'bytes32')
+
+
+class DecodedEvent(NamedTuple):
+	contract: str
+	event: str
+	args: Dict[str, Any]
+	address: Optional[str]
+	blockNumber: Optional[int]
+	transactionHash: Optional[bytes]
+	logIndex: Optional[int]
+
+
+class _EventSpec(object):
+
+	def __init__(self, contract: str, abiEntry: dict) -> None:
+		self.contract = contract
+		self.name = abiEntry['name']
+		self.signature = '{}({})'.format(
+			self.name,
+			','.join([ _CanonicalType(x) for x in abiEntry['inputs'] ]),
+		)
+		self.topic0 = keccak(text=self.signature)
+
+		self.indexedNames = []
+		self.indexedTypes = []
+		self.dataNames    = []
+		self.dataTypes    = []
+		for inp in abiEntry['inputs']:
+			if inp.get('indexed', False):
+				self.indexedNames.append(inp['name'])
+				self.indexedTypes.append(_CanonicalType(inp))
+			else:
+				self.dataNames.append(inp['name'])
+				self.dataTypes.append(_CanonicalType(inp))
+
+		# when every non-indexed field is a static single word, the data
+		# section can be decoded by slicing instead of going through eth_abi
+		self.dataIsStaticWords = all(
+			[ _IsStaticWord(t) for t in self.dataTypes ]
+		)
+
+	def Decode(self, topics: List[bytes], data: bytes) -> Dict[str, Any]:
+		if len(topics) != (1 + len(self.indexedTypes)):
+			raise ValueError(
+				'Event {} expects {} topics, got {}'.format(
+					self.signature,
+					1 + len(self.indexedTypes),
+					len(topics),
+				)
+			)
+
+		args = {}
+		for name, typ, topic in zip(
+			self.indexedNames,
+			self.indexedTypes,
+			topics[1:],
+		):
+			if _IsStaticWord(typ):
+				args[name] = _DecodeWord(typ, topic)
+			else:
+				# dynamic indexed values are stored as their keccak256 hash
+				args[name] = topic
+
+		if self.dataIsStaticWords:
+			if len(data) != 32 * len(self.dataTypes):
+				raise ValueError(
+					'Event {} expects {} bytes of data, got {}'.format(
+						self.signature,
+						32 * len(self.dataTypes),
+						len(data),
+					)
+				)
+			for i, (name, typ) in enumerate(
+				zip(self.dataNames, self.dataTypes)
+			):
+				args[name] = _DecodeWord(typ, data[32 * i : 32 * (i + 1)])
+		else:
+			values = AbiDecode(self.dataTypes, data)
+			for name, value in zip(self.dataNames, values):
+				args[name] = value
+
+		return args
+
+
+def _CanonicalType(abiInput: dict) -> str:
+	typ = abiInput['type']
+	if typ.startswith('tuple'):
+		return '({}){}'.format(
+			','.join([ _CanonicalType(x) for x in abiInput['components'] ]),
+			typ[len('tuple'):], # array suffix, if any
+		)
+	return typ
+
+
+def _IsStaticWord(typ: str) -> bool:
+	return typ.startswith(_STATIC_WORD_PREFIXES) and not typ.endswith(']')
+
+
+def _DecodeWord(typ: str, word: bytes) -> Any:
+	if typ.startswith('uint'):
+		return int.from_bytes(word, byteorder='big', signed=False)
+	elif typ.startswith('int'):
+		return int.from_bytes(word, byteorder='big', signed=True)
+	elif typ == 'address':
+		return to_checksum_address(word[12:])
+	elif typ == 'bool':
+		return word[-1] != 0
+	else: # bytes32
+		return bytes(word)
+
+
+def _ToBytes(value: Any) -> bytes:
+	if isinstance(value, str):
+		return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+	# HexBytes is a subclass of bytes
+	return bytes(value)
+
+
+class EventLogDecoder(object):
+	'''
+	Decode event logs using a topic0 -> event ABI index built once from the
+	contract ABIs
+	'''
+
+	def __init__(self) -> None:
+		self.index: Dict[bytes, _EventSpec] = {}
+		self.byName: Dict[str, _EventSpec] = {}
+
+	def AddAbi(self, contractName: str, abi: List[dict]) -> None:
+		for entry in abi:
+			if (entry.get('type') != 'event') or entry.get('anonymous', False):
+				continue
+			spec = _EventSpec(contractName, entry)
+			# same signature declared by multiple contracts decodes the same
+			# way, so the first one registered is kept
+			self.index.setdefault(spec.topic0, spec)
+			self.byName.setdefault(spec.name, spec)
+
+	@classmethod
+	def FromBuildDir(
+		cls,
+		buildDir: str,
+		projConf: str,
+		contractNames: Optional[Iterable[str]] = None,
+	) -> 'EventLogDecoder':
+		with open(projConf, 'r') as f:
+			moduleMap = json.load(f)['contractModuleMap']
+
+		required = contractNames is not None
+		if contractNames is None:
+			contractNames = moduleMap.keys()
+
+		decoder = cls()
+		for contractName in contractNames:
+			abiPath = _FindAbiPath(
+				buildDir,
+				moduleMap.get(contractName),
+				contractName,
+			)
+			if abiPath is None:
+				if required:
+					raise FileNotFoundError(
+						'ABI file for contract {} is not found under {}'.format(
+							contractName,
+							buildDir,
+						)
+					)
+				continue
+			with open(abiPath, 'r') as f:
+				decoder.AddAbi(contractName, json.load(f))
+
+		return decoder
+
+	def Topic0(self, eventName: str) -> bytes:
+		return self.byName[eventName].topic0
+
+	def Decode(self, log: dict) -> Optional[DecodedEvent]:
+		topics = log['topics']
+		if len(topics) == 0:
+			return None
+
+		topic0 = _ToBytes(topics[0])
+		spec = self.index.get(topic0)
+		if spec is None:
+			return None
+
+		return _BuildDecodedEvent(spec, topic0, log)
+
+	def DecodeLogs(
+		self,
+		logs: Iterable[dict],
+		eventNames: Optional[Iterable[str]] = None,
+	) -> List[DecodedEvent]:
+		wanted = None
+		if eventNames is not None:
+			wanted = set([ self.byName[x].topic0 for x in eventNames ])
+
+		res = []
+		for log in logs:
+			topics = log['topics']
+			if len(topics) == 0:
+				continue
+			topic0 = _ToBytes(topics[0])
+			if (wanted is not None) and (topic0 not in wanted):
+				continue
+			spec = self.index.get(topic0)
+			if spec is None:
+				continue
+			res.append(_BuildDecodedEvent(spec, topic0, log))
+
+		return res
+
+
+def _BuildDecodedEvent(
+	spec: _EventSpec,
+	topic0: bytes,
+	log: dict,
+) -> DecodedEvent:
+	topics = log['topics']
+	return DecodedEvent(
+		contract=spec.contract,
+		event=spec.name,
+		args=spec.Decode(
+			[ topic0 ] + [ _ToBytes(t) for t in topics[1:] ],
+			_ToBytes(log['data']),
+		),
+		address=log.get('address'),
+		blockNumber=log.get('blockNumber'),
+		transactionHash=log.get('transactionHash'),
+		logIndex=log.get('logIndex'),
+	)
+
+
+def _FindAbiPath(
+	buildDir: str,
+	moduleName: Optional[str],
+	contractName: str,
+) -> Optional[str]:
+	candidates: List[Tuple[str, ...]] = []
+	if moduleName is not None:
+		# local build layout, build/<module>/<Contract>.abi
+		candidates.append((buildDir, moduleName, contractName + '.abi'))
+	# release layout, <Contract>.abi directly under the build directory
+	candidates.append((buildDir, contractName + '.abi'))
+
+	for candidate in candidates:
+		path = os.path.join(*candidate)
+		if os.path.isfile(path):
+			return path
+
+	return None
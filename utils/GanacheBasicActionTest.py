@@ -34,6 +34,7 @@ GANACHE_NET_ID      = 1337
 sys.path.append(PYHELPER_DIR)
 from PyEthHelper import EthContractHelper
 from PyEthHelper import GanacheAccounts
+from EventLogDecoder import EventLogDecoder
 
 
 def StartGanache() -> subprocess.Popen:
@@ -52,20 +53,15 @@ def StartGanache() -> subprocess.Popen:
 
 
 def ReadEvalLogEvents(logs: List[dict]) -> None:
-	for log in logs:
-		if (
-			(len(log['topics']) > 0) and
-			(
-				log['topics'][0].hex() ==
-				'0xe1ae46340cc3bb84afacee6678b86b538a6d5e4ce754adb3bfa9ce4e41d196ba'
-			)
-		):
-			hexData = log['data'].hex()
-			assert len(hexData) == 2 + (2 * (32 + 32)), 'Invalid log data length'
-			bData = bytes.fromhex(hexData[2:])
-			idx = int.from_bytes(bData[:32], byteorder='big')
-			gasUsed = int.from_bytes(bData[32:], byteorder='big')
-			print(f'Evaluated action at index {idx} with gas used {gasUsed}')
+	decoder = EventLogDecoder.FromBuildDir(
+		buildDir=BUILD_DIR_PATH,
+		projConf=PROJECT_CONFIG_PATH,
+		contractNames=[ 'BasicActionGasCost' ],
+	)
+	for ev in decoder.DecodeLogs(logs, eventNames=[ 'LogGasCost' ]):
+		idx = ev.args['idx']
+		gasUsed = ev.args['gasUsed']
+		print(f'Evaluated action at index {idx} with gas used {gasUsed}')
 
 
 def RunTests() -> dict:
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import json
+import logging
+import os
+import time
+
+from typing import Iterator, List, Optional, Tuple
+from web3 import Web3
+
+
+class LogRangeScanner(object):
+	'''
+	Scan event logs with eth_getLogs over block ranges whose size adapts to
+	how many logs the node returns and whether it rejects the query
+	'''
+
+	def __init__(
+		self,
+		w3: Web3,
+		addresses: List[str],
+		topics: List[Optional[List[bytes]]],
+		initRangeSize: int = 1000,
+		minRangeSize: int = 1,
+		maxRangeSize: int = 100000,
+		targetLogsPerRange: int = 2000,
+		confirmations: int = 0,
+	) -> None:
+		self.w3 = w3
+		self.addresses = [ Web3.to_checksum_address(x) for x in addresses ]
+		self.topics = topics
+		self.minRangeSize = minRangeSize
+		self.maxRangeSize = maxRangeSize
+		self.targetLogsPerRange = targetLogsPerRange
+		self.confirmations = confirmations
+		self.rangeSize = max(minRangeSize, min(initRangeSize, maxRangeSize))
+
+		self.logger = logging.getLogger(self.__class__.__name__)
+
+	def SafeHead(self) -> int:
+		return self.w3.eth.block_number - self.confirmations
+
+	def _GetLogs(self, fromBlock: int, toBlock: int) -> List[dict]:
+		return self.w3.eth.get_logs({
+			'fromBlock': fromBlock,
+			'toBlock': toBlock,
+			'address': self.addresses,
+			'topics': self.topics,
+		})
+
+	def Scan(
+		self,
+		fromBlock: int,
+		toBlock: int,
+	) -> Iterator[Tuple[int, int, List[dict]]]:
+		'''
+		Yield (rangeStart, rangeEnd, logs) for consecutive ranges covering
+		[fromBlock, toBlock], in block order
+		'''
+		start = fromBlock
+		while start <= toBlock:
+			end = min(start + self.rangeSize - 1, toBlock)
+			try:
+				logs = self._GetLogs(start, end)
+			except Exception as e:
+				if self.rangeSize <= self.minRangeSize:
+					raise
+				# the node rejected the query (too many results, timeout, etc)
+				# shrink the range and retry the same start block
+				self.rangeSize = max(self.minRangeSize, self.rangeSize // 2)
+				self.logger.debug(
+					'eth_getLogs [%d, %d] failed (%s); range size -> %d',
+					start, end, e, self.rangeSize
+				)
+				continue
+
+			yield start, end, logs
+
+			# adapt the range size for the next query
+			if len(logs) > self.targetLogsPerRange:
+				self.rangeSize = max(self.minRangeSize, self.rangeSize // 2)
+			elif len(logs) < (self.targetLogsPerRange // 2):
+				self.rangeSize = min(self.maxRangeSize, self.rangeSize * 2)
+
+			start = end + 1
+
+	def Follow(
+		self,
+		fromBlock: int,
+		pollInterval: float = 2.0,
+		stopBlock: Optional[int] = None,
+	) -> Iterator[Tuple[int, int, List[dict]]]:
+		'''
+		Catch up on history from fromBlock, then keep tailing new blocks
+		until stopBlock (if given) has been scanned
+		'''
+		nextBlock = fromBlock
+		while (stopBlock is None) or (nextBlock <= stopBlock):
+			head = self.SafeHead()
+			if stopBlock is not None:
+				head = min(head, stopBlock)
+			if head < nextBlock:
+				time.sleep(pollInterval)
+				continue
+
+			for rangeStart, rangeEnd, logs in self.Scan(nextBlock, head):
+				yield rangeStart, rangeEnd, logs
+				nextBlock = rangeEnd + 1
+
+
+class BlockCheckpoint(object):
+	'''
+	Persist the next block to scan in a small JSON file, so a restarted
+	scanner resumes where it stopped; the consumer's own state as of that
+	block can be kept along with it (see extra)
+	'''
+
+	def __init__(self, path: str, addresses: List[str]) -> None:
+		self.path = path
+		self.addresses = sorted([ Web3.to_checksum_address(x) for x in addresses ])
+		# the state saved with the loaded checkpoint
+		self.extra: dict = {}
+
+	def Load(self, defaultBlock: int) -> int:
+		if not os.path.isfile(self.path):
+			return defaultBlock
+
+		with open(self.path, 'r') as f:
+			state = json.load(f)
+
+		if sorted(state['addresses']) != self.addresses:
+			raise ValueError(
+				'Checkpoint {} was created for a different set of addresses; '
+				'remove it or use another checkpoint file'.format(self.path)
+			)
+
+		self.extra = state.get('extra', {})
+		return state['nextBlock']
+
+	def Save(self, nextBlock: int, extra: Optional[dict] = None) -> None:
+		state = { 'addresses': self.addresses, 'nextBlock': nextBlock, }
+		if extra is not None:
+			state['extra'] = extra
+		tmpPath = self.path + '.tmp'
+		with open(tmpPath, 'w') as f:
+			json.dump(state, f, indent='\t')
+			f.flush()
+			os.fsync(f.fileno())
+		# atomic on POSIX, so a crash never leaves a half-written checkpoint
+		os.replace(tmpPath, self.path)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from eth_utils import function_signature_to_4byte_selector
+from web3 import Web3
+from web3.contract import Contract
+
+
+_AGGREGATE_SELECTOR = function_signature_to_4byte_selector(
+	'aggregate((address,bytes)[])'
+)
+
+
+class ReadCall(NamedTuple):
+	contract: Contract
+	funcName: str
+	args: Sequence[Any] = ()
+
+
+class ReadResult(NamedTuple):
+	success: bool
+	# the decoded return value; a single output is unwrapped, as web3 does
+	value: Any
+	returnData: bytes
+
+
+def _CanonicalType(abiOutput: dict) -> str:
+	typ = abiOutput['type']
+	if typ.startswith('tuple'):
+		return '({}){}'.format(
+			','.join([ _CanonicalType(x) for x in abiOutput['components'] ]),
+			typ[len('tuple'):], # array suffix, if any
+		)
+	return typ
+
+
+class MulticallReader(object):
+	'''
+	Pack many view calls into a single eth_call to a ReadAggregator
+	contract, and decode each result with the ABI of the contract it was
+	made to
+
+	The output types of each function are looked up once per ABI and
+	cached. Calls are sent in batches of at most maxCallsPerBatch, so a
+	huge batch stays below the node's eth_call gas limit.
+	'''
+
+	def __init__(
+		self,
+		w3: Web3,
+		aggregatorAddr: str,
+		maxCallsPerBatch: int = 1000,
+	) -> None:
+		self.w3 = w3
+		self.aggregatorAddr = Web3.to_checksum_address(aggregatorAddr)
+		self.maxCallsPerBatch = maxCallsPerBatch
+		self.outputTypes: Dict[Tuple[int, str], List[str]] = {}
+
+	def _OutputTypes(self, call: ReadCall) -> List[str]:
+		key = (id(call.contract.abi), call.funcName)
+		if key not in self.outputTypes:
+			if '(' in call.funcName:
+				func = call.contract.get_function_by_signature(call.funcName)
+			else:
+				func = call.contract.get_function_by_name(call.funcName)
+			self.outputTypes[key] = [
+				_CanonicalType(x) for x in func.abi['outputs']
+			]
+		return self.outputTypes[key]
+
+	def _Aggregate(
+		self,
+		calls: List[ReadCall],
+		blockIdentifier: Any,
+	) -> List[Tuple[bool, bytes]]:
+		packed = [
+			(
+				x.contract.address,
+				bytes.fromhex(x.contract.encodeABI(
+					fn_name=x.funcName,
+					args=list(x.args),
+				)[2:]),
+			)
+			for x in calls
+		]
+		ret = self.w3.eth.call(
+			{
+				'to': self.aggregatorAddr,
+				'data': _AGGREGATE_SELECTOR +
+					self.w3.codec.encode([ '(address,bytes)[]' ], [ packed ]),
+			},
+			blockIdentifier,
+		)
+		return self.w3.codec.decode([ '(bool,bytes)[]' ], ret)[0]
+
+	def Read(
+		self,
+		calls: List[ReadCall],
+		blockIdentifier: Any = 'latest',
+	) -> List[ReadResult]:
+		'''
+		Make the given view calls; failed calls are reported through
+		ReadResult.success instead of raising
+		'''
+		results = []
+		for start in range(0, len(calls), self.maxCallsPerBatch):
+			batch = calls[start : start + self.maxCallsPerBatch]
+			for call, (success, returnData) in zip(
+				batch,
+				self._Aggregate(batch, blockIdentifier),
+			):
+				value = None
+				if success:
+					values = self.w3.codec.decode(
+						self._OutputTypes(call),
+						returnData,
+					)
+					value = values[0] if len(values) == 1 else values
+				results.append(ReadResult(success, value, bytes(returnData)))
+
+		return results
+
+	def ReadValues(
+		self,
+		calls: List[ReadCall],
+		blockIdentifier: Any = 'latest',
+	) -> List[Any]:
+		'''
+		Make the given view calls, and raise if any of them failed
+		'''
+		results = self.Read(calls, blockIdentifier)
+		for call, res in zip(calls, results):
+			if not res.success:
+				raise RuntimeError(
+					'Read {}.{}({}) failed'.format(
+						call.contract.address,
+						call.funcName,
+						', '.join([ str(x) for x in call.args ]),
+					)
+				)
+		return [ x.value for x in results ]
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import logging
+import os
+import queue
+import threading
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from web3 import Web3
+
+from EventLogDecoder import DecodedEvent, EventLogDecoder
+from LogRangeScanner import BlockCheckpoint, LogRangeScanner
+
+
+BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
+UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
+PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
+
+
+NotifyHandler = Callable[[DecodedEvent], None]
+
+# eth_getLogs OR-lists are kept short, as some nodes limit their length
+MAX_SEQ_NUMS_PER_QUERY = 100
+
+
+def AddressTopic(addr: str) -> bytes:
+	return bytes(12) + bytes.fromhex(Web3.to_checksum_address(addr)[2:])
+
+
+def UintTopic(value: int) -> bytes:
+	return value.to_bytes(32, byteorder='big', signed=False)
+
+
+class _CheckpointMarker(NamedTuple):
+	nextBlock: int
+	# the last sequence number (and its block) of each EventManager, as of
+	# nextBlock
+	lastSeqNums: Dict[str, Tuple[int, int]]
+
+
+class NotifySubscribersConsumer(object):
+	'''
+	Follow NotifySubscribers events emitted by one or more EventManager
+	contracts and hand them, in order, to a handler running on its own thread
+
+	Events travel through a bounded queue, so a slow handler blocks the
+	scanner instead of letting the backlog grow without limit.
+	The checkpoint only advances once the handler has processed every event
+	in the scanned range, so a restart never skips an event (it may
+	re-deliver the events of the last unfinished range).
+
+	The publisher and topic filters are indexed fields of the event, so the
+	node does the selection. Without filters, every message of an
+	EventManager is consumed, and its sequence numbers must be consecutive;
+	when one is skipped, only the missing sequence numbers are fetched,
+	from the blocks between the last event and this one, before the event
+	is delivered. The last sequence numbers are saved with the checkpoint,
+	so gaps across a restart are caught as well.
+	'''
+
+	def __init__(
+		self,
+		w3: Web3,
+		eventMgrAddrs: List[str],
+		handler: NotifyHandler,
+		checkpointPath: str,
+		decoder: Optional[EventLogDecoder] = None,
+		queueSize: int = 1024,
+		confirmations: int = 0,
+		publisherAddrs: Optional[List[str]] = None,
+		topics: Optional[List[int]] = None,
+	) -> None:
+		if decoder is None:
+			decoder = EventLogDecoder.FromBuildDir(
+				buildDir=BUILD_DIR_PATH,
+				projConf=PROJECT_CONFIG_PATH,
+				contractNames=[ 'EventManager' ],
+			)
+		self.decoder = decoder
+		self.handler = handler
+
+		self.w3 = w3
+		self.topic0 = decoder.Topic0('NotifySubscribers')
+		self.scanner = LogRangeScanner(
+			w3=w3,
+			addresses=eventMgrAddrs,
+			topics=[
+				[ self.topic0 ],
+				None if publisherAddrs is None else
+					[ AddressTopic(x) for x in publisherAddrs ],
+				None if topics is None else
+					[ UintTopic(x) for x in topics ],
+			],
+			confirmations=confirmations,
+		)
+		# sequence numbers are shared by all publishers and topics of an
+		# EventManager, so a filtered stream has gaps by design
+		self.checkGaps = (publisherAddrs is None) and (topics is None)
+		# EventManager address -> (last sequence number, its block)
+		self.lastSeqNums: Dict[str, Tuple[int, int]] = {}
+		self.checkpoint = BlockCheckpoint(checkpointPath, eventMgrAddrs)
+
+		self.queue = queue.Queue(maxsize=queueSize)
+		self.worker = None
+		self.workerError = None
+
+		self.logger = logging.getLogger(self.__class__.__name__)
+
+	def _WorkerLoop(self) -> None:
+		while True:
+			item = self.queue.get()
+			try:
+				if item is None:
+					return
+				elif isinstance(item, _CheckpointMarker):
+					self.checkpoint.Save(
+						item.nextBlock,
+						{ 'lastSeqNums': item.lastSeqNums },
+					)
+				else:
+					self.handler(item)
+			except Exception as e:
+				# stop consuming; the scanner notices and stops as well
+				self.workerError = e
+				self.logger.exception('Handler failed')
+				return
+			finally:
+				self.queue.task_done()
+
+	def _Put(self, item: object) -> None:
+		# blocking put with a timeout, so a dead worker does not hang us
+		while True:
+			if self.workerError is not None:
+				raise RuntimeError('Handler thread stopped') from self.workerError
+			try:
+				self.queue.put(item, timeout=1.0)
+				return
+			except queue.Full:
+				continue
+
+	def _FetchSeqNums(
+		self,
+		eventMgrAddr: str,
+		seqNums: List[int],
+		fromBlock: int,
+		toBlock: int,
+	) -> List[DecodedEvent]:
+		res = []
+		for i in range(0, len(seqNums), MAX_SEQ_NUMS_PER_QUERY):
+			scanner = LogRangeScanner(
+				w3=self.w3,
+				addresses=[ eventMgrAddr ],
+				topics=[
+					[ self.topic0 ],
+					None,
+					None,
+					[
+						UintTopic(x)
+						for x in seqNums[i : i + MAX_SEQ_NUMS_PER_QUERY]
+					],
+				],
+			)
+			for _, _, logs in scanner.Scan(fromBlock, toBlock):
+				res += self.decoder.DecodeLogs(logs)
+		return res
+
+	def _CheckSeqNum(self, ev: DecodedEvent) -> List[DecodedEvent]:
+		'''
+		Return the events to deliver before ev, if messages were missed
+		since the last event of the same EventManager
+		'''
+		eventMgrAddr = Web3.to_checksum_address(ev.address)
+		seqNum = ev.args['seqNum']
+		lastSeqNum, lastBlock = self.lastSeqNums.get(eventMgrAddr, (None, 0))
+		if (lastSeqNum is None) or (seqNum > lastSeqNum):
+			self.lastSeqNums[eventMgrAddr] = (seqNum, ev.blockNumber)
+
+		# the first event seen sets the baseline
+		if (lastSeqNum is None) or (seqNum <= lastSeqNum + 1):
+			return []
+
+		missing = list(range(lastSeqNum + 1, seqNum))
+		self.logger.warning(
+			'%s: sequence numbers %d-%d are missing; fetching them',
+			eventMgrAddr,
+			missing[0],
+			missing[-1],
+		)
+		# the missing messages were emitted after the last one we have
+		found = self._FetchSeqNums(
+			eventMgrAddr,
+			missing,
+			lastBlock,
+			ev.blockNumber,
+		)
+		found.sort(key=lambda x: x.args['seqNum'])
+
+		foundSeqNums = set([ x.args['seqNum'] for x in found ])
+		lost = [ x for x in missing if x not in foundSeqNums ]
+		if len(lost) > 0:
+			self.logger.error(
+				'%s: %d messages could not be fetched (first: %d)',
+				eventMgrAddr,
+				len(lost),
+				lost[0],
+			)
+		return found
+
+	def Run(
+		self,
+		fromBlock: int = 0,
+		pollInterval: float = 2.0,
+		stopBlock: Optional[int] = None,
+	) -> None:
+		startBlock = self.checkpoint.Load(fromBlock)
+		self.lastSeqNums = {
+			addr: (seqNum, blockNum)
+			for addr, (seqNum, blockNum) in self.checkpoint.extra.get(
+				'lastSeqNums', {}
+			).items()
+		}
+		self.logger.info('Resuming from block %d', startBlock)
+
+		self.worker = threading.Thread(target=self._WorkerLoop, daemon=True)
+		self.worker.start()
+
+		try:
+			for _, rangeEnd, logs in self.scanner.Follow(
+				fromBlock=startBlock,
+				pollInterval=pollInterval,
+				stopBlock=stopBlock,
+			):
+				for ev in self.decoder.DecodeLogs(logs):
+					if self.checkGaps:
+						for missed in self._CheckSeqNum(ev):
+							self._Put(missed)
+					self._Put(ev)
+				self._Put(_CheckpointMarker(
+					rangeEnd + 1,
+					dict(self.lastSeqNums),
+				))
+		finally:
+			if self.workerError is None:
+				self._Put(None)
+			self.worker.join()
+
+		# the handler may have failed on the last events, after the scanner
+		# stopped
+		if self.workerError is not None:
+			raise self.workerError
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Print NotifySubscribers payloads of EventManager contracts'
+	)
+	argParser.add_argument(
+		'--rpc', type=str, required=False, default='http://localhost:7545',
+		help='URL of the Ethereum JSON-RPC endpoint'
+	)
+	argParser.add_argument(
+		'--event-manager', type=str, required=True, action='append',
+		help='address of an EventManager to follow (can be repeated)'
+	)
+	argParser.add_argument(
+		'--checkpoint', type=str, required=False,
+		default=os.path.join(BUILD_DIR_PATH, 'notify_consumer_checkpoint.json'),
+		help='path to the checkpoint file'
+	)
+	argParser.add_argument(
+		'--from-block', type=int, required=False, default=0,
+		help='block to start from when there is no checkpoint'
+	)
+	argParser.add_argument(
+		'--to-block', type=int, required=False, default=None,
+		help='stop after this block (default: keep tailing new blocks)'
+	)
+	argParser.add_argument(
+		'--confirmations', type=int, required=False, default=0,
+		help='only consume blocks with at least this many confirmations'
+	)
+	argParser.add_argument(
+		'--publisher', type=str, required=False, action='append',
+		help='only consume messages of this publisher (can be repeated)'
+	)
+	argParser.add_argument(
+		'--topic', type=int, required=False, action='append',
+		help='only consume messages of this topic (can be repeated)'
+	)
+	args = argParser.parse_args()
+
+	logging.basicConfig(
+		level=logging.INFO,
+		format='%(asctime)s %(levelname)s %(name)s %(message)s'
+	)
+
+	def _PrintPayload(ev: DecodedEvent) -> None:
+		print('[{}#{}] {} ({}, topic {}, seq {}): {}'.format(
+			ev.blockNumber,
+			ev.logIndex,
+			ev.address,
+			ev.args['publisherAddr'],
+			ev.args['topic'],
+			ev.args['seqNum'],
+			ev.args['data'].hex(),
+		))
+
+	consumer = NotifySubscribersConsumer(
+		w3=Web3(Web3.HTTPProvider(args.rpc)),
+		eventMgrAddrs=args.event_manager,
+		handler=_PrintPayload,
+		checkpointPath=args.checkpoint,
+		confirmations=args.confirmations,
+		publisherAddrs=args.publisher,
+		topics=args.topic,
+	)
+	consumer.Run(fromBlock=args.from_block, stopBlock=args.to_block)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import logging
+import os
+import sqlite3
+
+from typing import Dict, Iterable, Optional
+from web3 import Web3
+
+from EventLogDecoder import EventLogDecoder
+from LogRangeScanner import LogRangeScanner
+
+
+BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
+UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
+PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
+
+
+class PublisherIndex(object):
+	'''
+	Local publisher -> EventManager index of a PubSubService deployment,
+	built from its PublisherRegistered events and kept in a SQLite file
+
+	Each scanned block range is written in a single transaction together
+	with the next block to scan, so the index and its checkpoint never
+	disagree, even if the process is killed half way.
+	'''
+
+	def __init__(
+		self,
+		dbPath: str,
+		w3: Web3,
+		pubSubAddr: str,
+		decoder: Optional[EventLogDecoder] = None,
+		confirmations: int = 0,
+	) -> None:
+		if decoder is None:
+			decoder = EventLogDecoder.FromBuildDir(
+				buildDir=BUILD_DIR_PATH,
+				projConf=PROJECT_CONFIG_PATH,
+				contractNames=[ 'PubSubService' ],
+			)
+		self.decoder = decoder
+		self.pubSubAddr = Web3.to_checksum_address(pubSubAddr)
+
+		self.scanner = LogRangeScanner(
+			w3=w3,
+			addresses=[ self.pubSubAddr ],
+			topics=[ [ decoder.Topic0('PublisherRegistered') ] ],
+			confirmations=confirmations,
+		)
+
+		self.db = sqlite3.connect(dbPath)
+		self.db.executescript('''
+			CREATE TABLE IF NOT EXISTS meta (
+				key   TEXT PRIMARY KEY,
+				value TEXT NOT NULL
+			);
+			CREATE TABLE IF NOT EXISTS publishers (
+				publisher     TEXT PRIMARY KEY,
+				event_manager TEXT NOT NULL,
+				block_number  INTEGER NOT NULL
+			) WITHOUT ROWID;
+		''')
+		storedAddr = self._GetMeta('pubSubAddr')
+		if storedAddr is None:
+			with self.db:
+				self._SetMeta('pubSubAddr', self.pubSubAddr)
+		elif storedAddr != self.pubSubAddr:
+			raise ValueError(
+				'Index {} was built for PubSubService {}'.format(
+					dbPath,
+					storedAddr,
+				)
+			)
+
+		self.logger = logging.getLogger(self.__class__.__name__)
+
+	def _GetMeta(self, key: str) -> Optional[str]:
+		row = self.db.execute(
+			'SELECT value FROM meta WHERE key = ?', (key, )
+		).fetchone()
+		return None if row is None else row[0]
+
+	def _SetMeta(self, key: str, value: str) -> None:
+		self.db.execute(
+			'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+			(key, value)
+		)
+
+	def NextBlock(self, defaultBlock: int = 0) -> int:
+		nextBlock = self._GetMeta('nextBlock')
+		return defaultBlock if nextBlock is None else int(nextBlock)
+
+	def _Ingest(self, rangeEnd: int, logs: Iterable[dict]) -> int:
+		rows = [
+			(
+				ev.args['pubAddr'],
+				ev.args['eventMgrAddr'],
+				ev.blockNumber,
+			)
+			for ev in self.decoder.DecodeLogs(logs)
+		]
+		with self.db:
+			self.db.executemany(
+				'INSERT OR REPLACE INTO publishers '
+				'(publisher, event_manager, block_number) VALUES (?, ?, ?)',
+				rows
+			)
+			self._SetMeta('nextBlock', str(rangeEnd + 1))
+		return len(rows)
+
+	def Update(
+		self,
+		fromBlock: int = 0,
+		toBlock: Optional[int] = None,
+	) -> int:
+		'''
+		Ingest PublisherRegistered events from the stored checkpoint (or
+		fromBlock for a new index) up to toBlock (default: the latest safe
+		block); returns the number of publishers added
+		'''
+		startBlock = self.NextBlock(fromBlock)
+		if toBlock is None:
+			toBlock = self.scanner.SafeHead()
+
+		numAdded = 0
+		for _, rangeEnd, logs in self.scanner.Scan(startBlock, toBlock):
+			numAdded += self._Ingest(rangeEnd, logs)
+
+		return numAdded
+
+	def Follow(self, fromBlock: int = 0, pollInterval: float = 2.0) -> None:
+		for _, rangeEnd, logs in self.scanner.Follow(
+			fromBlock=self.NextBlock(fromBlock),
+			pollInterval=pollInterval,
+		):
+			numAdded = self._Ingest(rangeEnd, logs)
+			if numAdded > 0:
+				self.logger.info(
+					'Indexed %d publishers up to block %d', numAdded, rangeEnd
+				)
+
+	def Lookup(self, publisherAddr: str) -> Optional[str]:
+		row = self.db.execute(
+			'SELECT event_manager FROM publishers WHERE publisher = ?',
+			(Web3.to_checksum_address(publisherAddr), )
+		).fetchone()
+		return None if row is None else row[0]
+
+	def LookupMany(self, publisherAddrs: Iterable[str]) -> Dict[str, str]:
+		res = {}
+		for publisherAddr in publisherAddrs:
+			eventMgrAddr = self.Lookup(publisherAddr)
+			if eventMgrAddr is not None:
+				res[publisherAddr] = eventMgrAddr
+		return res
+
+	def Count(self) -> int:
+		return self.db.execute('SELECT COUNT(*) FROM publishers').fetchone()[0]
+
+	def Close(self) -> None:
+		self.db.close()
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Build and query a local publisher -> EventManager index'
+	)
+	argParser.add_argument(
+		'--rpc', type=str, required=False, default='http://localhost:7545',
+		help='URL of the Ethereum JSON-RPC endpoint'
+	)
+	argParser.add_argument(
+		'--pubsub', type=str, required=True,
+		help='address of the PubSubService contract'
+	)
+	argParser.add_argument(
+		'--db', type=str, required=False,
+		default=os.path.join(BUILD_DIR_PATH, 'publisher_index.sqlite'),
+		help='path to the index database file'
+	)
+	argParser.add_argument(
+		'--from-block', type=int, required=False, default=0,
+		help='block to start from when building a new index'
+	)
+	argParser.add_argument(
+		'--lookup', type=str, required=False, action='append', default=[],
+		help='publisher address to look up (can be repeated)'
+	)
+	argParser.add_argument(
+		'--follow', action='store_true',
+		help='keep updating the index from new blocks'
+	)
+	args = argParser.parse_args()
+
+	logging.basicConfig(
+		level=logging.INFO,
+		format='%(asctime)s %(levelname)s %(name)s %(message)s'
+	)
+
+	index = PublisherIndex(
+		dbPath=args.db,
+		w3=Web3(Web3.HTTPProvider(args.rpc)),
+		pubSubAddr=args.pubsub,
+	)
+	try:
+		numAdded = index.Update(fromBlock=args.from_block)
+		print('Indexed {} new publishers ({} in total)'.format(
+			numAdded,
+			index.Count(),
+		))
+
+		for publisherAddr in args.lookup:
+			print('{} -> {}'.format(publisherAddr, index.Lookup(publisherAddr)))
+
+		if args.follow:
+			index.Follow(fromBlock=args.from_block)
+	finally:
+		index.Close()
+
+
+if __name__ == '__main__':
+	main()
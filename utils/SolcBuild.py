@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+###
+# Copyright (c) 2023 Roy Shadmon, Haofan Zheng
+# Use of this source code is governed by an MIT-style
+# license that can be found in the LICENSE file or at
+# https://opensource.org/licenses/MIT.
+###
+
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import subprocess
+
+from typing import Dict, Iterable, List, Optional
+
+
+BASE_DIR_PATH       = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILD_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'build')
+UTILS_DIR_PATH      = os.path.join(BASE_DIR_PATH, 'utils')
+PROJECT_CONFIG_PATH = os.path.join(UTILS_DIR_PATH, 'project_conf.json')
+SOLC_BIN_PATH       = os.path.join(BUILD_DIR_PATH, 'solc-static-linux')
+CACHE_DIR_NAME      = '.solc_cache'
+
+
+# import "a.sol"; import "a.sol" as A; import * as A from "a.sol";
+# import {X, Y} from "a.sol";
+_IMPORT_RE = re.compile(
+	r'\bimport\s+(?:[^;"\']*\bfrom\s+)?["\']([^"\']+)["\']'
+)
+
+
+def _FileSha256(path: str) -> str:
+	h = hashlib.sha256()
+	with open(path, 'rb') as f:
+		for chunk in iter(lambda: f.read(1 << 20), b''):
+			h.update(chunk)
+	return h.hexdigest()
+
+
+def CollectSources(entryUnits: Iterable[str]) -> Dict[str, str]:
+	'''
+	Read the given source units and everything they import, keyed by their
+	source unit names (paths relative to the project root), resolving
+	relative imports the same way solc does
+	'''
+	sources: Dict[str, str] = {}
+	pending = list(entryUnits)
+	while len(pending) > 0:
+		unit = pending.pop()
+		if unit in sources:
+			continue
+
+		path = os.path.join(BASE_DIR_PATH, *unit.split('/'))
+		if not os.path.isfile(path):
+			raise FileNotFoundError(
+				'Source unit {} is not found at {}'.format(unit, path)
+			)
+		with open(path, 'r') as f:
+			sources[unit] = f.read()
+
+		for imported in _IMPORT_RE.findall(sources[unit]):
+			if imported.startswith(('./', '../')):
+				imported = posixpath.normpath(
+					posixpath.join(posixpath.dirname(unit), imported)
+				)
+			pending.append(imported)
+
+	return sources
+
+
+def BuildInput(
+	contractModuleMap: Dict[str, str],
+	optimizeRuns: int,
+	viaIR: bool,
+) -> dict:
+	'''
+	Make the standard JSON input compiling every contract in one pass; each
+	contract lives in <module>/<Contract>.sol
+	'''
+	outputSelection: Dict[str, Dict[str, List[str]]] = {}
+	for contract, module in contractModuleMap.items():
+		unit = '{}/{}.sol'.format(module, contract)
+		outputSelection.setdefault(unit, {})[contract] = [
+			'abi',
+			'evm.bytecode.object',
+		]
+
+	sources = CollectSources(outputSelection.keys())
+
+	return {
+		'language': 'Solidity',
+		'sources': {
+			unit: { 'content': content }
+			for unit, content in sorted(sources.items())
+		},
+		'settings': {
+			'optimizer': { 'enabled': True, 'runs': optimizeRuns },
+			'viaIR': viaIR,
+			'debug': { 'revertStrings': 'strip' },
+			'outputSelection': outputSelection,
+		},
+	}
+
+
+def CacheKey(solcBin: str, stdInput: dict) -> str:
+	'''
+	Content address of a build: the compiler binary, the sources and the
+	settings; file modification times play no part
+	'''
+	h = hashlib.sha256()
+	h.update(_FileSha256(solcBin).encode())
+	h.update(json.dumps(stdInput, sort_keys=True).encode())
+	return h.hexdigest()
+
+
+def Compile(solcBin: str, stdInput: dict) -> Dict[str, dict]:
+	proc = subprocess.run(
+		[ solcBin, '--standard-json' ],
+		input=json.dumps(stdInput).encode(),
+		stdout=subprocess.PIPE,
+		check=True,
+	)
+	output = json.loads(proc.stdout)
+
+	errors = []
+	for err in output.get('errors', []):
+		if err['severity'] == 'error':
+			errors.append(err['formattedMessage'])
+		else:
+			print(err['formattedMessage'])
+	if len(errors) > 0:
+		raise RuntimeError('Compilation failed:\n' + '\n'.join(errors))
+
+	artifacts = {}
+	for unit, contracts in stdInput['settings']['outputSelection'].items():
+		for contract in contracts.keys():
+			compiled = output['contracts'][unit][contract]
+			artifacts[contract] = {
+				'abi': compiled['abi'],
+				'bin': compiled['evm']['bytecode']['object'],
+			}
+	return artifacts
+
+
+def WriteArtifacts(
+	buildDir: str,
+	contractModuleMap: Dict[str, str],
+	artifacts: Dict[str, dict],
+) -> None:
+	'''
+	Write <module>/<Contract>.abi and .bin in the same format as the solc
+	command line, plus a checksums.txt per module
+	'''
+	modules: Dict[str, List[str]] = {}
+	for contract, module in contractModuleMap.items():
+		modules.setdefault(module, []).append(contract)
+
+	for module, contracts in modules.items():
+		moduleDir = os.path.join(buildDir, module)
+		os.makedirs(moduleDir, exist_ok=True)
+
+		fileNames = []
+		for contract in contracts:
+			abiName = '{}.abi'.format(contract)
+			with open(os.path.join(moduleDir, abiName), 'w') as f:
+				json.dump(artifacts[contract]['abi'], f, separators=(',', ':'))
+			binName = '{}.bin'.format(contract)
+			with open(os.path.join(moduleDir, binName), 'w') as f:
+				f.write(artifacts[contract]['bin'])
+			fileNames += [ abiName, binName ]
+
+		with open(os.path.join(moduleDir, 'checksums.txt'), 'w') as f:
+			for fileName in sorted(fileNames):
+				f.write('{}  {}\n'.format(
+					_FileSha256(os.path.join(moduleDir, fileName)),
+					fileName,
+				))
+
+
+def Build(
+	solcBin: str = SOLC_BIN_PATH,
+	buildDir: str = BUILD_DIR_PATH,
+	modules: Optional[List[str]] = None,
+	optimizeRuns: int = 200,
+	viaIR: bool = True,
+	useCache: bool = True,
+) -> bool:
+	'''
+	Build the contracts of the project config (or of the given modules)
+	@return Whether the artifacts came from the cache
+	'''
+	with open(PROJECT_CONFIG_PATH, 'r') as f:
+		contractModuleMap = json.load(f)['contractModuleMap']
+	if modules is not None:
+		contractModuleMap = {
+			contract: module
+			for contract, module in contractModuleMap.items()
+			if module in modules
+		}
+
+	stdInput = BuildInput(contractModuleMap, optimizeRuns, viaIR)
+	key = CacheKey(solcBin, stdInput)
+	cachePath = os.path.join(buildDir, CACHE_DIR_NAME, key + '.json')
+
+	cacheHit = useCache and os.path.isfile(cachePath)
+	if cacheHit:
+		with open(cachePath, 'r') as f:
+			artifacts = json.load(f)
+	else:
+		artifacts = Compile(solcBin, stdInput)
+		os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+		# written under a temporary name first, so an interrupted build
+		# never leaves a truncated cache entry behind
+		with open(cachePath + '.tmp', 'w') as f:
+			json.dump(artifacts, f)
+		os.replace(cachePath + '.tmp', cachePath)
+
+	WriteArtifacts(buildDir, contractModuleMap, artifacts)
+
+	return cacheHit
+
+
+def main():
+	argParser = argparse.ArgumentParser(
+		description='Build all contracts in a single solc pass, reusing '
+			'cached artifacts when nothing has changed'
+	)
+	argParser.add_argument(
+		'--solc', type=str, required=False, default=SOLC_BIN_PATH,
+		help='path to the solc binary'
+	)
+	argParser.add_argument(
+		'--build-dir', type=str, required=False, default=BUILD_DIR_PATH,
+		help='directory to write the artifacts and the cache to'
+	)
+	argParser.add_argument(
+		'--modules', type=str, required=False, nargs='+', default=None,
+		help='only build the contracts of these modules (default: all)'
+	)
+	argParser.add_argument(
+		'--optimize-runs', type=int, required=False, default=200,
+		help='value of the optimizer runs setting'
+	)
+	argParser.add_argument(
+		'--no-via-ir', action='store_true',
+		help='use the legacy code generator instead of the IR pipeline'
+	)
+	argParser.add_argument(
+		'--no-cache', action='store_true',
+		help='always compile, even if a cached build matches'
+	)
+	args = argParser.parse_args()
+
+	cacheHit = Build(
+		solcBin=args.solc,
+		buildDir=os.path.abspath(args.build_dir),
+		modules=args.modules,
+		optimizeRuns=args.optimize_runs,
+		viaIR=not args.no_via_ir,
+		useCache=not args.no_cache,
+	)
+	print('Contracts are {}'.format(
+		'up to date (cached)' if cacheHit else 'built'
+	))
+
+
+if __name__ == '__main__':
+	main()